@@ -0,0 +1,387 @@
+#! /usr/bin/env python3
+""" Benchmarks of runtime_syspath discovery, root detection, filtering, sleuth and imports. """
+import contextlib
+import importlib.util
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from unittest import mock
+
+import click
+
+from runtime_syspath import syspath_snapshot, syspath_utils
+from runtime_syspath.syspath_freeze import freeze_syspath, unfreeze_syspath
+from runtime_syspath.syspath_path_utils import get_project_root_dir
+from runtime_syspath.syspath_sleuth import SysPathSleuth
+from runtime_syspath.syspath_sleuth.sleuth_store import SleuthStoreHandler
+from runtime_syspath.syspath_sleuth.syspath_sleuth import DisabledSysPathSleuth
+from runtime_syspath.syspath_snapshot import remove_snapshot, write_snapshot
+from runtime_syspath.syspath_utils import (
+    add_srcdirs_to_syspath,
+    filtered_sorted_syspath,
+    inject_project_pths_to_site,
+    persist_syspath,
+    syspath_scope,
+)
+
+
+FANOUT = 10
+# Every SRC_EVERY'th directory generated under 'tests' is a nested git-subproject-like 'src'.
+SRC_EVERY = 100
+SLEUTH_MUTATIONS = 2000
+SLEUTH_THREAD_COUNTS = (1, 2, 4, 8)
+SLEUTH_BATCH_SIZE = 256
+SLEUTH_STACK_DEPTH = 16
+FIND_SPEC_ENTRIES = 50
+FIND_SPEC_LOOKUPS = 200
+POOL_WORKERS = 4
+
+
+def generate_tree(project_dir: Path, dir_count: int) -> Path:
+    """
+    Generate a synthetic project tree of dir_count directories split between 'src' and 'tests',
+    FANOUT directories wide, with a nested 'tests/**/src' every SRC_EVERY directories.
+
+    :param project_dir: root of the project to generate
+    :param dir_count: number of directories to generate
+    :return: the deepest directory generated
+    """
+    parents: List[Path] = [project_dir / "src", project_dir / "tests"]
+    for parent in parents:
+        parent.mkdir(parents=True)
+    for index in range(dir_count):
+        parent = parents[index // FANOUT]
+        child = parent / f"d{index}"
+        if index % SRC_EVERY == 0 and "tests" in child.relative_to(project_dir).parts:
+            child = child / "src"
+        child.mkdir(parents=True)
+        parents.append(child)
+    return parents[-1]
+
+
+def time_it(func: Callable[[], object], repeat: int, setup: Callable[[], object] = None) -> float:
+    """
+    :return: median seconds of repeat calls to func, each preceded by an untimed setup
+    """
+    timings: List[float] = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+@contextlib.contextmanager
+def restored_syspath() -> Iterator[None]:
+    prior_sys_path = list(sys.path)
+    try:
+        yield
+    finally:
+        sys.path[:] = prior_sys_path
+
+
+def bootstrap_worker(project_dir: Path) -> None:
+    # What a conftest.py or program bootstrap re-runs within each spawned worker.
+    add_srcdirs_to_syspath(project_dir, quiet=True)
+
+
+def warm_up_pool(project_dir: Path) -> None:
+    with ProcessPoolExecutor(
+        POOL_WORKERS,
+        mp_context=get_context("spawn"),
+        initializer=bootstrap_worker,
+        initargs=(project_dir,),
+    ) as executor:
+        list(executor.map(abs, range(POOL_WORKERS)))
+
+
+def bench_tree(project_dir: Path, deepest_dir: Path, repeat: int) -> Dict[str, float]:
+    results: Dict[str, float] = {}
+    with restored_syspath():
+        prior_sys_path = list(sys.path)
+        results["add_srcdirs_to_syspath"] = time_it(
+            lambda: add_srcdirs_to_syspath(project_dir, quiet=True),
+            repeat,
+            setup=lambda: sys.path.__setitem__(slice(None), prior_sys_path),
+        )
+
+    cwd = os.getcwd()
+    try:
+        os.chdir(deepest_dir)
+        results["get_project_root_dir"] = time_it(get_project_root_dir, repeat)
+    finally:
+        os.chdir(cwd)
+
+    with restored_syspath():
+        results["spawn_pool_warm_up"] = time_it(lambda: warm_up_pool(project_dir), repeat)
+        snapshot_path = write_snapshot(project_dir)
+        try:
+            results["spawn_pool_warm_up[snapshot]"] = time_it(
+                lambda: warm_up_pool(project_dir), repeat
+            )
+        finally:
+            remove_snapshot(snapshot_path)
+            syspath_snapshot._SNAPSHOT = None  # pylint: disable=protected-access
+
+    with restored_syspath():
+        add_srcdirs_to_syspath(project_dir, quiet=True)
+        results["filtered_sorted_syspath"] = time_it(
+            lambda: filtered_sorted_syspath(sort=True, unique=True), repeat
+        )
+
+        site_dir = project_dir / "site-packages"
+        site_dir.mkdir()
+        customize_path = (site_dir / "sitecustomize.py", False)
+        with mock.patch.object(syspath_utils, "get_customize_path", return_value=customize_path):
+            results["persist_syspath"] = time_it(
+                lambda: persist_syspath(project_dir, force_pth_dir_creation=True), repeat
+            )
+            results["inject_project_pths_to_site"] = time_it(
+                lambda: inject_project_pths_to_site(project_dir), repeat
+            )
+            results["inject_project_pths_to_site[consolidate]"] = time_it(
+                lambda: inject_project_pths_to_site(project_dir, consolidate=True), repeat
+            )
+    return results
+
+
+@contextlib.contextmanager
+def sleuth_logging(configuration: str) -> Iterator[None]:
+    """
+    Configure SysPathSleuth's reporting: 'print' (no logger handler), 'logger-info' (reported;
+    stack inspected), 'logger-warning' (not reported; no stack inspection) or 'store' (reported
+    to a SleuthStoreHandler's SQLite database).
+    """
+    logger = SysPathSleuth.logger
+    prior_level, prior_handlers = logger.level, list(logger.handlers)
+    handler = logging.NullHandler()
+    try:
+        if configuration == "print":
+            with contextlib.redirect_stdout(io.StringIO()):
+                yield
+            return
+        if configuration == "store":
+            with tempfile.TemporaryDirectory() as db_dir:
+                handler = SleuthStoreHandler(Path(db_dir, "sleuth.db"), "bench")
+                SysPathSleuth.config_logger(handler, logging.INFO)
+                try:
+                    yield
+                finally:
+                    handler.close()
+            return
+        handler.setLevel(logging.INFO)
+        SysPathSleuth.config_logger(
+            handler, logging.INFO if configuration == "logger-info" else logging.WARNING
+        )
+        yield
+    finally:
+        logger.setLevel(prior_level)
+        logger.handlers[:] = prior_handlers
+        SysPathSleuth.refresh()
+
+
+def bench_sleuth(repeat: int) -> Dict[str, float]:
+    """
+    :return: median seconds per sys.path mutation (an append and a pop are two mutations)
+    """
+
+    def mutate(syspath: List[str]) -> Callable[[], None]:
+        def mutations() -> None:
+            for _ in range(SLEUTH_MUTATIONS // 2):
+                syspath.append("bench")
+                syspath.pop()
+
+        return mutations
+
+    results: Dict[str, float] = {
+        "sleuth_mutation[list]": time_it(mutate([]), repeat),
+        "sleuth_mutation[disabled]": time_it(mutate(DisabledSysPathSleuth()), repeat),
+    }
+    for configuration in ("print", "logger-info", "logger-warning", "store"):
+        with sleuth_logging(configuration):
+            results[f"sleuth_mutation[{configuration}]"] = time_it(mutate(SysPathSleuth()), repeat)
+    # Stacks counted, yet not reported
+    prior_stack_depth = SysPathSleuth.stack_depth
+    try:
+        SysPathSleuth.stack_depth = SLEUTH_STACK_DEPTH
+        with sleuth_logging("logger-warning"):
+            results[f"sleuth_mutation[stacks={SLEUTH_STACK_DEPTH}]"] = time_it(
+                mutate(SysPathSleuth()), repeat
+            )
+    finally:
+        SysPathSleuth.stack_depth = prior_stack_depth
+    return {name: seconds / SLEUTH_MUTATIONS for name, seconds in results.items()}
+
+
+def bench_sleuth_threads(repeat: int) -> Dict[str, float]:
+    """
+    Stress a shared SysPathSleuth from as many threads as each of SLEUTH_THREAD_COUNTS, as plugin
+    loading threads would, reporting in batches of SLEUTH_BATCH_SIZE per thread. Mutations hold
+    the GIL, so throughput cannot grow with threads; what this shows is that the cost per
+    mutation does not grow either, i.e.: threads add no contention.
+
+    :return: median seconds per sys.path mutation, across all threads, per thread count
+    """
+    sleuth = SysPathSleuth()
+
+    def mutations() -> None:
+        for _ in range(SLEUTH_MUTATIONS // 2):
+            sleuth.append("bench")
+            sleuth.pop()
+
+    def run_threads(thread_count: int) -> None:
+        threads = [threading.Thread(target=mutations) for _ in range(thread_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        SysPathSleuth.flush()
+
+    results: Dict[str, float] = {}
+    prior_batch_size = SysPathSleuth.batch_size
+    try:
+        SysPathSleuth.batch_size = SLEUTH_BATCH_SIZE
+        with sleuth_logging("print"):
+            for thread_count in SLEUTH_THREAD_COUNTS:
+                seconds = time_it(lambda: run_threads(thread_count), repeat)
+                results[f"sleuth_mutation[threads={thread_count}]"] = seconds / (
+                    SLEUTH_MUTATIONS * thread_count
+                )
+    finally:
+        SysPathSleuth.batch_size = prior_batch_size
+    return results
+
+
+def bench_find_spec(repeat: int) -> Dict[str, float]:
+    """
+    Resolve a top-level module found on the last of FIND_SPEC_ENTRIES sys.path entries, and one
+    found on none, as late, lazy imports do.
+
+    :return: median seconds per resolution, with sys.path as is and frozen
+    """
+    with tempfile.TemporaryDirectory() as temp_dir, syspath_scope():
+        entries = [Path(temp_dir) / f"entry{index}" for index in range(FIND_SPEC_ENTRIES)]
+        for entry in entries:
+            entry.mkdir()
+        (entries[-1] / "bench_late_module.py").touch()
+        sys.path.extend(os.fspath(entry) for entry in entries)
+
+        def find_specs() -> None:
+            for _ in range(FIND_SPEC_LOOKUPS // 2):
+                importlib.util.find_spec("bench_late_module")
+                importlib.util.find_spec("bench_missing_module")
+
+        results = {"find_spec[syspath]": time_it(find_specs, repeat)}
+        freeze_syspath()
+        try:
+            results["find_spec[frozen]"] = time_it(find_specs, repeat)
+        finally:
+            unfreeze_syspath()
+    return {name: seconds / FIND_SPEC_LOOKUPS for name, seconds in results.items()}
+
+
+def run_benchmarks(dir_counts: List[int], repeat: int) -> Dict[str, object]:
+    results: Dict[str, float] = {}
+    for dir_count in dir_counts:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            project_dir = Path(temp_dir) / "project"
+            deepest_dir = generate_tree(project_dir, dir_count)
+            for name, seconds in bench_tree(project_dir, deepest_dir, repeat).items():
+                results[f"{name}[{dir_count}]"] = seconds
+    results.update(bench_sleuth(repeat))
+    results.update(bench_sleuth_threads(repeat))
+    results.update(bench_find_spec(repeat))
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "dir_counts": dir_counts,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare_results(
+    baseline: Dict[str, float], current: Dict[str, float], threshold: float
+) -> List[Tuple[str, float, float, float, bool]]:
+    """
+    :return: (name, baseline seconds, current seconds, ratio, is regression) per shared benchmark
+    """
+    comparisons = []
+    for name in sorted(set(baseline) & set(current)):
+        ratio = current[name] / baseline[name] if baseline[name] else float("inf")
+        comparisons.append((name, baseline[name], current[name], ratio, ratio > 1 + threshold))
+    return comparisons
+
+
+@click.group(help="Benchmark runtime_syspath and compare results against a baseline.")
+def main():
+    pass
+
+
+@main.command(help="Run the benchmarks, writing results as JSON.")
+@click.option(
+    "--dirs",
+    "-d",
+    "dir_counts",
+    multiple=True,
+    type=click.IntRange(1, 1_000_000),
+    default=[1000, 10000],
+    show_default=True,
+    help="synthetic project tree size in directories; repeatable",
+)
+@click.option("--repeat", "-r", type=click.IntRange(1), default=5, show_default=True)
+@click.option("--output", "-o", type=click.Path(dir_okay=False), help="default=stdout")
+def run(dir_counts: Tuple[int, ...], repeat: int, output: Optional[str]):
+    report = json.dumps(run_benchmarks(list(dir_counts), repeat), indent=2)
+    if output:
+        Path(output).write_text(report + "\n")
+    else:
+        click.echo(report)
+
+
+@main.command(help="Compare results against a baseline; exit 1 on any regression.")
+@click.argument("baseline", type=click.Path(exists=True, dir_okay=False))
+@click.argument("current", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--threshold",
+    "-t",
+    type=float,
+    default=0.10,
+    show_default=True,
+    help="slowdown ratio beyond which a benchmark regressed",
+)
+def compare(baseline: str, current: str, threshold: float):
+    comparisons = compare_results(
+        json.loads(Path(baseline).read_text())["results"],
+        json.loads(Path(current).read_text())["results"],
+        threshold,
+    )
+    width = max([len("Benchmark")] + [len(comparison[0]) for comparison in comparisons])
+    click.echo(f"{'Benchmark':<{width}}  {'Baseline s':>12}  {'Current s':>12}  {'Ratio':>6}")
+    for name, baseline_seconds, current_seconds, ratio, is_regression in comparisons:
+        click.echo(
+            f"{name:<{width}}  {baseline_seconds:>12.6g}  {current_seconds:>12.6g}  {ratio:>6.2f}"
+            f"{'  REGRESSION' if is_regression else ''}"
+        )
+    if any(comparison[-1] for comparison in comparisons):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
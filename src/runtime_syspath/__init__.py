@@ -1,14 +1,22 @@
 """ __init__ module. """
 import re
 
+from .syspath_export import export_syspath
+from .syspath_freeze import freeze_syspath, unfreeze_syspath
 from .syspath_path_utils import get_project_root_dir
+from .syspath_snapshot import load_snapshot, write_snapshot
 from .syspath_utils import (
     add_srcdirs_to_syspath,
+    discover_srcdirs,
     filtered_sorted_syspath,
     get_package_and_max_relative_import_dots,
     init_std_syspath_filter,
     persist_syspath,
     print_syspath,
+    syspath_scope,
 )
 
 init_std_syspath_filter(re.compile(r"([Jj]et[Bb]rains|[Pp]ython|PyCharm|v\w*env)"))
+
+# Children of a process that called write_snapshot() skip rediscovering the project's paths.
+load_snapshot()
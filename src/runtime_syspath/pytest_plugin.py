@@ -0,0 +1,177 @@
+""" pytest plugin module. """
+import os
+import time
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import pytest
+
+from .syspath_path_utils import get_project_root_dir
+from .syspath_utils import (
+    DEFAULT_SRCDIR_PATTERNS,
+    add_paths_to_syspath,
+    discover_srcdirs,
+    has_staged_syspath,
+    merge_staged_syspath,
+    syspath_scope,
+)
+
+WORKERINPUT_KEY = "runtime_syspath_srcdirs"
+# The controller's src directories, os.pathsep separated, inherited by the workers it starts
+SRCDIRS_ENV_VAR = "RUNTIME_SYSPATH_SRCDIRS"
+DISCOVERY_PLUGIN_NAME = "runtime_syspath_discovery"
+
+
+class SrcdirDiscovery:
+    """
+    Holds the src directories added to sys.path for this pytest process. Within the
+    pytest-xdist controller (or a run without xdist), they were discovered by walking the project
+    tree. Within an xdist worker, they were handed over by the controller through workerinput.
+    """
+
+    def __init__(
+        self, project_dir: Optional[Path], srcdirs: List[str], seconds: float, report_time: bool
+    ):
+        self.project_dir = project_dir
+        self.srcdirs = srcdirs
+        self.seconds = seconds
+        self.report_time = report_time
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_configure_node(self, node) -> None:
+        # xdist hook: runs within the controller for each worker before it starts.
+        node.workerinput[WORKERINPUT_KEY] = self.srcdirs
+
+    def pytest_report_header(self) -> str:
+        header = f"runtime-syspath: {len(self.srcdirs)} src dir(s) on sys.path"
+        if self.report_time:
+            header += f" discovered in {self.seconds * 1000:.3f}ms"
+        return header
+
+
+def pytest_addoption(parser) -> None:
+    group = parser.getgroup("runtime-syspath")
+    group.addoption(
+        "--syspath",
+        action="store_true",
+        dest="syspath_discover",
+        default=None,
+        help="discover the project's src directories and add them to sys.path.",
+    )
+    group.addoption(
+        "--syspath-root",
+        dest="syspath_root",
+        default=None,
+        help="project root to discover src directories under; default=discover the root.",
+    )
+    group.addoption(
+        "--syspath-pattern",
+        action="append",
+        dest="syspath_patterns",
+        default=None,
+        help=f"project root relative glob of directories to add to sys.path; repeatable. "
+        f"default={' '.join(DEFAULT_SRCDIR_PATTERNS)}",
+    )
+    group.addoption(
+        "--syspath-report-time",
+        action="store_true",
+        dest="syspath_report_time",
+        default=False,
+        help="report the time spent discovering src directories.",
+    )
+    parser.addini(
+        "syspath_discover",
+        type="bool",
+        default=False,
+        help="discover the project's src directories and add them to sys.path.",
+    )
+    parser.addini(
+        "syspath_patterns",
+        type="linelist",
+        default=list(DEFAULT_SRCDIR_PATTERNS),
+        help="project root relative globs of directories to add to sys.path.",
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_load_initial_conftests(early_config) -> None:
+    # Ahead of conftest.py loading so that conftest.py modules can import project modules. Only the
+    # options known before loading conftest.py modules are parsed yet.
+    known_args = early_config.known_args_namespace
+    if not (known_args.syspath_discover or early_config.getini("syspath_discover")):
+        return
+    if os.getenv("PYTEST_XDIST_WORKER"):
+        # The controller already walked the tree; apply its result ahead of the worker's
+        # conftest.py modules too. Else, e.g.: a remote worker, pytest_configure() applies it.
+        srcdirs_str = os.getenv(SRCDIRS_ENV_VAR)
+        if srcdirs_str is not None:
+            start = time.perf_counter()
+            srcdirs = srcdirs_str.split(os.pathsep) if srcdirs_str else []
+            add_paths_to_syspath(srcdirs, quiet=True)
+            early_config.pluginmanager.register(
+                SrcdirDiscovery(
+                    None, srcdirs, time.perf_counter() - start, known_args.syspath_report_time
+                ),
+                DISCOVERY_PLUGIN_NAME,
+            )
+        return
+
+    start = time.perf_counter()
+    root = known_args.syspath_root
+    project_dir = Path(root) if root else Path(get_project_root_dir())
+    patterns = known_args.syspath_patterns or early_config.getini("syspath_patterns")
+    srcdirs = discover_srcdirs(project_dir.absolute(), patterns)
+    add_paths_to_syspath(srcdirs, quiet=True)
+    # Workers are started later, by pytest-xdist, inheriting the environment.
+    os.environ[SRCDIRS_ENV_VAR] = os.pathsep.join(srcdirs)
+    early_config.pluginmanager.register(
+        SrcdirDiscovery(
+            project_dir,
+            srcdirs,
+            time.perf_counter() - start,
+            known_args.syspath_report_time,
+        ),
+        DISCOVERY_PLUGIN_NAME,
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config) -> None:
+    workerinput = getattr(config, "workerinput", None)
+    if not workerinput or WORKERINPUT_KEY not in workerinput:
+        return
+    if config.pluginmanager.has_plugin(DISCOVERY_PLUGIN_NAME):
+        # Applied by pytest_load_initial_conftests() already
+        return
+
+    start = time.perf_counter()
+    srcdirs: List[str] = workerinput[WORKERINPUT_KEY]
+    add_paths_to_syspath(srcdirs, quiet=True)
+    config.pluginmanager.register(
+        SrcdirDiscovery(
+            None, srcdirs, time.perf_counter() - start, config.getoption("syspath_report_time")
+        ),
+        DISCOVERY_PLUGIN_NAME,
+    )
+
+
+def pytest_sessionfinish(session) -> None:
+    # Workers only stage their persist_syspath() templates; merge them once per session, whether
+    # or not the plugin discovered src directories.
+    if os.getenv("PYTEST_XDIST_WORKER"):
+        return
+    discovery = session.config.pluginmanager.get_plugin(DISCOVERY_PLUGIN_NAME)
+    project_dir = discovery.project_dir if discovery else None
+    template_dir = (project_dir or Path(get_project_root_dir())) / "pths"
+    if has_staged_syspath(template_dir):
+        merge_staged_syspath(template_dir.parent)
+
+
+@pytest.fixture(name="syspath_scope")
+def syspath_scope_fixture() -> Iterator[List[str]]:
+    """
+    sys.path for a test to alter at will; restored, along with the sys.path_importer_cache and
+    sys.modules entries introduced, after the test.
+    """
+    with syspath_scope() as syspath:
+        yield syspath
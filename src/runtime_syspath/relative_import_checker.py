@@ -0,0 +1,151 @@
+""" relative_import_checker module. """
+import ast
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import click
+
+from .syspath_cache import FileResultCache, analyze_files
+from .syspath_path_utils import get_project_root_dir
+from .syspath_utils import DEFAULT_SRCDIR_PATTERNS, discover_srcdirs, get_max_relative_import_dots
+
+ANALYSIS_NAME = "relative_imports"
+ANALYSIS_VERSION = 1
+
+
+class RelativeImportViolation(NamedTuple):
+    path: str
+    lineno: int
+    dots: str
+    module: str
+    package: str
+    max_dots: str
+
+
+def find_relative_imports(content: bytes, path: str) -> Optional[List[Tuple[int, int, str]]]:
+    """
+    :param content: python source
+    :param path: file of content
+    :return: (line number, dot count, module) per relative 'from ... import'; None if content
+    does not parse
+    """
+    try:
+        tree = ast.parse(content, path)
+    except (SyntaxError, ValueError):
+        return None
+    return [
+        (node.lineno, node.level, node.module or "")
+        for node in ast.walk(tree)
+        if isinstance(node, ast.ImportFrom) and node.level
+    ]
+
+
+def find_source_files(srcdirs: Iterable[str]) -> Dict[str, str]:
+    """
+    :param srcdirs: sys.path entries
+    :return: each python file under srcdirs -> the srcdir it is imported relative to; the
+    innermost when srcdirs nest
+    """
+    srcdirs = [os.path.abspath(srcdir) for srcdir in srcdirs]
+    srcdir_set = set(srcdirs)
+    source_files: Dict[str, str] = {}
+    for srcdir in srcdirs:
+        for dir_path, dir_names, file_names in os.walk(srcdir):
+            dir_names[:] = [
+                name
+                for name in dir_names
+                if name != "__pycache__"
+                and name[0] != "."
+                and os.path.join(dir_path, name) not in srcdir_set
+            ]
+            for file_name in file_names:
+                if file_name.endswith(".py"):
+                    source_files.setdefault(os.path.join(dir_path, file_name), srcdir)
+    return source_files
+
+
+def get_file_package(path: str, srcdir: str) -> str:
+    """
+    :return: fully-qualified package of the module in path when imported relative to srcdir
+    """
+    return ".".join(Path(os.path.relpath(os.path.dirname(path), srcdir)).parts)
+
+
+def check_relative_imports(
+    srcdirs: Iterable[str], max_workers: Optional[int] = None, use_cache: bool = True
+) -> Tuple[int, List[RelativeImportViolation], List[str]]:
+    """
+    Without importing anything, find each relative import, under srcdirs, attempting to import
+    beyond its top-level package: the static counterpart of
+    get_package_and_max_relative_import_dots(). Files are parsed on a process pool; with
+    use_cache, only files changed since the prior check are parsed.
+
+    :param srcdirs: sys.path entries to check; typically discovered by discover_srcdirs()
+    :param max_workers: default=number of CPUs
+    :param use_cache: reuse, and update, the locally cached results of prior checks
+    :return: number of files checked, violations, files that do not parse or cannot be read
+    """
+    source_files = find_source_files(srcdirs)
+    cache = FileResultCache(ANALYSIS_NAME, ANALYSIS_VERSION) if use_cache else None
+    results = analyze_files(sorted(source_files), find_relative_imports, cache, max_workers)
+    if cache:
+        cache.save()
+
+    violations: List[RelativeImportViolation] = []
+    unparsable: List[str] = []
+    for path, relative_imports in results.items():
+        if relative_imports is None:
+            unparsable.append(path)
+            continue
+        package = get_file_package(path, source_files[path])
+        max_dots = get_max_relative_import_dots(package)
+        violations.extend(
+            RelativeImportViolation(path, lineno, "." * level, module, package, max_dots)
+            for lineno, level, module in relative_imports
+            if level > len(max_dots)
+        )
+    return len(results), violations, unparsable
+
+
+@click.command(
+    help="Report relative imports, within the project's src directories, that attempt to import "
+    "beyond their top-level package; exit 1 if any."
+)
+@click.option(
+    "--project-dir",
+    "-d",
+    type=click.Path(exists=True, file_okay=False),
+    help="default=discover the project root",
+)
+@click.option(
+    "--pattern",
+    "-p",
+    "patterns",
+    multiple=True,
+    help=f"project root relative glob of src directories; repeatable. "
+    f"default={' '.join(DEFAULT_SRCDIR_PATTERNS)}",
+)
+@click.option("--jobs", "-j", type=click.IntRange(1), help="default=number of CPUs")
+@click.option("--no-cache", is_flag=True, default=False, help="reparse every file")
+def relative_import_checker_main(
+    project_dir: Optional[str], patterns: Tuple[str, ...], jobs: Optional[int], no_cache: bool
+):
+    project_path = Path(project_dir) if project_dir else Path(get_project_root_dir())
+    srcdirs = discover_srcdirs(project_path.absolute(), patterns or DEFAULT_SRCDIR_PATTERNS)
+    file_count, violations, unparsable = check_relative_imports(srcdirs, jobs, not no_cache)
+    for path in unparsable:
+        click.echo(f"{path}: does not parse or cannot be read; not checked", err=True)
+    for violation in sorted(violations):
+        click.echo(
+            f"{violation.path}:{violation.lineno}: 'from {violation.dots}{violation.module} "
+            f"import' within package '{violation.package}' exceeds its "
+            f"{len(violation.max_dots)} relative dot(s)"
+        )
+    click.echo(
+        f"{file_count} file(s) checked: {len(violations)} relative import(s) beyond top-level "
+        f"package"
+    )
+    if violations:
+        sys.exit(1)
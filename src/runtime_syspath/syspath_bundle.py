@@ -0,0 +1,255 @@
+""" syspath_bundle module. """
+import hashlib
+import importlib.util
+import json
+import marshal
+import os
+import shutil
+import sys
+import warnings
+import zipfile
+import zipimport
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .syspath_cache import get_cache_dir
+from .syspath_utils import file_lock, write_text_atomically
+
+BUNDLE_CACHE_SUBDIR = "bundles"
+# hash-based, unchecked .pyc; see PEP 552
+UNCHECKED_HASH_PYC_FLAGS = 0b01
+# A bundle's zip comment is the hex sha256 of its manifest.
+DIGEST_SIZE = 64
+END_OF_CENTRAL_DIRECTORY_SIGNATURE = b"PK\x05\x06"
+END_OF_CENTRAL_DIRECTORY_SIZE = 22
+
+# bundle member -> (source file, mtime_ns, size)
+BundleManifest = Dict[str, Tuple[str, int, int]]
+
+
+def get_bundle_path(srcdirs: Iterable[str]) -> Path:
+    """
+    :param srcdirs: src directories bundled, in sys.path order
+    :return: the cached bundle for srcdirs under this interpreter's bytecode cache tag
+    """
+    key = "\0".join([sys.implementation.cache_tag or "", *srcdirs])
+    bundle_name = f"{hashlib.sha256(key.encode()).hexdigest()[:16]}.zip"
+    return get_cache_dir(BUNDLE_CACHE_SUBDIR) / bundle_name
+
+
+def scan_srcdirs(srcdirs: Iterable[str]) -> BundleManifest:
+    """
+    Stat each file under srcdirs; bytecode caches and hidden directories are skipped. Where
+    srcdirs share a relative file path, the first src directory wins just as it would on sys.path.
+
+    :param srcdirs: src directories to bundle, in sys.path order
+    :return: the bundle manifest for the files found
+    """
+    manifest: BundleManifest = {}
+    for srcdir in srcdirs:
+        for dir_path, dir_names, file_names in os.walk(srcdir):
+            dir_names[:] = [name for name in dir_names if name != "__pycache__" and name[0] != "."]
+            relative_dir = os.path.relpath(dir_path, srcdir)
+            for file_name in file_names:
+                if file_name.endswith((".pyc", ".pyo")):
+                    continue
+                member = Path(relative_dir, file_name).as_posix()
+                if member in manifest:
+                    continue
+                file_path = os.path.join(dir_path, file_name)
+                stat = os.stat(file_path)
+                manifest[member] = (file_path, stat.st_mtime_ns, stat.st_size)
+    return manifest
+
+
+def compile_unchecked_pyc(source: bytes, source_path: str) -> Optional[bytes]:
+    """
+    Compile source to an unchecked hash-based .pyc whose code objects name source_path, not the
+    path within the bundle, as their file. Tracebacks, linecache and debuggers are thereby mapped
+    back to the original source file.
+
+    :param source: python source
+    :param source_path: original source file
+    :return: the .pyc's content or None if source does not compile
+    """
+    try:
+        code = compile(source, source_path, "exec", dont_inherit=True)
+    except (SyntaxError, ValueError):
+        # Leave it to zipimport to report when imported.
+        return None
+    return b"".join(
+        (
+            importlib.util.MAGIC_NUMBER,
+            UNCHECKED_HASH_PYC_FLAGS.to_bytes(4, "little"),
+            importlib.util.source_hash(source),
+            marshal.dumps(code),
+        )
+    )
+
+
+def load_bundle_manifest(bundle_path: Path) -> BundleManifest:
+    try:
+        with bundle_path.with_suffix(".json").open() as manifest_f:
+            return {member: tuple(entry) for member, entry in json.load(manifest_f).items()}
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def get_manifest_digest(manifest: BundleManifest) -> bytes:
+    return hashlib.sha256(json.dumps(manifest, sort_keys=True).encode()).hexdigest().encode()
+
+
+def read_bundle_digest(bundle_path: Path) -> Optional[bytes]:
+    """
+    Read the manifest digest a bundle carries as its zip comment from the end of central
+    directory record alone, without reading the central directory.
+
+    :return: the digest or None if bundle_path is missing or carries none
+    """
+    record_size = END_OF_CENTRAL_DIRECTORY_SIZE + DIGEST_SIZE
+    try:
+        with open(bundle_path, "rb") as bundle_f:
+            bundle_f.seek(-record_size, os.SEEK_END)
+            record = bundle_f.read(record_size)
+    except OSError:
+        return None
+    if (
+        record[:4] != END_OF_CENTRAL_DIRECTORY_SIGNATURE
+        or int.from_bytes(record[20:22], "little") != DIGEST_SIZE
+    ):
+        return None
+    return record[END_OF_CENTRAL_DIRECTORY_SIZE:]
+
+
+def _write_members(
+    bundle: zipfile.ZipFile,
+    manifest: BundleManifest,
+    prior_bundle: Optional[zipfile.ZipFile] = None,
+    prior_manifest: Optional[BundleManifest] = None,
+) -> None:
+    """
+    Write manifest's members, and .pyc of its .py files, to bundle; those unchanged since
+    prior_manifest are copied from prior_bundle rather than read and compiled.
+    """
+    prior_members: Set[str] = set(prior_bundle.namelist()) if prior_bundle else set()
+    for member, entry in sorted(manifest.items()):
+        pyc_member = f"{member}c" if member.endswith(".py") else None
+        if prior_bundle and member in prior_members and prior_manifest.get(member) == entry:
+            bundle.writestr(member, prior_bundle.read(member))
+            if pyc_member and pyc_member in prior_members:
+                bundle.writestr(pyc_member, prior_bundle.read(pyc_member))
+            continue
+        with open(entry[0], "rb") as source_f:
+            source = source_f.read()
+        bundle.writestr(member, source)
+        pyc = compile_unchecked_pyc(source, entry[0]) if pyc_member else None
+        if pyc:
+            bundle.writestr(pyc_member, pyc)
+
+
+def _append_changed_members(
+    bundle_path: Path, manifest: BundleManifest, prior_manifest: BundleManifest
+) -> bool:
+    """
+    Append the members changed or added since prior_manifest to a copy of the bundle, then
+    atomically replace the bundle with it; readers never see a partly appended zip. zipimport, as
+    zipfile, resolves a duplicated name to its last entry; the prior members' offsets stay valid,
+    so importers that already read the bundle's directory keep reading it.
+
+    :return: False, leaving the bundle as is, if it should be rewritten instead: members were
+    removed, or superseded entries would outnumber live ones
+    """
+    if prior_manifest.keys() - manifest.keys():
+        return False
+    changed = {
+        member: entry for member, entry in manifest.items() if prior_manifest.get(member) != entry
+    }
+    try:
+        with zipfile.ZipFile(bundle_path) as prior_bundle:
+            entry_count = len(prior_bundle.infolist())
+            names = set(prior_bundle.namelist())
+    except (OSError, zipfile.BadZipFile):
+        return False
+    superseded = entry_count - len(names)
+    superseded += sum((member in names) + (f"{member}c" in names) for member in changed)
+    if superseded > len(names):
+        return False
+
+    temp_bundle_path = bundle_path.with_name(f".{bundle_path.name}.{os.getpid()}")
+    try:
+        # Copied by the OS; only the changed members are read and compiled.
+        shutil.copyfile(bundle_path, temp_bundle_path)
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", "Duplicate name", UserWarning)
+            with zipfile.ZipFile(temp_bundle_path, "a", zipfile.ZIP_STORED) as bundle:
+                _write_members(bundle, changed)
+                bundle.comment = get_manifest_digest(manifest)
+        os.replace(temp_bundle_path, bundle_path)
+    finally:
+        if temp_bundle_path.exists():
+            temp_bundle_path.unlink()
+    return True
+
+
+def _rewrite_bundle(
+    bundle_path: Path, manifest: BundleManifest, prior_manifest: BundleManifest
+) -> None:
+    """
+    Write the bundle anew beside bundle_path, then atomically replace it.
+    """
+    temp_bundle_path = bundle_path.with_name(f".{bundle_path.name}.{os.getpid()}")
+    prior_bundle: Optional[zipfile.ZipFile] = None
+    try:
+        if prior_manifest and bundle_path.exists():
+            prior_bundle = zipfile.ZipFile(bundle_path)
+        with zipfile.ZipFile(temp_bundle_path, "w", zipfile.ZIP_STORED) as bundle:
+            _write_members(bundle, manifest, prior_bundle, prior_manifest)
+            bundle.comment = get_manifest_digest(manifest)
+        os.replace(temp_bundle_path, bundle_path)
+    finally:
+        if prior_bundle:
+            prior_bundle.close()
+        if temp_bundle_path.exists():
+            temp_bundle_path.unlink()
+
+
+def bundle_srcdirs(srcdirs: List[str], bundle_path: Optional[Path] = None) -> Path:
+    """
+    Pack all files under srcdirs into one uncompressed zip so that a single sys.path entry, served
+    by zipimport from its in-memory directory, replaces one entry (and its stats on every import
+    miss) per src directory. .py files are accompanied by .pyc compiled with their original path.
+
+    Rebuilding is incremental: while the digest of srcdirs' manifest matches the one the bundle
+    carries, the bundle is reused as-is. Otherwise, only changed files are read and appended to
+    the bundle; it is rewritten, copying unchanged members, only once files were removed or
+    superseded entries accumulate. Concurrent processes rebuild one at a time, under a lock file
+    beside the bundle, and each rebuild replaces the bundle atomically.
+
+    :param srcdirs: src directories to bundle, in sys.path order
+    :param bundle_path: default=a bundle cached locally per srcdirs
+    :return: the bundle to add to sys.path
+    """
+    bundle_path = bundle_path or get_bundle_path(srcdirs)
+    manifest = scan_srcdirs(srcdirs)
+    digest = get_manifest_digest(manifest)
+    if read_bundle_digest(bundle_path) == digest:
+        return bundle_path
+
+    with file_lock(bundle_path.with_suffix(".lock")):
+        # Another process may have rebuilt it meanwhile.
+        if read_bundle_digest(bundle_path) != digest:
+            prior_manifest = load_bundle_manifest(bundle_path) if bundle_path.exists() else {}
+            if not prior_manifest or not _append_changed_members(
+                bundle_path, manifest, prior_manifest
+            ):
+                _rewrite_bundle(bundle_path, manifest, prior_manifest)
+            write_text_atomically(bundle_path.with_suffix(".json"), json.dumps(manifest))
+
+    # zipimport caches each zip's directory by path; refresh it for the rebuilt bundle.
+    zip_importer = sys.path_importer_cache.get(os.fspath(bundle_path))
+    if hasattr(zip_importer, "invalidate_caches"):
+        zip_importer.invalidate_caches()
+    else:
+        # pylint: disable=protected-access
+        zipimport._zip_directory_cache.pop(os.fspath(bundle_path), None)  # type: ignore
+    return bundle_path
@@ -0,0 +1,182 @@
+""" syspath_cache module. """
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .syspath_importer_cache import MTIME_GRANULARITY_NS
+
+CACHE_DIR_ENV_VAR = "RUNTIME_SYSPATH_CACHE_DIR"
+ANALYSIS_CACHE_SUBDIR = "analyses"
+
+
+def get_cache_dir(*subdirs: str, create: bool = True) -> Path:
+    """
+    Local (never NFS-mounted workspace) directory for runtime_syspath's caches:
+    $RUNTIME_SYSPATH_CACHE_DIR, else the platform's user cache directory.
+
+    :param subdirs: sub-directories of the cache directory to return
+    :param create: create the directory if need be
+    :return: the cache directory
+    """
+    cache_dir_str = os.getenv(CACHE_DIR_ENV_VAR)
+    if cache_dir_str:
+        cache_dir = Path(cache_dir_str)
+    elif sys.platform == "win32":
+        cache_dir = Path(os.getenv("LOCALAPPDATA") or Path.home()) / "runtime_syspath" / "Cache"
+    else:
+        cache_dir = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "runtime_syspath"
+    cache_dir = cache_dir.joinpath(*subdirs)
+    if create:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+class FileResultCache:
+    """
+    Locally cached results of a static analysis of source files. A file's result is keyed by the
+    sha256 of its content, so renaming or touching a file costs a read but never a reanalysis.
+    Each file's (mtime_ns, size, sha256) is kept too, so an unchanged file is not even read;
+    unless changed within MTIME_GRANULARITY_NS of being stat'ed, since a change since may have
+    left its mtime as is.
+    """
+
+    def __init__(self, name: str, version: int = 1):
+        """
+        :param name: the analysis; results are kept per analysis and interpreter version since
+        the latter determines the source that parses
+        :param version: bump to discard results of a prior version of the analysis
+        """
+        self.path = get_cache_dir(ANALYSIS_CACHE_SUBDIR) / f"{name}.{sys.implementation.cache_tag}"
+        self.version = version
+        # file path -> [mtime_ns, size, sha256, time_ns() of the stat]
+        self.files: Dict[str, List[Any]] = {}
+        # sha256 -> result
+        self.results: Dict[str, Any] = {}
+        try:
+            with self.path.open() as cache_f:
+                cache = json.load(cache_f)
+            if cache["version"] == version:
+                self.files, self.results = cache["files"], cache["results"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def get(self, path: str, stat: os.stat_result) -> Tuple[Optional[str], Any]:
+        """
+        :return: (sha256, result) of path if unchanged since cached; else (None, None)
+        """
+        entry = self.files.get(path)
+        if (
+            entry
+            and len(entry) == 4
+            and entry[:2] == [stat.st_mtime_ns, stat.st_size]
+            and entry[3] - entry[0] >= MTIME_GRANULARITY_NS
+            and entry[2] in self.results
+        ):
+            return entry[2], self.results[entry[2]]
+        return None, None
+
+    def set(
+        self, path: str, stat: os.stat_result, digest: str, result: Any, stat_ns: int = None
+    ) -> None:
+        """
+        :param stat_ns: time_ns() of the stat, taken ahead of it; default=now
+        """
+        stat_ns = time.time_ns() if stat_ns is None else stat_ns
+        self.files[path] = [stat.st_mtime_ns, stat.st_size, digest, stat_ns]
+        self.results[digest] = result
+
+    def save(self) -> None:
+        """
+        Write the cache, forgetting deleted files and the results no file refers to anymore.
+        """
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        from .syspath_utils import write_text_atomically
+
+        self.files = {path: entry for path, entry in self.files.items() if os.path.exists(path)}
+        digests = {entry[2] for entry in self.files.values()}
+        self.results = {digest: self.results[digest] for digest in digests}
+        cache = {"version": self.version, "files": self.files, "results": self.results}
+        write_text_atomically(self.path, json.dumps(cache))
+
+
+# pylint: disable=too-many-arguments
+def analyze_files(
+    paths: Iterable[str],
+    analyze: Callable[[bytes, str], Any],
+    cache: Optional[FileResultCache] = None,
+    max_workers: Optional[int] = None,
+    *,
+    prefilter: Callable[[bytes], bool] = None,
+    prefiltered_result: Any = None,
+) -> Dict[str, Any]:
+    """
+    Analyze each of paths, reusing cache's results for unchanged files and analyzing the others on
+    a process pool. cache is updated, not saved.
+
+    :param paths: files to analyze
+    :param analyze: module-level (picklable) function of a file's content and path returning a
+    JSON-serializable result
+    :param cache: results of prior analyses by the same analyze
+    :param max_workers: default=number of CPUs; 1 analyzes within this process
+    :param prefilter: cheap test of a file's content, within this process, for whether analyze
+    could find anything; files failing it are not sent to the pool
+    :param prefiltered_result: the result of files failing prefilter
+    :return: file path -> result; None for a file that could not be read, e.g.: removed since
+    found, or unreadable
+    """
+    results: Dict[str, Any] = {}
+    # file path -> (stat, time_ns() of the stat, sha256, content)
+    misses: Dict[str, Tuple[os.stat_result, int, str, bytes]] = {}
+    for path in paths:
+        stat_ns = time.time_ns()
+        try:
+            stat = os.stat(path)
+            if cache:
+                digest, result = cache.get(path, stat)
+                if digest:
+                    results[path] = result
+                    continue
+            content = Path(path).read_bytes()
+        except OSError:
+            results[path] = None
+            continue
+        digest = hashlib.sha256(content).hexdigest()
+        if cache and digest in cache.results:
+            results[path] = cache.results[digest]
+            cache.set(path, stat, digest, results[path], stat_ns)
+            continue
+        if prefilter and not prefilter(content):
+            results[path] = prefiltered_result
+            if cache:
+                cache.set(path, stat, digest, prefiltered_result, stat_ns)
+            continue
+        misses[path] = (stat, stat_ns, digest, content)
+
+    miss_results = _map_analyze(analyze, misses, max_workers)
+    for (path, (stat, stat_ns, digest, _)), result in zip(misses.items(), miss_results):
+        results[path] = result
+        if cache:
+            cache.set(path, stat, digest, result, stat_ns)
+    return results
+
+
+def _map_analyze(
+    analyze: Callable[[bytes, str], Any],
+    misses: Dict[str, Tuple[os.stat_result, int, str, bytes]],
+    max_workers: Optional[int],
+) -> List[Any]:
+    """
+    :return: analyze()'s result of each of misses, in order: on a process pool if more than one
+    """
+    contents = [miss[3] for miss in misses.values()]
+    if len(misses) > 1 and max_workers != 1:
+        max_workers = max_workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers) as executor:
+            chunksize = max(1, len(misses) // (max_workers * 4))
+            return list(executor.map(analyze, contents, misses, chunksize=chunksize))
+    return [analyze(content, path) for content, path in zip(contents, misses)]
@@ -0,0 +1,272 @@
+""" syspath_daemon module. """
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import click
+
+from .syspath_cache import get_cache_dir
+
+DAEMON_SOCKET_ENV_VAR = "RUNTIME_SYSPATH_DAEMON_SOCKET"
+DAEMON_SOCKET_NAME = "discovery.sock"
+DEFAULT_POLL_INTERVAL = 1.0
+# An index not checked for changes within this many poll intervals is reported stale.
+STALE_POLL_INTERVALS = 5
+DEFAULT_QUERY_TIMEOUT = 5.0
+
+
+def get_daemon_socket_path() -> Path:
+    """
+    :return: $RUNTIME_SYSPATH_DAEMON_SOCKET, else the socket within the local cache directory,
+    which is not created
+    """
+    socket_path_str = os.getenv(DAEMON_SOCKET_ENV_VAR)
+    if socket_path_str:
+        return Path(socket_path_str)
+    return get_cache_dir(create=False) / DAEMON_SOCKET_NAME
+
+
+def get_watched_dirs(project_dir: Path, patterns: Iterable[str]) -> Dict[str, int]:
+    """
+    A directory's mtime changes when an entry within it is added, removed or renamed, so the
+    patterns' matches can only change when one of these directories' mtime does.
+
+    :param project_dir: root of project
+    :param patterns: project_dir relative glob patterns of directories to discover
+    :return: each directory patterns are matched within -> its mtime_ns
+    """
+    watched_dirs: Dict[str, int] = {}
+    for pattern in patterns:
+        parts = Path(pattern).parts
+        literal_count = next(
+            (index for index, part in enumerate(parts) if any(c in part for c in "*?[")),
+            len(parts),
+        )
+        base_parts = parts[:literal_count] if literal_count < len(parts) else parts[:-1]
+        base_dir = project_dir.joinpath(*base_parts)
+        max_depth = None if "**" in parts else len(parts) - len(base_parts) - 1
+        # Creating or removing base_dir itself changes its parent.
+        for ancestor_count in range(len(base_parts)):
+            ancestor_dir = project_dir.joinpath(*base_parts[:ancestor_count])
+            try:
+                watched_dirs[os.fspath(ancestor_dir)] = os.stat(ancestor_dir).st_mtime_ns
+            except OSError:
+                pass
+        for dir_path, dir_names, _ in os.walk(base_dir):
+            depth = len(Path(dir_path).relative_to(base_dir).parts)
+            if max_depth is not None and depth >= max_depth:
+                dir_names[:] = []
+            try:
+                watched_dirs[dir_path] = os.stat(dir_path).st_mtime_ns
+            except OSError:
+                pass
+    return watched_dirs
+
+
+class SrcdirIndex:
+    """
+    The src directories of a project per patterns along with the mtimes of the directories they
+    were discovered within.
+    """
+
+    def __init__(self, project_dir: Path, patterns: Tuple[str, ...]):
+        self.project_dir = project_dir
+        self.patterns = patterns
+        self.lock = threading.Lock()
+        self.srcdirs: List[str] = []
+        self.watched_dirs: Dict[str, int] = {}
+        self.checked_at = 0.0
+        self.discover()
+
+    def discover(self) -> None:
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        from .syspath_utils import discover_srcdirs
+
+        watched_dirs = get_watched_dirs(self.project_dir, self.patterns)
+        self.srcdirs = discover_srcdirs(self.project_dir, self.patterns)
+        self.watched_dirs = watched_dirs
+        self.checked_at = time.monotonic()
+
+    def refresh(self) -> bool:
+        """
+        Rediscover if any watched directory changed.
+
+        :return: whether the index was rediscovered
+        """
+        with self.lock:
+            for dir_path, mtime_ns in self.watched_dirs.items():
+                try:
+                    changed = os.stat(dir_path).st_mtime_ns != mtime_ns
+                except OSError:
+                    changed = True
+                if changed:
+                    self.discover()
+                    return True
+            self.checked_at = time.monotonic()
+            return False
+
+
+class DiscoveryRequestHandler(socketserver.StreamRequestHandler):
+    """
+    One JSON request per line: {"project_dir": ..., "patterns": [...]}; one JSON response per
+    line: {"srcdirs": [...]}, {"stale": true} or {"error": ...}.
+    """
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                response = self.server.discovery.query(  # type: ignore
+                    Path(request["project_dir"]), tuple(request["patterns"])
+                )
+            except (ValueError, KeyError, TypeError, OSError) as ex:
+                response = {"error": str(ex)}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class DiscoveryDaemon:
+    """
+    Serves each project's src directories from an index kept in memory and polled for changes
+    off of the query path, so that short-lived processes skip walking the project tree. Polling
+    stats only the directories patterns are matched within, not the tree, and needs nothing
+    beyond the standard library on any platform, unlike inotify or FSEvents.
+    """
+
+    def __init__(self, socket_path: Path, poll_interval: float = DEFAULT_POLL_INTERVAL):
+        self.socket_path = socket_path
+        self.poll_interval = poll_interval
+        self.indexes: Dict[Tuple[str, Tuple[str, ...]], SrcdirIndex] = {}
+        self.indexes_lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.server: Optional[socketserver.BaseServer] = None
+
+    def query(self, project_dir: Path, patterns: Tuple[str, ...]) -> Dict[str, object]:
+        key = (os.fspath(project_dir), patterns)
+        with self.indexes_lock:
+            index = self.indexes.get(key)
+        if not index:
+            index = SrcdirIndex(project_dir, patterns)
+            with self.indexes_lock:
+                index = self.indexes.setdefault(key, index)
+        if time.monotonic() - index.checked_at > STALE_POLL_INTERVALS * self.poll_interval:
+            return {"stale": True}
+        return {"srcdirs": index.srcdirs}
+
+    def poll(self) -> None:
+        while not self.stopped.wait(self.poll_interval):
+            with self.indexes_lock:
+                indexes = list(self.indexes.values())
+            for index in indexes:
+                index.refresh()
+
+    def serve_forever(self) -> None:
+        if is_daemon_running(self.socket_path):
+            raise RuntimeError(f"a discovery daemon already serves {self.socket_path}")
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        # pylint: disable=no-member
+        self.server = socketserver.ThreadingUnixStreamServer(  # type: ignore
+            os.fspath(self.socket_path), DiscoveryRequestHandler
+        )
+        self.server.daemon_threads = True  # type: ignore
+        self.server.discovery = self  # type: ignore
+        poller = threading.Thread(target=self.poll, name="syspath-daemon-poll", daemon=True)
+        poller.start()
+        try:
+            self.server.serve_forever()
+        finally:
+            self.stopped.set()
+            self.server.server_close()
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+
+    def shutdown(self) -> None:
+        if self.server:
+            self.server.shutdown()
+
+
+def is_daemon_running(socket_path: Path) -> bool:
+    if not hasattr(socket, "AF_UNIX") or not socket_path.exists():
+        return False
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:  # pylint: disable=no-member
+        try:
+            client.connect(os.fspath(socket_path))
+        except OSError:
+            return False
+    return True
+
+
+def query_discovery_daemon(
+    project_dir: Path,
+    patterns: Iterable[str],
+    socket_path: Path = None,
+    timeout: float = DEFAULT_QUERY_TIMEOUT,
+) -> Optional[List[str]]:
+    """
+    :param project_dir: root of project
+    :param patterns: project_dir relative glob patterns of directories to discover
+    :param socket_path: default=get_daemon_socket_path()
+    :param timeout: seconds to wait on the daemon; its first query of a project discovers
+    :return: the src directories per a running discovery daemon; None if there is no daemon,
+    its index is stale or it failed, leaving discovery to the caller
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    socket_path = socket_path or get_daemon_socket_path()
+    if not socket_path.exists():
+        return None
+    request = {"project_dir": os.fspath(Path(project_dir).absolute()), "patterns": list(patterns)}
+    try:
+        # pylint: disable=no-member
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(timeout)
+            client.connect(os.fspath(socket_path))
+            client.sendall(json.dumps(request).encode() + b"\n")
+            with client.makefile("rb") as response_f:
+                response = json.loads(response_f.readline())
+    except (OSError, ValueError):
+        return None
+    srcdirs = response.get("srcdirs")
+    return srcdirs if isinstance(srcdirs, list) else None
+
+
+@click.command(
+    help="Serve each project's src directories over a Unix domain socket from an index kept in "
+    "memory and polled for changes. add_srcdirs_to_syspath(use_daemon=True) queries it, as does "
+    f"any add_srcdirs_to_syspath() while ${DAEMON_SOCKET_ENV_VAR} is set."
+)
+@click.option(
+    "--socket",
+    "-s",
+    "socket_path",
+    type=click.Path(dir_okay=False),
+    help=f"default=${DAEMON_SOCKET_ENV_VAR}, else {DAEMON_SOCKET_NAME} in the local cache "
+    f"directory",
+)
+@click.option(
+    "--interval",
+    "-i",
+    type=click.FloatRange(0.01),
+    default=DEFAULT_POLL_INTERVAL,
+    show_default=True,
+    help="seconds between checks of the indexed projects for changes",
+)
+def discovery_daemon_main(socket_path: Optional[str], interval: float):
+    if not hasattr(socket, "AF_UNIX"):
+        raise click.ClickException("Unix domain sockets are not supported on this platform.")
+    daemon = DiscoveryDaemon(
+        Path(socket_path) if socket_path else get_daemon_socket_path(), interval
+    )
+    click.echo(f"Serving src directories on {daemon.socket_path}")
+    try:
+        daemon.serve_forever()
+    except RuntimeError as ex:
+        raise click.ClickException(str(ex))
+    except KeyboardInterrupt:
+        pass
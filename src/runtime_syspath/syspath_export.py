@@ -0,0 +1,95 @@
+""" syspath_export module. """
+import atexit
+import os
+import shutil
+import site
+import sysconfig
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+EXPORT_PTH_NAME = "runtime_syspath_export.pth"
+
+# environment variable -> its value prior to the first export_syspath(); None if it was unset
+_PRIOR_ENVIRON: Dict[str, Optional[str]] = {}
+_EXPORT_USER_BASES: List[Path] = []
+
+
+def get_syspath_environ(paths: Iterable[str], environ: Dict[str, str] = None) -> Dict[str, str]:
+    """
+    Precompute the PYTHONPATH that has a child interpreter start with paths on its sys.path; pass
+    it to, e.g.: subprocess.run(..., env={**os.environ, **get_syspath_environ(paths)}).
+
+    :param paths: paths to add to sys.path of children
+    :param environ: environment the children would otherwise inherit; default=os.environ
+    :return: the environment variables to set for children
+    """
+    environ = os.environ if environ is None else environ
+    inherited_paths = [path for path in environ.get("PYTHONPATH", "").split(os.pathsep) if path]
+    return {"PYTHONPATH": os.pathsep.join(dict.fromkeys([*paths, *inherited_paths]))}
+
+
+def create_export_site(paths: Iterable[str]) -> Dict[str, str]:
+    """
+    Generate a temporary user base whose user site holds a .pth of paths. Children started with
+    PYTHONUSERBASE pointing at it process that .pth at interpreter start. The real user site is
+    carried over as a plain path entry; its own .pth files are not processed.
+
+    :param paths: paths to add to sys.path of children
+    :return: the environment variables to set for children
+    """
+    user_base = Path(tempfile.mkdtemp(prefix="runtime_syspath_"))
+    _EXPORT_USER_BASES.append(user_base)
+    scheme = (
+        sysconfig.get_preferred_scheme("user")  # type: ignore
+        if hasattr(sysconfig, "get_preferred_scheme")
+        else f"{os.name}_user"
+    )
+    site_dir = Path(sysconfig.get_path("purelib", scheme, vars={"userbase": os.fspath(user_base)}))
+    site_dir.mkdir(parents=True)
+    pth_paths = list(paths)
+    if os.path.isdir(site.getusersitepackages()):
+        pth_paths.append(site.getusersitepackages())
+    (site_dir / EXPORT_PTH_NAME).write_text("".join(f"{path}\n" for path in pth_paths))
+    return {"PYTHONUSERBASE": os.fspath(user_base)}
+
+
+def export_syspath(paths: Iterable[str], use_pth: bool = False) -> Dict[str, str]:
+    """
+    Have every child interpreter started hereafter (subprocess.run([sys.executable, ...]),
+    multiprocessing workers, ...) begin with paths on its sys.path: no tree walk and no
+    runtime_syspath import within the child. Exported environment variables are restored and the
+    generated site removed at exit, or earlier with unexport_syspath().
+
+    Exported paths are typically those discovered once with discover_srcdirs().
+
+    :param paths: paths to add to sys.path of children
+    :param use_pth: export as a .pth within a generated user site rather than PYTHONPATH. The
+    user site is disabled within virtualenvs, so PYTHONPATH is exported there regardless.
+    :return: the environment variables exported
+    """
+    if use_pth and site.ENABLE_USER_SITE:
+        exported_environ = create_export_site(paths)
+    else:
+        exported_environ = get_syspath_environ(paths)
+
+    if not _PRIOR_ENVIRON:
+        atexit.register(unexport_syspath)
+    for name, value in exported_environ.items():
+        _PRIOR_ENVIRON.setdefault(name, os.environ.get(name))
+        os.environ[name] = value
+    return exported_environ
+
+
+def unexport_syspath() -> None:
+    """
+    Undo all export_syspath().
+    """
+    for name, value in _PRIOR_ENVIRON.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+    _PRIOR_ENVIRON.clear()
+    while _EXPORT_USER_BASES:
+        shutil.rmtree(_EXPORT_USER_BASES.pop(), ignore_errors=True)
@@ -0,0 +1,221 @@
+""" syspath_freeze module. """
+import os
+import sys
+import threading
+import warnings
+from importlib.machinery import ModuleSpec, PathFinder
+from typing import Callable, Dict, List, Optional
+
+from .syspath_sleuth import SysPathSleuth
+
+FREEZE_ON_MUTATION = ("raise", "warn")
+
+# The list sys.path was prior to freeze_syspath() if a different list; restored by unfreeze.
+_PRIOR_SYSPATH: List[list] = []
+_PRIOR_SYSPATH_CLASS: List[type] = []
+_FREEZE_LOCK = threading.Lock()
+
+
+class FrozenSysPathError(RuntimeError):
+    pass
+
+
+class FrozenSysPath(SysPathSleuth):
+    """
+    sys.path once frozen: each mutation SysPathSleuth would report is rejected, or warned about,
+    instead; if sys.path was a SysPathSleuth, once reported as it would. The mutations
+    SysPathSleuth does not report are covered as well. Disabling or enabling its sleuthing does
+    nothing until unfrozen.
+    """
+
+    on_mutation = "raise"
+    # _where() of the sleuth sys.path was, frozen in place: of its own class if installed by
+    # sitecustomize or usercustomize
+    prior_where: Optional[Callable] = None
+
+    @classmethod
+    def _where(cls, action, args, caller_depth: int = 2):
+        if cls.prior_where is not None:
+            cls.prior_where(action, args, caller_depth + 1)  # pylint: disable=not-callable
+        message = f"sys.path is frozen: sys.path.{action}{args}"
+        if cls.on_mutation == "raise":
+            raise FrozenSysPathError(message)
+        # The mutation goes ahead, so where modules are found may change.
+        MemoizingPathFinder.forget()
+        # caller_depth counts from this frame; warnings' stacklevel from its caller's.
+        warnings.warn(message, RuntimeWarning, stacklevel=caller_depth + 1)
+
+    def __iadd__(self, *args):
+        self._where("__iadd__", args)
+        return super().__iadd__(*args)
+
+    def __imul__(self, *args):
+        self._where("__imul__", args)
+        return super().__imul__(*args)
+
+    def clear(self, *args):
+        self._where("clear", args)
+        return super().clear(*args)
+
+    def reverse(self, *args):
+        self._where("reverse", args)
+        return super().reverse(*args)
+
+    def sort(self, *args, **kwargs):
+        self._where("sort", args)
+        return super().sort(*args, **kwargs)
+
+    def enable(self) -> None:
+        pass
+
+    def disable(self) -> None:
+        pass
+
+
+class MemoizingPathFinder(PathFinder):
+    """
+    Stands in for PathFinder while sys.path is frozen. The sys.path entry each top-level module
+    was found on is memoized, so that later finds of it search that entry alone, as are the names
+    found on no entry, which are then not searched for at all. A package's submodules are found
+    by PathFinder as usual since its __path__ may change.
+    """
+
+    # module name -> sys.path entry it was found on; None if found on none
+    entries: Dict[str, Optional[str]] = {}
+    # absolute path of each sys.path entry -> the entry, the first if repeated; indexed once frozen
+    entry_paths: Optional[Dict[str, str]] = None
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def invalidate_caches(cls):
+        cls.forget()
+        super().invalidate_caches()
+
+    @classmethod
+    def forget(cls) -> None:
+        """
+        Forget where modules were found, and sys.path's entries, as when sys.path changes.
+        """
+        cls.entries.clear()
+        cls.entry_paths = None
+
+    @classmethod
+    def index_entries(cls) -> Dict[str, str]:
+        """
+        :return: entry_paths, of sys.path as is
+        """
+        cls.entry_paths = {
+            os.path.abspath(entry or os.curdir): entry
+            for entry in reversed(sys.path)
+            if isinstance(entry, str)
+        }
+        return cls.entry_paths
+
+    @classmethod
+    def find_spec(cls, fullname, path=None, target=None) -> Optional[ModuleSpec]:
+        if path is not None or not isinstance(sys.path, FrozenSysPath):
+            return super().find_spec(fullname, path, target)
+
+        if fullname in cls.entries:
+            entry = cls.entries[fullname]
+            if entry is None:
+                cls.hits += 1
+                return None
+            spec = super().find_spec(fullname, [entry], target)
+            if spec is not None and spec.loader is not None:
+                cls.hits += 1
+                return spec
+            # Removed since; or a namespace portion that a full search may resolve differently.
+
+        cls.misses += 1
+        spec = super().find_spec(fullname, None, target)
+        if spec is None:
+            cls.entries[fullname] = None
+        elif spec.loader is not None and spec.has_location and spec.origin:
+            entry = cls._get_entry(spec)
+            if entry is not None:
+                cls.entries[fullname] = entry
+        return spec
+
+    @classmethod
+    def _get_entry(cls, spec: ModuleSpec) -> Optional[str]:
+        """
+        :param spec: a top-level module's, found on sys.path
+        :return: the sys.path entry spec was found on: the directory holding its file or, for a
+        package, its directory; even if another entry is nested within that one, or it in another
+        """
+        entry_path = os.path.dirname(spec.origin)  # type: ignore
+        if spec.submodule_search_locations is not None:
+            entry_path = os.path.dirname(entry_path)
+        entry_paths = cls.entry_paths if cls.entry_paths is not None else cls.index_entries()
+        return entry_paths.get(os.path.abspath(entry_path))
+
+
+def is_syspath_frozen() -> bool:
+    return isinstance(sys.path, FrozenSysPath)
+
+
+def _get_sleuth_where(syspath_class: type) -> Optional[Callable]:
+    """
+    :return: syspath_class's _where() if a sleuth's, enabled: not necessarily a SysPathSleuth
+    subclass of this package's, such as one sitecustomize or usercustomize installed
+    """
+    if hasattr(syspath_class, "_where") and hasattr(syspath_class, "get_base_list"):
+        return syspath_class._where  # pylint: disable=protected-access
+    return None
+
+
+def freeze_syspath(on_mutation: str = "raise", memoize: bool = True) -> None:
+    """
+    Make sys.path read-only once it is complete: e.g., after add_srcdirs_to_syspath() and plugins
+    have started. sys.path is frozen in place when a SysPathSleuth, else replaced by a frozen copy;
+    assigning sys.path anew unfreezes it. Once frozen, sys.path cannot affect where a module
+    is found, so where each top-level module was found, or not found, is memoized.
+
+    :param on_mutation: 'raise' a FrozenSysPathError, or 'warn' with a RuntimeWarning and mutate
+    :param memoize: replace PathFinder within sys.meta_path with MemoizingPathFinder
+    """
+    if on_mutation not in FREEZE_ON_MUTATION:
+        raise ValueError(f"on_mutation must be one of {FREEZE_ON_MUTATION}: {on_mutation}")
+    with _FREEZE_LOCK:
+        FrozenSysPath.on_mutation = on_mutation
+        if not is_syspath_frozen():
+            syspath = sys.path
+            try:
+                prior_class = type(syspath)
+                # In place, so that references to sys.path see it frozen as well.
+                syspath.__class__ = FrozenSysPath
+                FrozenSysPath.prior_where = _get_sleuth_where(prior_class)
+                _PRIOR_SYSPATH_CLASS[:] = [prior_class]
+                _PRIOR_SYSPATH.clear()
+            except TypeError:
+                # A list's __class__ cannot be assigned.
+                _PRIOR_SYSPATH[:] = [syspath]
+                _PRIOR_SYSPATH_CLASS.clear()
+                FrozenSysPath.prior_where = None
+                sys.path = FrozenSysPath(syspath)
+        if memoize:
+            MemoizingPathFinder.forget()
+            MemoizingPathFinder.index_entries()
+            sys.meta_path[:] = [
+                MemoizingPathFinder if finder is PathFinder else finder for finder in sys.meta_path
+            ]
+
+
+def unfreeze_syspath() -> None:
+    with _FREEZE_LOCK:
+        sys.meta_path[:] = [
+            PathFinder if finder is MemoizingPathFinder else finder for finder in sys.meta_path
+        ]
+        MemoizingPathFinder.forget()
+        if not is_syspath_frozen():
+            return
+        if _PRIOR_SYSPATH_CLASS:
+            sys.path.__class__ = _PRIOR_SYSPATH_CLASS.pop()
+        elif _PRIOR_SYSPATH:
+            prior_syspath = _PRIOR_SYSPATH.pop()
+            prior_syspath[:] = list(sys.path)
+            sys.path = prior_syspath
+        else:
+            sys.path = list(sys.path)
@@ -0,0 +1,158 @@
+""" syspath_importer_cache module. """
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from importlib.machinery import FileFinder
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Never importable; asking a FileFinder for it lists the finder's directory.
+PREWARM_MODULE_NAME = "__runtime_syspath_prewarm__"
+
+# An entry changed within this long of being listed may change again without its mtime changing;
+# FAT's mtime granularity, the coarsest of local filesystems'.
+MTIME_GRANULARITY_NS = 2_000_000_000
+
+# sys.path entry -> (st_mtime_ns, st_size, st_ino) of the entry when its finder last listed it,
+# and the time_ns() it was listed at
+_LISTED_STATS: Dict[str, Tuple[Tuple[int, int, int], int]] = {}
+_STATS_LOCK = threading.Lock()
+IMPORTER_CACHE_STATS: Dict[str, int] = {
+    # finders created and filled ahead of the first import from their entry
+    "prewarmed": 0,
+    # finders invalidated since their entry changed
+    "invalidated": 0,
+    # finders left filled by invalidate_importer_caches() that importlib.invalidate_caches()
+    # would have invalidated; each saves a directory listing on the next import miss
+    "listings_saved": 0,
+}
+
+
+def get_importer_cache_stats() -> Dict[str, int]:
+    with _STATS_LOCK:
+        return dict(IMPORTER_CACHE_STATS)
+
+
+def _count(name: str, count: int = 1) -> None:
+    with _STATS_LOCK:
+        IMPORTER_CACHE_STATS[name] += count
+
+
+def _stat_entry(path: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+def _is_listing_racy(entry_stat: Tuple[int, int, int], listed_ns: int) -> bool:
+    """
+    :return: whether the entry was changed within a mtime tick of its listing, so that a change
+    since may have left entry_stat as is
+    """
+    return listed_ns - entry_stat[0] < MTIME_GRANULARITY_NS
+
+
+def _create_finder(path: str) -> Tuple[Any, Optional[Tuple[int, int, int]], int]:
+    """
+    Create the finder for path as sys.path_hooks would on the first import and, if a FileFinder,
+    have it list its directory.
+
+    :return: (finder or None, stat of path prior to the listing, time_ns() of the stat)
+    """
+    listed_ns = time.time_ns()
+    entry_stat = _stat_entry(path)
+    for path_hook in sys.path_hooks:
+        try:
+            finder = path_hook(path)
+        except ImportError:
+            continue
+        if isinstance(finder, FileFinder):
+            finder.find_spec(PREWARM_MODULE_NAME)
+        return finder, entry_stat, listed_ns
+    return None, entry_stat, listed_ns
+
+
+def prewarm_importer_cache(paths: Iterable[str], max_workers: Optional[int] = None) -> int:
+    """
+    Create, ahead of the first import, the sys.path_importer_cache entries of those of paths
+    without one; directory entries' FileFinders list their directory now, rather than within the
+    import hot path. Listing is I/O bound, so many paths are prewarmed on a thread pool.
+
+    :param paths: sys.path entries; typically just added by add_paths_to_syspath()
+    :param max_workers: default=a thread per path, at most 32; 1 prewarms within this thread
+    :return: number of finders created
+    """
+    paths = [path for path in dict.fromkeys(paths) if path not in sys.path_importer_cache]
+    if len(paths) > 1 and max_workers != 1:
+        with ThreadPoolExecutor(max_workers or min(32, len(paths))) as executor:
+            finders = list(executor.map(_create_finder, paths))
+    else:
+        finders = [_create_finder(path) for path in paths]
+
+    for path, (finder, entry_stat, listed_ns) in zip(paths, finders):
+        # The import system may have created a finder meanwhile; keep it.
+        sys.path_importer_cache.setdefault(path, finder)
+        if entry_stat and sys.path_importer_cache[path] is finder:
+            _LISTED_STATS[path] = entry_stat, listed_ns
+    _count("prewarmed", len(paths))
+    return len(paths)
+
+
+def invalidate_importer_caches(paths: Iterable[str] = None) -> List[str]:
+    """
+    A selective importlib.invalidate_caches(): only the finders of entries changed since listed
+    are invalidated, so unchanged directories are not listed again on the next import miss. An
+    entry is changed if its mtime, size or inode differ from when it was prewarmed or last
+    invalidated; for other FileFinders, if its mtime differs from the one the finder listed at.
+    As FileFinder itself cannot tell two changes within one mtime tick apart, an entry whose mtime
+    was within MTIME_GRANULARITY_NS of its listing (for other FileFinders, of now) is changed too.
+    Relative entries, and negative (None) entries whose path now exists, are dropped as
+    importlib.invalidate_caches() drops them. Unlike it, neither meta path finders nor namespace
+    packages' paths are invalidated; call it when a namespace package gains a portion.
+
+    :param paths: sys.path_importer_cache entries to consider; default=all
+    :return: the entries invalidated or dropped
+    """
+    invalidated: List[str] = []
+    kept_count = 0
+    for path in list(sys.path_importer_cache if paths is None else paths):
+        finder = sys.path_importer_cache.get(path, False)
+        if finder is False:
+            continue
+        if not os.path.isabs(path) or (finder is None and os.path.exists(path)):
+            del sys.path_importer_cache[path]
+            invalidated.append(path)
+            continue
+        if not hasattr(finder, "invalidate_caches"):
+            continue
+
+        now_ns = time.time_ns()
+        try:
+            stat: Optional[os.stat_result] = os.stat(path)
+        except OSError:
+            stat = None
+        entry_stat = (stat.st_mtime_ns, stat.st_size, stat.st_ino) if stat else None
+        if path in _LISTED_STATS:
+            listed_stat, listed_ns = _LISTED_STATS[path]
+            changed = entry_stat != listed_stat or _is_listing_racy(listed_stat, listed_ns)
+        elif stat and entry_stat and isinstance(finder, FileFinder):
+            # The mtime FileFinder.find_spec() last listed its directory at; when it listed is
+            # unknown, so now stands in for it.
+            changed = stat.st_mtime != getattr(finder, "_path_mtime", -1) or _is_listing_racy(
+                entry_stat, now_ns
+            )
+        else:
+            changed = True
+        if changed:
+            finder.invalidate_caches()
+            invalidated.append(path)
+            if entry_stat:
+                _LISTED_STATS[path] = entry_stat, now_ns
+        else:
+            kept_count += 1
+    _count("invalidated", len(invalidated))
+    _count("listings_saved", kept_count)
+    return invalidated
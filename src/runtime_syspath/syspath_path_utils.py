@@ -3,6 +3,8 @@ import sys
 from pathlib import Path, PurePath
 from typing import List
 
+from .syspath_snapshot import get_loaded_snapshot
+
 PROJECT_ROOT_DIR = None
 
 
@@ -11,7 +13,9 @@ def get_project_root_dir(
 ) -> PurePath:
     """
     If known_root is not provided, make an attempt to figure it out the project root looking for
-    a .git, src, or tests directory in the parental directories of CWD.
+    a .git, src, or tests directory in the parental directories of CWD. Within a process that
+    loaded a syspath_snapshot, the snapshot's project root is returned without looking if CWD is
+    within it.
 
     :param user_provided_project_root_dir:
     :param find_dirs:
@@ -22,6 +26,14 @@ def get_project_root_dir(
     if PROJECT_ROOT_DIR:
         return PROJECT_ROOT_DIR
 
+    snapshot = get_loaded_snapshot()
+    if snapshot:
+        snapshot_root = Path(snapshot.project_root)
+        cwd = Path.cwd()
+        if cwd == snapshot_root or snapshot_root in cwd.parents:
+            PROJECT_ROOT_DIR = snapshot_root
+            return PROJECT_ROOT_DIR
+
     def find_project_root(original_test: Path, find_dirs=(".git", "src", "tests")) -> Path:
         """
         Search all parents of each dirs in succession, e.g.: all parents of for '.git' then all
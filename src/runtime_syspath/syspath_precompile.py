@@ -0,0 +1,189 @@
+""" syspath_precompile module. """
+import importlib.util
+import os
+import py_compile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from py_compile import PycInvalidationMode
+from typing import Iterable, List, NamedTuple, Optional, Tuple, Union
+
+import click
+
+from .relative_import_checker import find_source_files
+from .syspath_path_utils import get_project_root_dir
+from .syspath_utils import DEFAULT_SRCDIR_PATTERNS, discover_srcdirs
+
+# .pyc header flags per invalidation mode; see PEP 552
+PYC_FLAGS = {
+    PycInvalidationMode.TIMESTAMP: 0b00,
+    PycInvalidationMode.UNCHECKED_HASH: 0b01,
+    PycInvalidationMode.CHECKED_HASH: 0b11,
+}
+INVALIDATION_MODE_NAMES = {
+    "timestamp": PycInvalidationMode.TIMESTAMP,
+    "checked-hash": PycInvalidationMode.CHECKED_HASH,
+    "unchecked-hash": PycInvalidationMode.UNCHECKED_HASH,
+}
+PYC_HEADER_SIZE = 16
+# Stale files, at least, to compile on a process pool; fewer compile faster than a pool starts.
+POOL_THRESHOLD = 8
+COMPILED, FAILED = "compiled", "failed"
+
+
+class PrecompileResult(NamedTuple):
+    files: int
+    compiled: int
+    current: int
+    failed: List[str]
+    # Wall clock time precompiling took
+    seconds: float
+    # Time compiling the files compiled took
+    compile_seconds: float
+
+
+def get_default_invalidation_mode() -> PycInvalidationMode:
+    """
+    :return: as py_compile's default: checked-hash if $SOURCE_DATE_EPOCH is set (reproducible
+    builds), else timestamp
+    """
+    if os.getenv("SOURCE_DATE_EPOCH"):
+        return PycInvalidationMode.CHECKED_HASH
+    return PycInvalidationMode.TIMESTAMP
+
+
+def is_pyc_current(source_path: str, invalidation_mode: PycInvalidationMode) -> bool:
+    """
+    :param source_path: python file
+    :param invalidation_mode: a hash-based mode is only satisfied by a .pyc of that mode;
+    timestamp by any the import system would load
+    :return: whether source_path's __pycache__ entry would be loaded rather than recompiled
+    """
+    try:
+        with open(importlib.util.cache_from_source(source_path), "rb") as pyc_f:
+            header = pyc_f.read(PYC_HEADER_SIZE)
+        stat = os.stat(source_path)
+    except (OSError, ValueError):
+        return False
+    if len(header) < PYC_HEADER_SIZE or header[:4] != importlib.util.MAGIC_NUMBER:
+        return False
+    flags = int.from_bytes(header[4:8], "little")
+    if invalidation_mode != PycInvalidationMode.TIMESTAMP and flags != PYC_FLAGS[invalidation_mode]:
+        return False
+    if flags & 0b01:
+        # Hash-based; an unchecked .pyc would be loaded even if stale, so check it too.
+        try:
+            with open(source_path, "rb") as source_f:
+                return header[8:16] == importlib.util.source_hash(source_f.read())
+        except OSError:
+            return False
+    return (
+        int.from_bytes(header[8:12], "little") == int(stat.st_mtime) & 0xFFFFFFFF
+        and int.from_bytes(header[12:16], "little") == stat.st_size & 0xFFFFFFFF
+    )
+
+
+def precompile_file(source_path: str, invalidation_mode: PycInvalidationMode) -> Tuple[str, float]:
+    """
+    Module-level, so picklable, for the process pool.
+
+    :return: COMPILED or FAILED; seconds compiling
+    """
+    start = time.perf_counter()
+    try:
+        py_compile.compile(source_path, doraise=True, invalidation_mode=invalidation_mode)
+    except (py_compile.PyCompileError, OSError):
+        # Leave it to the import to report.
+        return FAILED, 0.0
+    return COMPILED, time.perf_counter() - start
+
+
+def precompile_srcdirs(
+    srcdirs: Iterable[str],
+    invalidation_mode: Union[PycInvalidationMode, str, None] = None,
+    max_workers: Optional[int] = None,
+) -> PrecompileResult:
+    """
+    Compile each python file under srcdirs to its __pycache__ entry ahead of its first import;
+    files whose entry is current are skipped. The rest are compiled on a process pool if
+    POOL_THRESHOLD or more, else within this process. Hash-based .pyc stay current across
+    checkouts that reset mtimes, e.g.: CI's.
+
+    :param srcdirs: sys.path entries; typically discovered by discover_srcdirs()
+    :param invalidation_mode: 'timestamp', 'checked-hash' or 'unchecked-hash'; default=as
+    py_compile's
+    :param max_workers: default=number of CPUs; 1 compiles within this process
+    :return: files found, compiled and current, those that failed to compile and times
+    """
+    start = time.perf_counter()
+    if isinstance(invalidation_mode, str):
+        invalidation_mode = INVALIDATION_MODE_NAMES[invalidation_mode]
+    invalidation_mode = invalidation_mode or get_default_invalidation_mode()
+    source_paths = sorted(find_source_files(srcdirs))
+    # Reading a .pyc header is far cheaper than handing the file to a worker.
+    stale_paths = [path for path in source_paths if not is_pyc_current(path, invalidation_mode)]
+    modes = [invalidation_mode] * len(stale_paths)
+    if len(stale_paths) >= POOL_THRESHOLD and max_workers != 1:
+        max_workers = max_workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers) as executor:
+            chunksize = max(1, len(stale_paths) // (max_workers * 4))
+            outcomes = list(executor.map(precompile_file, stale_paths, modes, chunksize=chunksize))
+    else:
+        outcomes = [precompile_file(path, mode) for path, mode in zip(stale_paths, modes)]
+
+    statuses = [status for status, _ in outcomes]
+    return PrecompileResult(
+        len(source_paths),
+        statuses.count(COMPILED),
+        len(source_paths) - len(stale_paths),
+        [path for path, status in zip(stale_paths, statuses) if status == FAILED],
+        time.perf_counter() - start,
+        sum(seconds for _, seconds in outcomes),
+    )
+
+
+def format_precompile_result(result: PrecompileResult) -> str:
+    return (
+        f"{result.files} file(s): {result.compiled} compiled, {result.current} current, "
+        f"{len(result.failed)} failed in {result.seconds * 1000:.3f}ms; "
+        f"{result.compile_seconds * 1000:.3f}ms compile time"
+    )
+
+
+@click.command(
+    help="Compile each python file within the project's src directories to its __pycache__ "
+    "entry ahead of its first import; files whose entry is current are skipped."
+)
+@click.option(
+    "--project-dir",
+    "-d",
+    type=click.Path(exists=True, file_okay=False),
+    help="default=discover the project root",
+)
+@click.option(
+    "--pattern",
+    "-p",
+    "patterns",
+    multiple=True,
+    help=f"project root relative glob of src directories; repeatable. "
+    f"default={' '.join(DEFAULT_SRCDIR_PATTERNS)}",
+)
+@click.option(
+    "--invalidation-mode",
+    type=click.Choice(list(INVALIDATION_MODE_NAMES)),
+    help="default=checked-hash if $SOURCE_DATE_EPOCH is set, else timestamp; checked-hash .pyc "
+    "survive checkouts that reset mtimes",
+)
+@click.option("--jobs", "-j", type=click.IntRange(1), help="default=number of CPUs")
+def precompile_main(
+    project_dir: Optional[str],
+    patterns: Tuple[str, ...],
+    invalidation_mode: Optional[str],
+    jobs: Optional[int],
+):
+    project_path = Path(project_dir) if project_dir else Path(get_project_root_dir())
+    srcdirs = discover_srcdirs(project_path.absolute(), patterns or DEFAULT_SRCDIR_PATTERNS)
+    result = precompile_srcdirs(srcdirs, invalidation_mode, jobs)
+    for path in result.failed:
+        click.echo(f"{path}: does not compile", err=True)
+    click.echo(format_precompile_result(result))
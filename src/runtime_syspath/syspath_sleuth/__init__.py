@@ -1,3 +1,4 @@
+import ast
 import atexit
 import importlib
 import inspect
@@ -5,10 +6,13 @@ import logging
 import os
 import shutil
 import site
+import subprocess
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from importlib import reload
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
 
 import click
 import importlib_metadata
@@ -19,6 +23,21 @@ from .syspath_sleuth import SysPathSleuth
 
 PRE_SLEUTH_SUFFIX = ".pre_sleuth"
 REVERSE_PATCH_SUFFIX = ".patch"
+PYVENV_CFG = "pyvenv.cfg"
+
+# Run with '-S' so that resolving a non-virtualenv interpreter's customize path does not pay for
+# the very site processing (.pth files, customize modules) being resolved.
+CUSTOMIZE_PATH_QUERY = (
+    "import site\n"
+    "if site.check_enableusersite():\n"
+    "    print('user', site.getusersitepackages())\n"
+    "else:\n"
+    "    site_dirs = site.getsitepackages()\n"
+    "    # Debian/Ubuntu system interpreters only have dist-packages.\n"
+    "    print('system', next((s for s in site_dirs if 'site-packages' in s), site_dirs[0]))\n"
+)
+# Relative to a virtualenv's, or an installation's, root
+INTERPRETER_CANDIDATES = ("bin/python3", "bin/python", "Scripts/python.exe", "python.exe")
 
 error_logger: logging.Logger = logging.getLogger(f"{__name__}.error")
 error_logger.addHandler(logging.StreamHandler(sys.stderr))
@@ -35,6 +54,20 @@ class UninstallError(RuntimeError):
     pass
 
 
+class SleuthEnvironment(NamedTuple):
+    location: Path
+    customize_path: Path
+    is_user_path: bool
+
+
+class SleuthEnvironmentResult(NamedTuple):
+    location: Path
+    customize_path: Optional[Path]
+    is_user_path: bool
+    status: str
+    seconds: float
+
+
 def append_sleuth_to_customize(customize_path: Path, syspath_sleuth_path: Optional[Path] = None):
     sleuth_logger.info(
         "Appending %s to site customize: %s",
@@ -194,6 +227,26 @@ def get_relative_path(path: Path) -> Path:
     return sleuth_path
 
 
+def write_sleuth_to_customize(customize_path: Path, syspath_sleuth_path: Optional[Path] = None):
+    """
+    (Re)write a SysPathSleuth into customize_path along with the reverse patch used to remove it.
+    Only files are touched; nothing is imported into the running interpreter, so this works for
+    any interpreter's customize module.
+
+    :param customize_path: user or system site customize module
+    :param syspath_sleuth_path: optional path to a user's implementation of a SysPathSleuth
+    """
+    if customize_path.exists():
+        reverse_patch_sleuth(customize_path)
+
+    # A user site need not exist until something is installed into it.
+    customize_path.parent.mkdir(parents=True, exist_ok=True)
+    create_site_customize(customize_path)
+    copy_site_customize(customize_path)
+    append_sleuth_to_customize(customize_path, syspath_sleuth_path)
+    create_reverse_sleuth_patch(customize_path)
+
+
 def inject_sleuth(syspath_sleuth_path: Optional[Path] = None):
 
     customize_path, is_user_path = get_customize_path()
@@ -203,12 +256,8 @@ def inject_sleuth(syspath_sleuth_path: Optional[Path] = None):
         sleuth_logger.warning(
             "Reinstalling %s in %s site...", name, "user" if is_user_path else "system"
         )
-        reverse_patch_sleuth(customize_path)
 
-    create_site_customize(customize_path)
-    copy_site_customize(customize_path)
-    append_sleuth_to_customize(customize_path, syspath_sleuth_path)
-    create_reverse_sleuth_patch(customize_path)
+    write_sleuth_to_customize(customize_path, syspath_sleuth_path)
 
     # Determine if the customize site was updated to wrap sys.path with a SysPathSleuth.
     if site.ENABLE_USER_SITE and site.check_enableusersite():
@@ -219,9 +268,13 @@ def inject_sleuth(syspath_sleuth_path: Optional[Path] = None):
     class_names: Tuple[str] = tuple(
         x[0] for x in inspect.getmembers(customize_module, inspect.isclass)
     )
-    if "SysPathSleuth" not in class_names or not isinstance(
-        sys.path, customize_module.SysPathSleuth
-    ):
+    # Possibly started disabled; see $SYSPATH_SLEUTH_DISABLED.
+    sleuth_classes = tuple(
+        getattr(customize_module, name)
+        for name in ("SysPathSleuth", "DisabledSysPathSleuth")
+        if name in class_names
+    )
+    if "SysPathSleuth" not in class_names or not isinstance(sys.path, sleuth_classes):
         # The file loaded doesn't wrap sys.path with a SysPathSleuth
         sleuth_logger.setLevel(logging.ERROR)
         reverse_patch_sleuth(customize_path)
@@ -255,6 +308,282 @@ def uninstall_sleuth():
     )
 
 
+def read_pyvenv_cfg(venv_dir: Path) -> Dict[str, str]:
+    """
+    Parse a virtualenv's pyvenv.cfg 'key = value' lines.
+
+    :param venv_dir: root of a virtualenv
+    :return: mapping of pyvenv.cfg keys to values
+    """
+    pyvenv_cfg: Dict[str, str] = {}
+    with (venv_dir / PYVENV_CFG).open() as pyvenv_cfg_f:
+        for line in pyvenv_cfg_f:
+            key, separator, value = line.partition("=")
+            if separator:
+                pyvenv_cfg[key.strip().lower()] = value.strip()
+    return pyvenv_cfg
+
+
+def get_venv_root(location: Path) -> Optional[Path]:
+    """
+    :param location: a virtualenv directory or an interpreter within one (bin/ or Scripts/)
+    :return: root of the virtualenv or None if location is not within a virtualenv
+    """
+    candidates = [location] if location.is_dir() else [location.parent.parent]
+    for candidate in candidates:
+        if (candidate / PYVENV_CFG).is_file():
+            return candidate
+    return None
+
+
+def get_interpreter(root_dir: Path) -> Optional[Path]:
+    """
+    :param root_dir: root of a virtualenv or installation, e.g.: ~/.pyenv/versions/3.9.1
+    :return: its interpreter or None if it has none
+    """
+    for candidate in INTERPRETER_CANDIDATES:
+        interpreter = root_dir / candidate
+        if interpreter.is_file():
+            return interpreter
+    return None
+
+
+def is_venv_user_site_enabled(venv_dir: Path) -> bool:
+    """
+    site only disables the user site within a virtualenv isolated from the system site-packages.
+
+    :param venv_dir: root of a virtualenv
+    """
+    include = read_pyvenv_cfg(venv_dir).get("include-system-site-packages", "false")
+    return include.lower() == "true"
+
+
+def get_venv_site_packages(venv_dir: Path) -> Path:
+    """
+    Derive a virtualenv's site-packages from its pyvenv.cfg and directory layout without starting
+    its interpreter.
+
+    :param venv_dir: root of a virtualenv
+    :return: the virtualenv's site-packages directory
+    """
+    pyvenv_cfg = read_pyvenv_cfg(venv_dir)
+    version = pyvenv_cfg.get("version_info") or pyvenv_cfg.get("version", "")
+    major_minor = ".".join(version.split(".")[:2])
+    candidates: List[Path] = [venv_dir / "Lib" / "site-packages"]
+    if major_minor:
+        candidates.insert(0, venv_dir / "lib" / f"python{major_minor}" / "site-packages")
+    candidates.extend(sorted(venv_dir.glob("lib/*/site-packages")))
+    for candidate in candidates:
+        if candidate.is_dir():
+            return candidate
+    raise InstallError(f"No site-packages found in virtualenv: {venv_dir}")
+
+
+def resolve_sleuth_environment(location: Path) -> SleuthEnvironment:
+    """
+    Resolve which customize module SysPathSleuth belongs in for an interpreter or virtualenv.
+    A virtualenv isolated from the system site-packages (the default) does not enable the user
+    site, so its sitecustomize is read directly from pyvenv.cfg and the site layout. Any other
+    interpreter, including one of a virtualenv with 'include-system-site-packages = true', is
+    started (once, with site processing disabled) to ask where its user or system site is.
+
+    :param location: an interpreter executable or virtualenv directory
+    :return: the resolved SleuthEnvironment
+    """
+    venv_dir = get_venv_root(location)
+    if venv_dir and not is_venv_user_site_enabled(venv_dir):
+        customize_path = get_venv_site_packages(venv_dir) / "sitecustomize.py"
+        return SleuthEnvironment(location, customize_path, False)
+
+    interpreter = get_interpreter(location) if location.is_dir() else location
+    if interpreter is None:
+        raise InstallError(f"Neither an interpreter nor a virtualenv: {location}")
+
+    completed = subprocess.run(
+        [os.fspath(interpreter), "-S", "-c", CUSTOMIZE_PATH_QUERY],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=False,
+    )
+    if completed.returncode != 0:
+        raise InstallError(f"Unable to query {location}: {completed.stderr.strip()}")
+    site_kind, _, site_dir = completed.stdout.strip().partition(" ")
+    is_user_path = site_kind == "user"
+    customize_name = "usercustomize.py" if is_user_path else "sitecustomize.py"
+    return SleuthEnvironment(location, Path(site_dir) / customize_name, is_user_path)
+
+
+def find_venvs(venvs_dir: Path) -> List[Path]:
+    """
+    :param venvs_dir: directory containing virtualenvs or installations, e.g.: ~/.virtualenvs or
+    ~/.pyenv/versions
+    :return: each sub-directory of venvs_dir that is a virtualenv or contains an interpreter
+    """
+    return sorted(
+        path
+        for path in venvs_dir.iterdir()
+        if (path / PYVENV_CFG).is_file() or get_interpreter(path)
+    )
+
+
+def verify_custom_sleuth(syspath_sleuth_path: Path) -> None:
+    """
+    A bulk (un)install cannot import a custom SysPathSleuth into each target interpreter to
+    verify it. Settle for verifying that it at least declares a SysPathSleuth class.
+
+    :param syspath_sleuth_path: path to a user's implementation of a SysPathSleuth
+    """
+    with syspath_sleuth_path.open() as syspath_sleuth_f:
+        module = ast.parse(syspath_sleuth_f.read(), os.fspath(syspath_sleuth_path))
+    for node in module.body:
+        if isinstance(node, ast.ClassDef) and node.name == SysPathSleuth.__name__:
+            return
+    raise InstallError(f"{syspath_sleuth_path} does not declare a {SysPathSleuth.__name__} class.")
+
+
+def _resolve_sleuth_environment(location: Path) -> Tuple[Optional[SleuthEnvironment], str, float]:
+    """
+    resolve_sleuth_environment() within a bulk worker process; failures are reported rather than
+    raised.
+
+    :return: the SleuthEnvironment, else None and a failed status; seconds taken
+    """
+    start = time.perf_counter()
+    # pylint: disable=broad-except
+    try:
+        return resolve_sleuth_environment(location), "", time.perf_counter() - start
+    except Exception as ex:
+        return None, f"failed: {ex}", time.perf_counter() - start
+
+
+def sleuth_customize(
+    customize_path: Path, inject: bool, syspath_sleuth_path: Optional[Path] = None
+) -> Tuple[str, float]:
+    """
+    (Un)install SysPathSleuth into a single customize module. Run within a bulk worker process;
+    failures are reported in the status rather than raised.
+
+    :param customize_path: user or system site customize module
+    :param inject: inject when True, uninstall when False
+    :param syspath_sleuth_path: optional path to a user's implementation of a SysPathSleuth
+    :return: the status; seconds taken
+    """
+    start = time.perf_counter()
+    # pylint: disable=broad-except
+    try:
+        was_installed = customize_path.with_suffix(REVERSE_PATCH_SUFFIX).exists()
+        if inject:
+            write_sleuth_to_customize(customize_path, syspath_sleuth_path)
+            status = "reinjected" if was_installed else "injected"
+        elif was_installed:
+            reverse_patch_sleuth(customize_path)
+            status = "uninstalled"
+        else:
+            status = "not installed"
+    except Exception as ex:
+        status = f"failed: {ex}"
+    return status, time.perf_counter() - start
+
+
+def sleuth_environment(
+    location: Path, inject: bool, syspath_sleuth_path: Optional[Path] = None
+) -> SleuthEnvironmentResult:
+    """
+    (Un)install SysPathSleuth into a single interpreter or virtualenv; failures are reported in
+    the result rather than raised.
+
+    :param location: an interpreter executable or virtualenv directory
+    :param inject: inject when True, uninstall when False
+    :param syspath_sleuth_path: optional path to a user's implementation of a SysPathSleuth
+    :return: the outcome for location
+    """
+    return bulk_sleuth([location], inject, syspath_sleuth_path)[0]
+
+
+def bulk_sleuth(
+    locations: Iterable[Path],
+    inject: bool,
+    syspath_sleuth_path: Optional[Path] = None,
+    max_workers: Optional[int] = None,
+) -> List[SleuthEnvironmentResult]:
+    """
+    (Un)install SysPathSleuth across many interpreters and virtualenvs on a process pool. Each
+    location's customize module is resolved first; those shared by several locations, e.g.: the
+    user site of installations of one python version, are then (un)installed into once.
+
+    :param locations: interpreter executables and/or virtualenv directories
+    :param inject: inject when True, uninstall when False
+    :param syspath_sleuth_path: optional path to a user's implementation of a SysPathSleuth
+    :param max_workers: worker processes; default=CPU count
+    :return: the outcome for each location in the order provided
+    """
+    locations = list(dict.fromkeys(locations))
+    if inject and syspath_sleuth_path:
+        verify_custom_sleuth(syspath_sleuth_path)
+    executor = ProcessPoolExecutor(max_workers=max_workers) if len(locations) > 1 else None
+    map_ = executor.map if executor else map
+    try:
+        resolved = list(map_(_resolve_sleuth_environment, locations))
+        customize_paths = list(
+            dict.fromkeys(
+                environment.customize_path for environment, _, _ in resolved if environment
+            )
+        )
+        outcomes = dict(
+            zip(
+                customize_paths,
+                map_(
+                    sleuth_customize,
+                    customize_paths,
+                    [inject] * len(customize_paths),
+                    [syspath_sleuth_path] * len(customize_paths),
+                ),
+            )
+        )
+    finally:
+        if executor:
+            executor.shutdown()
+
+    results: List[SleuthEnvironmentResult] = []
+    for location, (environment, status, seconds) in zip(locations, resolved):
+        if environment is None:
+            results.append(SleuthEnvironmentResult(location, None, False, status, seconds))
+            continue
+        status, customize_seconds = outcomes[environment.customize_path]
+        results.append(
+            SleuthEnvironmentResult(
+                location,
+                environment.customize_path,
+                environment.is_user_path,
+                status,
+                seconds + customize_seconds,
+            )
+        )
+    return results
+
+
+def print_bulk_report(results: List[SleuthEnvironmentResult], elapsed: float) -> None:
+    """
+    Print a consolidated per-environment status table.
+
+    :param results: outcomes from bulk_sleuth()
+    :param elapsed: total wall-clock seconds taken
+    """
+    width = max([len("Environment")] + [len(os.fspath(result.location)) for result in results])
+    click.echo(f"{'Environment':<{width}}  {'Site':<6}  {'Seconds':>7}  Status")
+    for result in results:
+        site_kind = "user" if result.is_user_path else "system"
+        if not result.customize_path:
+            site_kind = "-"
+        click.echo(
+            f"{os.fspath(result.location):<{width}}  {site_kind:<6}  "
+            f"{result.seconds:>7.3f}  {result.status}"
+        )
+    failures = sum(1 for result in results if result.status.startswith("failed"))
+    click.echo(f"{len(results)} environment(s), {failures} failed, in {elapsed:.3f}s")
+
+
 @click.command(
     help="(Un)Install SysPathSleuth into user-site or system-site to track sys.path "
     "access in real-time."
@@ -267,14 +596,54 @@ def uninstall_sleuth():
     type=click.Path(exists=True, resolve_path=True),
     help="path to a user's implementation of a SysPathSleuth",
 )
+@click.option(
+    "--python",
+    "-p",
+    "interpreters",
+    multiple=True,
+    type=click.Path(exists=True),
+    help="interpreter or virtualenv to (un)install into instead of this one; repeatable",
+)
+@click.option(
+    "--venvs",
+    "-e",
+    "venvs_dirs",
+    multiple=True,
+    type=click.Path(exists=True, file_okay=False),
+    help="directory of virtualenvs to (un)install into each of; repeatable",
+)
+@click.option("--jobs", "-j", type=int, default=None, help="bulk worker processes; default=CPUs")
 @click.option("--verbose", "-v", is_flag=True, default=False)
-def syspath_sleuth_main(inject: bool, custom: Optional[str], verbose: Optional[bool]):
+# pylint: disable=too-many-arguments
+def syspath_sleuth_main(
+    inject: bool,
+    custom: Optional[str],
+    interpreters: Tuple[str, ...],
+    venvs_dirs: Tuple[str, ...],
+    jobs: Optional[int],
+    verbose: Optional[bool],
+):
     custom_path: Optional[Path] = Path(custom) if custom else None
     if verbose:
         sleuth_logger.setLevel(logging.INFO)
         for handler in sleuth_logger.handlers:
             handler.setLevel(logging.INFO)
 
+    if interpreters or venvs_dirs:
+        # Not resolved; resolving a virtualenv's interpreter symlink would escape the virtualenv.
+        locations: List[Path] = [Path(interpreter).absolute() for interpreter in interpreters]
+        for venvs_dir in venvs_dirs:
+            locations.extend(find_venvs(Path(venvs_dir).absolute()))
+        start = time.perf_counter()
+        # pylint: disable=broad-except
+        try:
+            results = bulk_sleuth(locations, inject, custom_path, jobs)
+        except Exception as ex:
+            error_logger.error("%s failed: %s", "Inject" if inject else "Uninstall", ex)
+            return
+        print_bulk_report(results, time.perf_counter() - start)
+        return
+
     # pylint: disable=broad-except
     try:
         if inject:
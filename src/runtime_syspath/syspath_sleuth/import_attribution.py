@@ -0,0 +1,259 @@
+import inspect
+import os
+import sys
+import threading
+from time import perf_counter_ns
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from .syspath_sleuth import SysPathSleuth
+
+
+class EntryOrigin(NamedTuple):
+    action: str
+    args: str
+    filename: str
+    lineno: int
+    thread_name: str
+
+
+class EntryAttribution(NamedTuple):
+    entry: str
+    # None if the entry was on sys.path prior to install_import_attribution()
+    origin: Optional[EntryOrigin]
+    modules: List[str]
+    misses: int
+    miss_seconds: float
+    hit_seconds: float
+
+
+# sys.path entry -> the mutation that last added it
+_ENTRY_ORIGINS: Dict[str, EntryOrigin] = {}
+# sys.path entry -> top-level modules it resolved, in order
+_ENTRY_MODULES: Dict[str, Dict[str, None]] = {}
+# sys.path entry -> [nanoseconds within resolving finds, misses, nanoseconds within misses]
+_ENTRY_TIMES: Dict[str, List[int]] = {}
+# The list sys.path was prior to install_import_attribution() if a different list; else its class
+_PRIOR_SYSPATH: List[list] = []
+_PRIOR_SYSPATH_CLASS: List[type] = []
+_INSTALL_LOCK = threading.Lock()
+# Absolute path of each sys.path entry -> the entry, the first if repeated; None once mutated
+_ENTRY_PATHS: Optional[Dict[str, str]] = None
+# (id, length) of sys.path and the working directory as of indexing _ENTRY_PATHS
+_ENTRY_PATHS_KEY: Optional[Tuple[int, int, str]] = None
+
+
+def _get_added_entries(action: str, args: tuple) -> List[Any]:
+    if action == "append":
+        added = [args[0]]
+    elif action == "insert":
+        added = [args[1]]
+    elif action in ("extend", "__iadd__"):
+        added = args[0]
+    elif action == "__setitem__":
+        added = args[1] if isinstance(args[0], slice) else [args[1]]
+    else:
+        return []
+    # Never consume an iterator the list itself is to consume.
+    return list(added) if isinstance(added, (list, tuple)) else []
+
+
+class AttributingSysPathSleuth(SysPathSleuth):
+    """
+    sys.path, tagging each entry added with the mutation that added it. Mutations are reported as
+    SysPathSleuth does only if sys.path was a SysPathSleuth already.
+    """
+
+    is_sleuthing = False
+
+    @classmethod
+    def _where(cls, action, args, caller_depth: int = 2):
+        global _ENTRY_PATHS  # pylint: disable=global-statement
+        _ENTRY_PATHS = None
+        caller = inspect.currentframe().f_back.f_back
+        for _ in range(caller_depth - 2):
+            caller = caller.f_back
+        added_entries = _get_added_entries(action, args)
+        if caller is not None and added_entries:
+            origin = EntryOrigin(
+                action,
+                repr(args),
+                caller.f_code.co_filename,
+                caller.f_lineno,
+                threading.current_thread().name,
+            )
+            for entry in added_entries:
+                if isinstance(entry, str):
+                    _ENTRY_ORIGINS[entry] = origin
+        if cls.is_sleuthing:
+            super()._where(action, args, caller_depth + 1)
+
+    def __iadd__(self, *args):
+        self._where("__iadd__", args)
+        return super().__iadd__(*args)
+
+
+def _attribute_finder(entry: str, finder: Any) -> None:
+    """
+    Replace finder.find_spec(), on the finder itself, with one counting the top-level modules
+    it resolves for entry and the finds it misses, and timing both.
+    """
+    find_spec = getattr(finder, "find_spec", None)
+    if find_spec is None or getattr(find_spec, "attributed_entry", None) == entry:
+        return
+    modules = _ENTRY_MODULES.setdefault(entry, {})
+    times = _ENTRY_TIMES.setdefault(entry, [0, 0, 0])
+
+    def attributed_find_spec(*args, **kwargs):
+        start_ns = perf_counter_ns()
+        spec = find_spec(*args, **kwargs)
+        elapsed_ns = perf_counter_ns() - start_ns
+        if spec is not None and spec.loader is not None:
+            modules[spec.name] = None
+            times[0] += elapsed_ns
+        else:
+            # Not found, or just a namespace package portion
+            times[1] += 1
+            times[2] += elapsed_ns
+        return spec
+
+    attributed_find_spec.attributed_entry = entry  # type: ignore
+    try:
+        finder.find_spec = attributed_find_spec
+    except (AttributeError, TypeError):
+        # e.g.: an extension type
+        pass
+
+
+def _get_entry_paths() -> Dict[str, str]:
+    """
+    :return: _ENTRY_PATHS, indexed anew if sys.path has been mutated, replaced or resized, or the
+    working directory has changed, since
+    """
+    global _ENTRY_PATHS, _ENTRY_PATHS_KEY  # pylint: disable=global-statement
+    syspath = sys.path
+    key = (id(syspath), len(syspath), os.getcwd())
+    entry_paths = _ENTRY_PATHS
+    if entry_paths is None or key != _ENTRY_PATHS_KEY:
+        entry_paths = {
+            os.path.abspath(entry or os.curdir): entry
+            for entry in reversed(syspath)
+            if isinstance(entry, str)
+        }
+        _ENTRY_PATHS, _ENTRY_PATHS_KEY = entry_paths, key
+    return entry_paths
+
+
+def attributing_path_hook(entry: str) -> Any:
+    """
+    The first of sys.path_hooks once installed: creates the finder for a sys.path entry with the
+    hooks that follow it and attributes its finds to the entry: to '' for the working directory,
+    as PathFinder hooks it.
+    """
+    syspath_entry = _get_entry_paths().get(os.path.abspath(entry))
+    if syspath_entry is None:
+        # e.g.: a package's directory
+        raise ImportError("not a sys.path entry", path=entry)
+    path_hooks = list(sys.path_hooks)
+    for path_hook in path_hooks[path_hooks.index(attributing_path_hook) + 1 :]:
+        try:
+            finder = path_hook(entry)
+        except ImportError:
+            continue
+        _attribute_finder(syspath_entry, finder)
+        return finder
+    raise ImportError("no path hook found", path=entry)
+
+
+def is_import_attribution_installed() -> bool:
+    return attributing_path_hook in sys.path_hooks
+
+
+def install_import_attribution() -> None:
+    """
+    Tag each sys.path entry added hereafter with the mutation that added it, and attribute to each
+    entry the top-level modules it resolves and the finds it misses, ahead of the entry resolving
+    them. A SysPathSleuth is tagged in place, still reporting; a list is replaced by a copy.
+
+    :raises FrozenSysPathError: if sys.path is frozen, which tagging it would unfreeze
+    """
+    # pylint: disable=import-outside-toplevel,cyclic-import
+    from ..syspath_freeze import FrozenSysPathError, is_syspath_frozen
+
+    with _INSTALL_LOCK:
+        if is_import_attribution_installed():
+            return
+        if is_syspath_frozen():
+            raise FrozenSysPathError("sys.path is frozen: unfreeze_syspath() first")
+        syspath = sys.path
+        AttributingSysPathSleuth.is_sleuthing = isinstance(syspath, SysPathSleuth)
+        try:
+            prior_class = type(syspath)
+            syspath.__class__ = AttributingSysPathSleuth
+            _PRIOR_SYSPATH_CLASS[:] = [prior_class]
+            _PRIOR_SYSPATH.clear()
+        except TypeError:
+            # A list's __class__ cannot be assigned.
+            _PRIOR_SYSPATH[:] = [syspath]
+            _PRIOR_SYSPATH_CLASS.clear()
+            sys.path = AttributingSysPathSleuth(syspath)
+        sys.path_hooks.insert(0, attributing_path_hook)
+        for entry in sys.path:
+            # PathFinder caches the finder of '' under the working directory.
+            finder = sys.path_importer_cache.get(entry or os.getcwd())
+            if finder is not None:
+                _attribute_finder(entry, finder)
+
+
+def uninstall_import_attribution() -> None:
+    """
+    Finders already attributing keep doing so until sys.path_importer_cache forgets them.
+    """
+    with _INSTALL_LOCK:
+        if attributing_path_hook in sys.path_hooks:
+            sys.path_hooks.remove(attributing_path_hook)
+        if not isinstance(sys.path, AttributingSysPathSleuth):
+            return
+        if _PRIOR_SYSPATH_CLASS:
+            sys.path.__class__ = _PRIOR_SYSPATH_CLASS.pop()
+        elif _PRIOR_SYSPATH:
+            prior_syspath = _PRIOR_SYSPATH.pop()
+            prior_syspath[:] = list(sys.path)
+            sys.path = prior_syspath
+
+
+def get_entry_attributions() -> List[EntryAttribution]:
+    """
+    :return: per sys.path entry finds were attributed to, or that was added, the modules it
+    resolved, the misses it cost imports resolved later or never, and the mutation that added it;
+    costliest misses first
+    """
+    entries = dict.fromkeys([*_ENTRY_TIMES, *_ENTRY_ORIGINS])
+    attributions = []
+    for entry in entries:
+        hit_ns, misses, miss_ns = _ENTRY_TIMES.get(entry, (0, 0, 0))
+        attributions.append(
+            EntryAttribution(
+                entry,
+                _ENTRY_ORIGINS.get(entry),
+                list(_ENTRY_MODULES.get(entry, ())),
+                misses,
+                miss_ns / 1e9,
+                hit_ns / 1e9,
+            )
+        )
+    return sorted(attributions, key=lambda attribution: attribution.miss_seconds, reverse=True)
+
+
+def report_entry_attributions() -> None:
+    cwd = os.getcwd()
+    for attribution in get_entry_attributions():
+        message = (
+            f"{attribution.entry}: {len(attribution.modules)} modules resolved, "
+            f"{attribution.misses} misses ({attribution.miss_seconds * 1000:.3f}ms)"
+        )
+        origin = attribution.origin
+        if origin:
+            # pylint: disable=protected-access
+            filename = SysPathSleuth._get_reported_filename(origin.filename, cwd)
+            message += f"; sys.path.{origin.action}{origin.args} from {filename}:{origin.lineno}"
+        SysPathSleuth._inform_user(message)  # pylint: disable=protected-access
@@ -0,0 +1,285 @@
+import inspect
+import os
+import sys
+import threading
+from collections import deque
+from time import perf_counter_ns
+from types import FrameType
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+from .syspath_sleuth import SysPathSleuth
+
+# Mutations by the import system itself are recorded, not reported.
+IMPORT_SYSTEM_FILENAME_PREFIX = "<frozen importlib."
+# Mutations recorded, at most; the import system's own add up over a long-lived process.
+MAX_HOOK_INSTALLS = 10000
+_MISSING = object()
+
+
+class HookInstall(NamedTuple):
+    target: str
+    action: str
+    args: str
+    filename: str
+    lineno: int
+    thread_name: str
+
+
+class HookTiming(NamedTuple):
+    hook: str
+    calls: int
+    seconds: float
+
+
+# The latest MAX_HOOK_INSTALLS mutations
+HOOK_INSTALLS: Deque[HookInstall] = deque(maxlen=MAX_HOOK_INSTALLS)
+# hook name -> [find_spec calls, nanoseconds within them]
+_FIND_SPEC_TIMES: Dict[str, List[int]] = {}
+# id(hook) -> (hook, its own find_spec prior to being timed, else _MISSING)
+_TIMED_HOOKS: Dict[int, Tuple[Any, Any]] = {}
+_TIMING_LOCK = threading.Lock()
+_TIMING: List[bool] = [False]
+
+
+def get_hook_name(hook: Any) -> str:
+    """
+    :return: the qualified name of hook if a class or function, else of its type
+    """
+    named = hook if isinstance(hook, type) or inspect.isroutine(hook) else type(hook)
+    return f"{named.__module__}.{named.__qualname__}"
+
+
+def _get_caller(caller_depth: int) -> Optional[FrameType]:
+    """
+    :param caller_depth: frames from the _where() calling this up to the mutation's caller
+    :return: the mutation's caller; None if the stack is not that deep
+    """
+    caller: Optional[FrameType] = inspect.currentframe()
+    for _ in range(caller_depth + 1):
+        if caller is None:
+            break
+        caller = caller.f_back
+    return caller
+
+
+def _record(target: str, action: str, args: tuple, caller: Optional[FrameType]) -> None:
+    if caller is None:
+        return
+    hook_install = HookInstall(
+        target,
+        action,
+        repr(args),
+        caller.f_code.co_filename,
+        caller.f_lineno,
+        threading.current_thread().name,
+    )
+    HOOK_INSTALLS.append(hook_install)
+    if not hook_install.filename.startswith(IMPORT_SYSTEM_FILENAME_PREFIX):
+        # pylint: disable=protected-access
+        filename = SysPathSleuth._get_reported_filename(hook_install.filename, os.getcwd())
+        SysPathSleuth._inform_user(
+            f"{target}.{action}{hook_install.args} from {filename}:{hook_install.lineno}"
+        )
+
+
+def _time_find_spec(hook: Any, name: str) -> None:
+    """
+    Accumulate the time within hook.find_spec() under name. find_spec is replaced on the hook
+    itself, rather than the hook wrapped, so that hooks keep their identity and type.
+    """
+    with _TIMING_LOCK:
+        if id(hook) in _TIMED_HOOKS:
+            return
+        find_spec: Optional[Callable] = getattr(hook, "find_spec", None)
+        if find_spec is None:
+            return
+        times = _FIND_SPEC_TIMES.setdefault(name, [0, 0])
+
+        def timed_find_spec(*args, **kwargs):
+            start_ns = perf_counter_ns()
+            try:
+                return find_spec(*args, **kwargs)
+            finally:
+                times[0] += 1
+                times[1] += perf_counter_ns() - start_ns
+
+        prior_find_spec = getattr(hook, "__dict__", {}).get("find_spec", _MISSING)
+        try:
+            hook.find_spec = timed_find_spec
+        except (AttributeError, TypeError):
+            # e.g.: an extension type
+            return
+        _TIMED_HOOKS[id(hook)] = (hook, prior_find_spec)
+
+
+def _untime_find_specs() -> None:
+    with _TIMING_LOCK:
+        for hook, prior_find_spec in _TIMED_HOOKS.values():
+            try:
+                if prior_find_spec is _MISSING:
+                    del hook.find_spec
+                else:
+                    hook.find_spec = prior_find_spec
+            except (AttributeError, TypeError):
+                pass
+        _TIMED_HOOKS.clear()
+
+
+def _get_added_hooks(action: str, args: tuple) -> List[Any]:
+    if action in ("append", "__iadd__"):
+        added = [args[0]] if action == "append" else args[0]
+    elif action == "insert":
+        added = [args[1]]
+    elif action == "extend":
+        added = args[0]
+    elif action == "__setitem__":
+        added = args[1] if isinstance(args[0], slice) else [args[1]]
+    else:
+        return []
+    # Never consume an iterator the list itself is to consume.
+    return list(added) if isinstance(added, (list, tuple)) else []
+
+
+class MetaPathSleuth(SysPathSleuth):
+    """
+    sys.meta_path, recording and reporting who mutates it as SysPathSleuth does sys.path; when
+    timing, the time within each finder's find_spec() is accumulated.
+    """
+
+    target = "sys.meta_path"
+
+    @classmethod
+    def _where(cls, action, args, caller_depth: int = 2):
+        _record(cls.target, action, args, _get_caller(caller_depth))
+        if _TIMING[0]:
+            for hook in _get_added_hooks(action, args):
+                _time_find_spec(hook, get_hook_name(hook))
+
+    def __iadd__(self, *args):
+        self._where("__iadd__", args)
+        return super().__iadd__(*args)
+
+    def clear(self, *args):
+        self._where("clear", args)
+        return super().clear(*args)
+
+
+class PathHooksSleuth(MetaPathSleuth):
+    """
+    sys.path_hooks, recording and reporting who mutates it. A hook's time is that within
+    find_spec() of the path entry finders of its type in sys.path_importer_cache.
+    """
+
+    target = "sys.path_hooks"
+
+    @classmethod
+    def _where(cls, action, args, caller_depth: int = 2):
+        _record(cls.target, action, args, _get_caller(caller_depth))
+
+
+class PathImporterCacheSleuth(dict):
+    """
+    sys.path_importer_cache, recording who sets or removes its entries; those set by the import
+    system itself are not reported. When timing, the time within find_spec() of the path entry
+    finders set is accumulated per their type.
+    """
+
+    target = "sys.path_importer_cache"
+
+    def __setitem__(self, *args):
+        self._where("__setitem__", args)
+        return super().__setitem__(*args)
+
+    def __delitem__(self, *args):
+        self._where("__delitem__", args)
+        return super().__delitem__(*args)
+
+    def pop(self, *args):
+        self._where("pop", args)
+        return super().pop(*args)
+
+    def popitem(self, *args):
+        self._where("popitem", args)
+        return super().popitem(*args)
+
+    def setdefault(self, *args):
+        self._where("setdefault", args)
+        return super().setdefault(*args)
+
+    def update(self, *args, **kwargs):
+        self._where("update", args)
+        return super().update(*args, **kwargs)
+
+    def clear(self, *args):
+        self._where("clear", args)
+        return super().clear(*args)
+
+    @classmethod
+    def _where(cls, action, args, caller_depth: int = 2):
+        _record(cls.target, action, args, _get_caller(caller_depth))
+        if _TIMING[0] and action in ("__setitem__", "setdefault") and len(args) > 1:
+            finder = args[1]
+            if finder is not None:
+                _time_find_spec(finder, f"{get_hook_name(type(finder))} (path entry finder)")
+
+
+def is_import_hook_sleuth_installed() -> bool:
+    return isinstance(sys.meta_path, MetaPathSleuth)
+
+
+def install_import_hook_sleuth(timing: bool = False) -> None:
+    """
+    Wrap sys.meta_path, sys.path_hooks and sys.path_importer_cache to record, and report as
+    SysPathSleuth does, who installs what import hooks.
+
+    :param timing: accumulate the time within each meta path finder's find_spec(), and that of
+    path entry finders per their type, in get_find_spec_timings(); each timed find_spec() is
+    replaced on the finder itself until uninstall_import_hook_sleuth()
+    """
+    _TIMING[0] = timing
+    if not is_import_hook_sleuth_installed():
+        sys.meta_path = MetaPathSleuth(sys.meta_path)
+        sys.path_hooks = PathHooksSleuth(sys.path_hooks)
+        sys.path_importer_cache = PathImporterCacheSleuth(sys.path_importer_cache)
+    if timing:
+        for finder in sys.meta_path:
+            _time_find_spec(finder, get_hook_name(finder))
+        for finder in sys.path_importer_cache.values():
+            if finder is not None:
+                _time_find_spec(finder, f"{get_hook_name(type(finder))} (path entry finder)")
+
+
+def uninstall_import_hook_sleuth() -> None:
+    _TIMING[0] = False
+    _untime_find_specs()
+    if is_import_hook_sleuth_installed():
+        sys.meta_path = list(sys.meta_path)
+        sys.path_hooks = list(sys.path_hooks)
+        sys.path_importer_cache = dict(sys.path_importer_cache)
+
+
+def get_hook_installs(include_import_system: bool = False) -> List[HookInstall]:
+    """
+    :param include_import_system: include the mutations of the import system itself
+    :return: the mutations recorded, in order
+    """
+    return [
+        hook_install
+        for hook_install in list(HOOK_INSTALLS)
+        if include_import_system
+        or not hook_install.filename.startswith(IMPORT_SYSTEM_FILENAME_PREFIX)
+    ]
+
+
+def get_find_spec_timings() -> List[HookTiming]:
+    """
+    A meta path finder's time includes that of those it delegates to, e.g.: PathFinder's includes
+    its path entry finders'.
+
+    :return: the cumulative find_spec() time per timed hook, most costly first
+    """
+    timings = [
+        HookTiming(hook, calls, nanoseconds / 1e9)
+        for hook, (calls, nanoseconds) in list(_FIND_SPEC_TIMES.items())
+    ]
+    return sorted(timings, key=lambda timing: timing.seconds, reverse=True)
@@ -0,0 +1,186 @@
+import inspect
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import click
+
+
+class PthProfileError(RuntimeError):
+    pass
+
+
+def replay_site_dirs(site_dirs: List[str]) -> List[Dict[str, Any]]:
+    """
+    Replay site.addsitedir()'s processing of each site directory's .pth files timing each .pth
+    file and each of its 'import' lines.
+
+    This function must remain self-contained; its source is run within a child interpreter
+    started with site processing disabled ('-S') so that nothing has been added yet.
+
+    :param site_dirs: site directories to process in order; if empty, the interpreter's own
+    :return: a report per .pth file
+    """
+    # pylint: disable=import-outside-toplevel,redefined-outer-name,reimported,exec-used
+    import os
+    import site
+    import sys
+    import time
+
+    if not site_dirs:
+        site_dirs = [site.getusersitepackages()] if site.check_enableusersite() else []
+        site_dirs.extend(site.getsitepackages())
+
+    known_paths = {os.path.normcase(path) for path in sys.path if os.path.exists(path)}
+    reports = []
+    for site_dir in site_dirs:
+        if not os.path.isdir(site_dir):
+            continue
+        site_dir_case = os.path.normcase(os.path.abspath(site_dir))
+        if site_dir_case not in known_paths:
+            sys.path.append(site_dir)
+            known_paths.add(site_dir_case)
+        pth_names = sorted(
+            name for name in os.listdir(site_dir) if name.endswith(".pth") and name[0] != "."
+        )
+        for pth_name in pth_names:
+            pth_path = os.path.join(site_dir, pth_name)
+            syspath_len = len(sys.path)
+            imports = []
+            paths_added = 0
+            error = None
+            start = time.perf_counter()
+            try:
+                with open(pth_path) as pth_f:
+                    for line in pth_f:
+                        if line.startswith("#") or not line.strip():
+                            continue
+                        if line.startswith(("import ", "import\t")):
+                            import_start = time.perf_counter()
+                            exec(line)
+                            imports.append(
+                                {
+                                    "line": line.rstrip(),
+                                    "seconds": time.perf_counter() - import_start,
+                                }
+                            )
+                            continue
+                        path = os.path.abspath(os.path.join(site_dir, line.rstrip()))
+                        path_case = os.path.normcase(path)
+                        if path_case not in known_paths and os.path.exists(path):
+                            sys.path.append(path)
+                            known_paths.add(path_case)
+                            paths_added += 1
+            except Exception as ex:  # pylint: disable=broad-except
+                # site.addpackage() abandons the remainder of a .pth on error; so does the replay.
+                error = f"{type(ex).__name__}: {ex}"
+            seconds = time.perf_counter() - start
+            import_seconds = sum(imported["seconds"] for imported in imports)
+            reports.append(
+                {
+                    "pth": pth_path,
+                    "seconds": seconds,
+                    "parse_seconds": seconds - import_seconds,
+                    "import_seconds": import_seconds,
+                    "paths_added": paths_added,
+                    "syspath_growth": len(sys.path) - syspath_len,
+                    "imports": imports,
+                    "error": error,
+                }
+            )
+    return reports
+
+
+def profile_pths(
+    python: Optional[Path] = None, site_dirs: Optional[List[Path]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Profile the .pth files processed at interpreter start within a child interpreter.
+
+    :param python: interpreter to profile; default=this interpreter
+    :param site_dirs: site directories to replay; default=the interpreter's user and system sites
+    :return: a report per .pth file sorted by cost, most costly first
+    """
+    site_dir_strs = [os.fspath(site_dir) for site_dir in site_dirs or []]
+    child_source = (
+        "from typing import Any, Dict, List\n"
+        + inspect.getsource(replay_site_dirs)
+        + f"\nimport json\nprint(json.dumps({replay_site_dirs.__name__}({site_dir_strs!r})))\n"
+    )
+    completed = subprocess.run(
+        [os.fspath(python or sys.executable), "-S", "-c", child_source],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=False,
+    )
+    if completed.returncode != 0:
+        raise PthProfileError(f"Profiling .pth files failed: {completed.stderr.strip()}")
+    # 'import' lines executed in the child may print; the report is the last line.
+    reports: List[Dict[str, Any]] = json.loads(completed.stdout.strip().splitlines()[-1])
+    reports.sort(key=lambda report: report["seconds"], reverse=True)
+    return reports
+
+
+def print_pth_profile(reports: List[Dict[str, Any]]) -> None:
+    """
+    Print a report per .pth file, most costly first, with each of its 'import' lines beneath.
+
+    :param reports: reports from profile_pths()
+    """
+    click.echo(f"{'Total ms':>9} {'Parse ms':>9} {'Import ms':>9} {'Paths':>5} {'Growth':>6}  .pth")
+    for report in reports:
+        click.echo(
+            f"{report['seconds'] * 1000:>9.3f} {report['parse_seconds'] * 1000:>9.3f} "
+            f"{report['import_seconds'] * 1000:>9.3f} {report['paths_added']:>5} "
+            f"{report['syspath_growth']:>6}  {report['pth']}"
+        )
+        for imported in report["imports"]:
+            click.echo(f"{imported['seconds'] * 1000:>29.3f}{'':>14}  {imported['line']}")
+        if report["error"]:
+            click.echo(f"{'':>45}  {report['error']}")
+    total = sum(report["seconds"] for report in reports)
+    growth = sum(report["syspath_growth"] for report in reports)
+    click.echo(
+        f"{len(reports)} .pth file(s) in {total * 1000:.3f}ms adding {growth} sys.path entries"
+    )
+
+
+@click.command(
+    help="Profile the cost of each .pth file processed by site.py at interpreter start, "
+    "most costly first."
+)
+@click.option(
+    "--python",
+    "-p",
+    type=click.Path(exists=True, dir_okay=False),
+    help="interpreter to profile; default=this interpreter",
+)
+@click.option(
+    "--site-dir",
+    "-s",
+    "site_dirs",
+    multiple=True,
+    type=click.Path(exists=True, file_okay=False),
+    help="site directory to replay instead of the interpreter's own; repeatable",
+)
+@click.option("--json", "as_json", is_flag=True, default=False, help="report as JSON")
+def pth_profiler_main(python: Optional[str], site_dirs: Tuple[str, ...], as_json: bool):
+    try:
+        reports = profile_pths(
+            Path(python) if python else None, [Path(site_dir) for site_dir in site_dirs]
+        )
+    except PthProfileError as ex:
+        raise click.ClickException(str(ex))
+    if as_json:
+        click.echo(json.dumps(reports, indent=2))
+    else:
+        print_pth_profile(reports)
+
+
+if __name__ == "__main__":
+    # pylint: disable=no-value-for-parameter
+    pth_profiler_main()
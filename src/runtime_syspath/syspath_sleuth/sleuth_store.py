@@ -0,0 +1,330 @@
+import logging
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, List, NamedTuple, Optional, Tuple, Union
+
+import click
+
+from ..syspath_cache import get_cache_dir
+from .syspath_sleuth import SysPathSleuth
+
+SLEUTH_DB_ENV_VAR = "SYSPATH_SLEUTH_DB"
+SLEUTH_RUN_ID_ENV_VAR = "SYSPATH_SLEUTH_RUN_ID"
+SLEUTH_DB_NAME = "sleuth_events.db"
+# Rows written per transaction, at most; rows queued meanwhile wait for the next.
+MAX_WRITE_BATCH = 4096
+# Seconds the writer lets rows accumulate once one is queued, so a busy run commits few batches
+WRITE_INTERVAL = 0.1
+FLUSH_TIMEOUT = 10.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started REAL NOT NULL,
+    argv TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    run_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    created REAL NOT NULL,
+    callsite TEXT NOT NULL,
+    action TEXT NOT NULL,
+    path TEXT,
+    thread TEXT,
+    task TEXT
+);
+CREATE INDEX IF NOT EXISTS events_callsite ON events (callsite);
+CREATE INDEX IF NOT EXISTS events_path ON events (path);
+CREATE INDEX IF NOT EXISTS events_run_id ON events (run_id);
+"""
+
+# (run_id, seq, created, callsite, action, path, thread, task)
+EventRow = Tuple[str, int, float, str, str, Optional[str], str, Optional[str]]
+
+
+class CallsiteCount(NamedTuple):
+    callsite: str
+    action: str
+    events: int
+    runs: int
+
+
+class RunTrend(NamedTuple):
+    run_id: str
+    started: float
+    events: int
+    callsites: int
+    paths: int
+
+
+def get_sleuth_db_path() -> Path:
+    """
+    :return: $SYSPATH_SLEUTH_DB, else the database within the local cache directory
+    """
+    db_path_str = os.getenv(SLEUTH_DB_ENV_VAR)
+    return Path(db_path_str) if db_path_str else get_cache_dir() / SLEUTH_DB_NAME
+
+
+def get_default_run_id() -> str:
+    """
+    :return: $SYSPATH_SLEUTH_RUN_ID (e.g.: a CI build number), else the time and process id
+    """
+    return os.getenv(SLEUTH_RUN_ID_ENV_VAR) or f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+
+
+def connect(db_path: Union[str, Path], check_same_thread: bool = True) -> sqlite3.Connection:
+    connection = sqlite3.connect(
+        os.fspath(db_path), timeout=FLUSH_TIMEOUT, check_same_thread=check_same_thread
+    )
+    # Readers, e.g.: queries of prior runs, never block the writer, nor it them.
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def _get_paths(args: tuple) -> List[Optional[str]]:
+    """
+    :return: the sys.path entries a mutation's args name; [None] if none
+    """
+    paths: List[Optional[str]] = []
+    for arg in args:
+        if isinstance(arg, str):
+            paths.append(arg)
+        elif isinstance(arg, (list, tuple)):
+            paths.extend(entry for entry in arg if isinstance(entry, str))
+    return paths or [None]
+
+
+class SleuthStoreHandler(logging.Handler):
+    """
+    A SysPathSleuth.logger handler storing each sys.path mutation event within a SQLite database,
+    along with those of prior runs. emit() only queues rows; a single writer thread inserts them
+    in batches, one transaction each, every WRITE_INTERVAL at most. An event naming several entries,
+    e.g.: sys.path.extend(), is stored as a row per entry sharing its seq. Records other than
+    mutation events are ignored.
+    """
+
+    def __init__(self, db_path: Union[str, Path] = None, run_id: str = None):
+        super().__init__(logging.INFO)
+        self.db_path = Path(db_path) if db_path else get_sleuth_db_path()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.run_id = run_id or get_default_run_id()
+        self.dropped = 0
+        self._seq = 0
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        # Connect here so that a bad db_path raises to the installer, not within the writer.
+        self._connection = connect(self.db_path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR IGNORE INTO runs VALUES (?, ?, ?)",
+                (self.run_id, time.time(), " ".join(sys.argv)),
+            )
+        self._writer = threading.Thread(target=self._write, name="SleuthStoreWriter", daemon=True)
+        self._writer.start()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        action = getattr(record, "sleuth_action", None)
+        if action is None:
+            return
+        # Called with the handler's lock held
+        self._seq += 1
+        for path in _get_paths(record.sleuth_args):  # type: ignore
+            row: EventRow = (
+                self.run_id,
+                self._seq,
+                record.created,
+                record.sleuth_callsite,  # type: ignore
+                action,
+                path,
+                record.sleuth_thread,  # type: ignore
+                record.sleuth_task,  # type: ignore
+            )
+            self._queue.put(row)
+
+    def flush(self) -> None:
+        """
+        Wait until the rows queued so far are committed.
+        """
+        if self._writer.is_alive():
+            flushed = threading.Event()
+            self._queue.put(flushed)
+            flushed.wait(FLUSH_TIMEOUT)
+
+    def close(self) -> None:
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join(FLUSH_TIMEOUT)
+        super().close()
+
+    def _write(self) -> None:
+        is_closing = False
+        while not is_closing:
+            items = [self._queue.get()]
+            if isinstance(items[0], tuple):
+                time.sleep(WRITE_INTERVAL)
+            try:
+                while len(items) < MAX_WRITE_BATCH:
+                    items.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            rows = [item for item in items if isinstance(item, tuple)]
+            is_closing = None in items
+            if rows:
+                try:
+                    with self._connection:
+                        self._connection.executemany(
+                            "INSERT INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+                        )
+                except sqlite3.Error:
+                    self.dropped += len(rows)
+            for item in items:
+                if isinstance(item, threading.Event):
+                    item.set()
+        self._connection.close()
+
+
+def install_sleuth_store(
+    db_path: Union[str, Path] = None, run_id: str = None
+) -> SleuthStoreHandler:
+    """
+    Store SysPathSleuth's events hereafter, across runs, within a SQLite database; see
+    syspath_sleuth_store for querying it. As with any handler, events are then logged rather
+    than print()'ed.
+
+    :param db_path: default=$SYSPATH_SLEUTH_DB, else 'sleuth_events.db' in the local cache
+    directory
+    :param run_id: default=$SYSPATH_SLEUTH_RUN_ID, else the time and process id
+    :return: the handler added to SysPathSleuth.logger
+    """
+    handler = SleuthStoreHandler(db_path, run_id)
+    SysPathSleuth.config_logger(handler, logging.INFO)
+    return handler
+
+
+def _get_latest_run_id(connection: sqlite3.Connection) -> Optional[str]:
+    row = connection.execute("SELECT run_id FROM runs ORDER BY started DESC LIMIT 1").fetchone()
+    return row[0] if row else None
+
+
+def get_top_callsites(
+    db_path: Union[str, Path], limit: int = 20, run_id: str = None
+) -> List[CallsiteCount]:
+    """
+    :param run_id: default=every run
+    :return: the callsites mutating sys.path most often, with the number of runs they did in
+    """
+    connection = connect(db_path)
+    try:
+        rows = connection.execute(
+            "SELECT callsite, action, COUNT(DISTINCT run_id || ':' || seq) AS events, "
+            "COUNT(DISTINCT run_id) FROM events WHERE ? IS NULL OR run_id = ? "
+            "GROUP BY callsite, action ORDER BY events DESC, callsite LIMIT ?",
+            (run_id, run_id, limit),
+        ).fetchall()
+    finally:
+        connection.close()
+    return [CallsiteCount(*row) for row in rows]
+
+
+def get_new_callsites(
+    db_path: Union[str, Path], baseline_run_id: str, run_id: str = None
+) -> List[CallsiteCount]:
+    """
+    :param baseline_run_id: run to compare against
+    :param run_id: default=the latest run
+    :return: the callsites that mutated sys.path within run_id, yet not within baseline_run_id
+    """
+    connection = connect(db_path)
+    try:
+        run_id = run_id or _get_latest_run_id(connection)
+        rows = connection.execute(
+            "SELECT callsite, action, COUNT(DISTINCT seq) AS events, 1 FROM events "
+            "WHERE run_id = ? AND callsite NOT IN "
+            "(SELECT callsite FROM events WHERE run_id = ?) "
+            "GROUP BY callsite, action ORDER BY events DESC, callsite",
+            (run_id, baseline_run_id),
+        ).fetchall()
+    finally:
+        connection.close()
+    return [CallsiteCount(*row) for row in rows]
+
+
+def get_run_trends(
+    db_path: Union[str, Path], limit: int = 20, callsite: str = None
+) -> List[RunTrend]:
+    """
+    :param limit: number of latest runs
+    :param callsite: only count this callsite's events
+    :return: per run, oldest first, its events and distinct callsites and paths
+    """
+    connection = connect(db_path)
+    try:
+        rows = connection.execute(
+            "SELECT run_id, started, COUNT(DISTINCT seq), COUNT(DISTINCT callsite), "
+            "COUNT(DISTINCT path) FROM (SELECT * FROM runs ORDER BY started DESC LIMIT ?) "
+            "LEFT JOIN (SELECT * FROM events WHERE ? IS NULL OR callsite = ?) USING (run_id) "
+            "GROUP BY run_id ORDER BY started",
+            (limit, callsite, callsite),
+        ).fetchall()
+    finally:
+        connection.close()
+    return [RunTrend(*row) for row in rows]
+
+
+def _echo_callsites(callsites: List[CallsiteCount]) -> None:
+    for callsite in callsites:
+        click.echo(
+            f"{callsite.events:8d} {callsite.runs:6d}  sys.path.{callsite.action} from "
+            f"{callsite.callsite}"
+        )
+
+
+@click.group(help="Query the SysPathSleuth events stored across runs by install_sleuth_store().")
+@click.option(
+    "--db",
+    "db_path",
+    type=click.Path(exists=True, dir_okay=False),
+    help=f"default=${SLEUTH_DB_ENV_VAR}, else '{SLEUTH_DB_NAME}' in the local cache directory",
+)
+@click.pass_context
+def sleuth_store_main(ctx: click.Context, db_path: Optional[str]):
+    if not db_path:
+        db_path = os.fspath(get_sleuth_db_path())
+        if not os.path.exists(db_path):
+            raise click.ClickException(f"{db_path} does not exist")
+    ctx.obj = db_path
+
+
+@sleuth_store_main.command(help="Callsites mutating sys.path most often: events, runs.")
+@click.option("--limit", "-n", type=click.IntRange(1), default=20, show_default=True)
+@click.option("--run", "run_id", help="default=every run")
+@click.pass_obj
+def top(db_path: str, limit: int, run_id: Optional[str]):
+    _echo_callsites(get_top_callsites(db_path, limit, run_id))
+
+
+@sleuth_store_main.command(help="Callsites mutating sys.path within a run, yet not a baseline's.")
+@click.option("--baseline", "baseline_run_id", required=True, help="run to compare against")
+@click.option("--run", "run_id", help="default=the latest run")
+@click.pass_obj
+def new(db_path: str, baseline_run_id: str, run_id: Optional[str]):
+    _echo_callsites(get_new_callsites(db_path, baseline_run_id, run_id))
+
+
+@sleuth_store_main.command(help="Per run, oldest first: events, callsites and sys.path entries.")
+@click.option("--limit", "-n", type=click.IntRange(1), default=20, show_default=True)
+@click.option("--callsite", help="only count this callsite's events, e.g.: src/module.py:2")
+@click.pass_obj
+def trend(db_path: str, limit: int, callsite: Optional[str]):
+    for run_trend in get_run_trends(db_path, limit, callsite):
+        started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(run_trend.started))
+        click.echo(
+            f"{run_trend.run_id}  {started}  {run_trend.events:8d} events "
+            f"{run_trend.callsites:6d} callsites {run_trend.paths:6d} paths"
+        )
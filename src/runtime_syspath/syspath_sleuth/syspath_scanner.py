@@ -0,0 +1,312 @@
+import ast
+import os
+import site
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import click
+
+from ..relative_import_checker import find_source_files
+from ..syspath_cache import FileResultCache, analyze_files
+from ..syspath_path_utils import get_project_root_dir
+from ..syspath_utils import DEFAULT_SRCDIR_PATTERNS, discover_srcdirs
+from .syspath_sleuth import SysPathSleuth
+
+ANALYSIS_NAME = "syspath_manipulations"
+ANALYSIS_VERSION = 1
+# Every manipulation names the sys module, or site.addsitedir; nor can an alias avoid naming
+# either where it is imported.
+PREFILTER_TOKENS = (b"sys", b"addsitedir")
+SYSPATH_METHODS = frozenset(
+    ("append", "insert", "extend", "remove", "pop", "clear", "reverse", "sort")
+)
+
+
+class SysPathCallsite(NamedTuple):
+    path: str
+    lineno: int
+    # 'sys.path' or 'site'
+    target: str
+    # a list method; '__setitem__', '__delitem__', '__iadd__', '=' or 'addsitedir'
+    action: str
+    # source of the arguments, as a tuple
+    args: str
+
+
+def has_syspath_tokens(content: bytes) -> bool:
+    return any(token in content for token in PREFILTER_TOKENS)
+
+
+def _get_source(source: str, node: ast.AST) -> str:
+    get_source_segment = getattr(ast, "get_source_segment", None)  # Python 3.8+
+    segment = get_source_segment(source, node) if get_source_segment else None
+    return " ".join(segment.split()) if segment else "..."
+
+
+def _format_args(source: str, nodes: Iterable[ast.AST]) -> str:
+    args = [_get_source(source, node) for node in nodes]
+    return f"({args[0]},)" if len(args) == 1 else f"({', '.join(args)})"
+
+
+class SysPathManipulationFinder(ast.NodeVisitor):
+    """
+    Finds the manipulations of sys.path, and calls of site.addsitedir(), of a module; through
+    aliases too: 'import sys as s', 'from sys import path', 'from site import addsitedir'.
+    """
+
+    def __init__(self, source: str, tree: ast.AST):
+        self.source = source
+        self.sys_names: Set[str] = {"sys"}
+        self.syspath_names: Set[str] = set()
+        self.site_names: Set[str] = {"site"}
+        self.addsitedir_names: Set[str] = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    if alias.name == "sys":
+                        self.sys_names.add(alias.asname or alias.name)
+                    elif alias.name == "site":
+                        self.site_names.add(alias.asname or alias.name)
+            elif isinstance(node, ast.ImportFrom) and not node.level:
+                for alias in node.names:
+                    if node.module == "sys" and alias.name == "path":
+                        self.syspath_names.add(alias.asname or alias.name)
+                    elif node.module == "site" and alias.name == "addsitedir":
+                        self.addsitedir_names.add(alias.asname or alias.name)
+        # (lineno, target, action, args)
+        self.manipulations: List[Tuple[int, str, str, str]] = []
+
+    def is_syspath(self, node: ast.AST) -> bool:
+        if isinstance(node, ast.Attribute):
+            return (
+                node.attr == "path"
+                and isinstance(node.value, ast.Name)
+                and node.value.id in self.sys_names
+            )
+        return isinstance(node, ast.Name) and node.id in self.syspath_names
+
+    def add(self, node: ast.AST, target: str, action: str, args: str) -> None:
+        self.manipulations.append((node.lineno, target, action, args))
+
+    def visit_Call(self, node: ast.Call):  # pylint: disable=invalid-name
+        func = node.func
+        if isinstance(func, ast.Attribute):
+            if func.attr in SYSPATH_METHODS and self.is_syspath(func.value):
+                self.add(node, "sys.path", func.attr, _format_args(self.source, node.args))
+            elif (
+                func.attr == "addsitedir"
+                and isinstance(func.value, ast.Name)
+                and func.value.id in self.site_names
+            ):
+                self.add(node, "site", "addsitedir", _format_args(self.source, node.args))
+        elif isinstance(func, ast.Name) and func.id in self.addsitedir_names:
+            self.add(node, "site", "addsitedir", _format_args(self.source, node.args))
+        self.generic_visit(node)
+
+    def visit_target(self, node: ast.AST, target: ast.AST, value: Optional[ast.AST]) -> None:
+        value_nodes = [value] if value is not None else []
+        if isinstance(target, ast.Subscript) and self.is_syspath(target.value):
+            index = target.slice
+            if isinstance(index, getattr(ast, "Index", ())):
+                # Prior to Python 3.9
+                index = index.value  # type: ignore
+            action = "__setitem__" if value is not None else "__delitem__"
+            self.add(node, "sys.path", action, _format_args(self.source, [index, *value_nodes]))
+        elif isinstance(target, ast.Attribute) and self.is_syspath(target) and value is not None:
+            self.add(node, "sys.path", "=", _get_source(self.source, value))
+        elif isinstance(target, (ast.Tuple, ast.List)):
+            for element in target.elts:
+                self.visit_target(node, element, value)
+
+    def visit_Assign(self, node: ast.Assign):  # pylint: disable=invalid-name
+        for target in node.targets:
+            self.visit_target(node, target, node.value)
+        self.generic_visit(node)
+
+    def visit_AugAssign(self, node: ast.AugAssign):  # pylint: disable=invalid-name
+        if self.is_syspath(node.target):
+            action = "__iadd__" if isinstance(node.op, ast.Add) else "__imul__"
+            self.add(node, "sys.path", action, _format_args(self.source, [node.value]))
+        else:
+            self.visit_target(node, node.target, node.value)
+        self.generic_visit(node)
+
+    def visit_Delete(self, node: ast.Delete):  # pylint: disable=invalid-name
+        for target in node.targets:
+            self.visit_target(node, target, None)
+        self.generic_visit(node)
+
+
+def find_syspath_manipulations(
+    content: bytes, path: str
+) -> Optional[List[Tuple[int, str, str, str]]]:
+    """
+    :param content: python source
+    :param path: file of content
+    :return: (line number, target, action, args) per manipulation; None if content does not parse
+    """
+    if not has_syspath_tokens(content):
+        return []
+    try:
+        tree = ast.parse(content, path)
+    except (SyntaxError, ValueError):
+        return None
+    finder = SysPathManipulationFinder(content.decode("utf-8", "replace"), tree)
+    finder.visit(tree)
+    return sorted(finder.manipulations)
+
+
+def scan_pth_file(pth_path: str) -> List[SysPathCallsite]:
+    """
+    As site.addpackage() processes a .pth file: each 'import' line executes, and each other line
+    names a directory appended to sys.path if it exists.
+    """
+    site_dir = os.path.dirname(pth_path)
+    callsites: List[SysPathCallsite] = []
+    try:
+        with open(pth_path, "rb") as pth_f:
+            lines = pth_f.read().splitlines()
+    except OSError:
+        return callsites
+    for lineno, line in enumerate(lines, 1):
+        if line.startswith(b"#") or not line.strip():
+            continue
+        if line.startswith((b"import ", b"import\t")):
+            for _, target, action, args in find_syspath_manipulations(line, pth_path) or []:
+                callsites.append(SysPathCallsite(pth_path, lineno, target, action, args))
+            continue
+        path_dir = os.path.join(site_dir, line.rstrip().decode("utf-8", "replace"))
+        if os.path.exists(path_dir):
+            callsites.append(
+                SysPathCallsite(pth_path, lineno, "sys.path", "append", f"({path_dir!r},)")
+            )
+    return callsites
+
+
+def get_site_dirs() -> List[str]:
+    site_dirs = list(site.getsitepackages()) if hasattr(site, "getsitepackages") else []
+    if site.ENABLE_USER_SITE:
+        site_dirs.append(site.getusersitepackages())
+    return [site_dir for site_dir in dict.fromkeys(site_dirs) if os.path.isdir(site_dir)]
+
+
+def scan_syspath_manipulations(
+    srcdirs: Iterable[str],
+    site_dirs: Iterable[str] = (),
+    scan_site_packages: bool = False,
+    max_workers: Optional[int] = None,
+    use_cache: bool = True,
+) -> Tuple[int, List[SysPathCallsite], List[str]]:
+    """
+    Without running anything, find each manipulation of sys.path, and call of site.addsitedir(),
+    that SysPathSleuth would report at runtime. Files are filtered by a byte search within this
+    process, and the rest parsed on a process pool; with use_cache, only files changed since the
+    prior scan are read.
+
+    :param srcdirs: sys.path entries to scan; typically discovered by discover_srcdirs()
+    :param site_dirs: site directories whose .pth files to scan
+    :param scan_site_packages: scan the python files of site_dirs too
+    :param max_workers: default=number of CPUs
+    :param use_cache: reuse, and update, the locally cached results of prior scans
+    :return: number of files scanned, callsites, files that do not parse or cannot be read
+    """
+    site_dirs = list(site_dirs)
+    source_files = sorted(
+        {
+            *find_source_files(srcdirs),
+            *(find_source_files(site_dirs) if scan_site_packages else ()),
+        }
+    )
+    cache = FileResultCache(ANALYSIS_NAME, ANALYSIS_VERSION) if use_cache else None
+    results = analyze_files(
+        source_files,
+        find_syspath_manipulations,
+        cache,
+        max_workers,
+        prefilter=has_syspath_tokens,
+        prefiltered_result=[],
+    )
+    if cache:
+        cache.save()
+
+    callsites: List[SysPathCallsite] = []
+    unparsable: List[str] = []
+    for path, manipulations in results.items():
+        if manipulations is None:
+            unparsable.append(path)
+            continue
+        callsites.extend(SysPathCallsite(path, *manipulation) for manipulation in manipulations)
+    pth_paths = [
+        os.path.join(site_dir, name)
+        for site_dir in site_dirs
+        for name in sorted(os.listdir(site_dir))
+        if name.endswith(".pth") and name[0] != "."
+    ]
+    for pth_path in pth_paths:
+        callsites.extend(scan_pth_file(pth_path))
+    return len(results) + len(pth_paths), sorted(callsites), unparsable
+
+
+def format_callsite(callsite: SysPathCallsite, cwd: str = None) -> str:
+    """
+    :return: callsite as SysPathSleuth reports a mutation, e.g.: "sys.path.append('yow',) from
+    src/module.py:2", so that static and runtime reports join on their ' from ' callsite
+    """
+    # pylint: disable=protected-access
+    filename = SysPathSleuth._get_reported_filename(callsite.path, cwd or os.getcwd())
+    if callsite.action == "=":
+        manipulation = f"sys.path = {callsite.args}"
+    else:
+        manipulation = f"{callsite.target}.{callsite.action}{callsite.args}"
+    return f"{manipulation} from {filename}:{callsite.lineno}"
+
+
+@click.command(
+    help="Without running anything, report each manipulation of sys.path and call of "
+    "site.addsitedir() within the project's src directories and the site directories' .pth "
+    "files, as SysPathSleuth reports them at runtime."
+)
+@click.option(
+    "--project-dir",
+    "-d",
+    type=click.Path(exists=True, file_okay=False),
+    help="default=discover the project root",
+)
+@click.option(
+    "--pattern",
+    "-p",
+    "patterns",
+    multiple=True,
+    help=f"project root relative glob of src directories; repeatable. "
+    f"default={' '.join(DEFAULT_SRCDIR_PATTERNS)}",
+)
+@click.option(
+    "--site-packages",
+    "scan_site_packages",
+    is_flag=True,
+    default=False,
+    help="scan the site directories' python files too, not just their .pth files",
+)
+@click.option("--no-site", is_flag=True, default=False, help="scan no site directory")
+@click.option("--jobs", "-j", type=click.IntRange(1), help="default=number of CPUs")
+@click.option("--no-cache", is_flag=True, default=False, help="reparse every file")
+def syspath_scanner_main(
+    project_dir: Optional[str],
+    patterns: Tuple[str, ...],
+    scan_site_packages: bool,
+    no_site: bool,
+    jobs: Optional[int],
+    no_cache: bool,
+):
+    project_path = Path(project_dir) if project_dir else Path(get_project_root_dir())
+    srcdirs = discover_srcdirs(project_path.absolute(), patterns or DEFAULT_SRCDIR_PATTERNS)
+    site_dirs = [] if no_site else get_site_dirs()
+    file_count, callsites, unparsable = scan_syspath_manipulations(
+        srcdirs, site_dirs, scan_site_packages, jobs, not no_cache
+    )
+    for path in unparsable:
+        click.echo(f"{path}: does not parse or cannot be read; not scanned", err=True)
+    cwd = os.getcwd()
+    for callsite in callsites:
+        click.echo(format_callsite(callsite, cwd))
+    click.echo(f"{file_count} file(s) scanned: {len(callsites)} sys.path manipulation(s)", err=True)
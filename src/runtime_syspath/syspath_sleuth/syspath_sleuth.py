@@ -1,11 +1,84 @@
+import atexit
 import inspect
 import logging
 import os
 import site
 import sys
+import threading
+from collections import deque
 from pathlib import Path, PurePath
-from types import FrameType
-from typing import List, Optional
+from time import perf_counter_ns, process_time_ns
+from types import CodeType, FrameType
+from typing import Any, Deque, Dict, List, Optional, TextIO, Tuple
+
+# (action, args, filename, lineno, thread name, asyncio task name)
+SleuthEvent = Tuple[str, tuple, str, int, str, Optional[str]]
+# (action, interned frames of the stack from the outermost to the caller)
+SleuthStack = Tuple[str, Tuple[int, ...]]
+# Events, per thread, between checks of the overhead against $SYSPATH_SLEUTH_OVERHEAD_WARN
+OVERHEAD_CHECK_INTERVAL = 1024
+
+
+def _get_batch_size() -> int:
+    try:
+        return max(1, int(os.getenv("SYSPATH_SLEUTH_BATCH_SIZE") or 1))
+    except ValueError:
+        return 1
+
+
+def _get_stack_depth() -> int:
+    try:
+        return max(0, int(os.getenv("SYSPATH_SLEUTH_STACK_DEPTH") or 0))
+    except ValueError:
+        return 0
+
+
+def _get_overhead_warn_percent() -> Optional[float]:
+    try:
+        return float(os.getenv("SYSPATH_SLEUTH_OVERHEAD_WARN") or "")
+    except ValueError:
+        return None
+
+
+class SleuthThreadState:
+    """
+    A thread's event buffer and counters; only ever updated by its thread, so without a lock.
+    """
+
+    __slots__ = (
+        "buffer",
+        "mutations",
+        "stacks",
+        "events",
+        "dropped",
+        "where_ns",
+        "stack_ns",
+        "emit_ns",
+    )
+
+    def __init__(self):
+        self.buffer: Deque[SleuthEvent] = deque()
+        # action -> count
+        self.mutations: Dict[str, int] = {}
+        # stack -> count
+        self.stacks: Dict[SleuthStack, int] = {}
+        self.events = 0
+        self.dropped = 0
+        self.where_ns = 0
+        self.stack_ns = 0
+        self.emit_ns = 0
+
+    def add(self, state: "SleuthThreadState") -> None:
+        # copy() is atomic; state's thread may be adding to them meanwhile.
+        for action, count in state.mutations.copy().items():
+            self.mutations[action] = self.mutations.get(action, 0) + count
+        for stack, count in state.stacks.copy().items():
+            self.stacks[stack] = self.stacks.get(stack, 0) + count
+        self.events += state.events
+        self.dropped += state.dropped
+        self.where_ns += state.where_ns
+        self.stack_ns += state.stack_ns
+        self.emit_ns += state.emit_ns
 
 
 class SysPathSleuth(list):
@@ -13,6 +86,37 @@ class SysPathSleuth(list):
     logger.setLevel(logging.NOTSET)
     logger.propagate = False
 
+    # Events are captured into a buffer per thread, without a lock, and reported once
+    # batch_size of them are buffered; at exit or on flush() otherwise. 1 reports each event as
+    # it happens.
+    batch_size: int = _get_batch_size()
+    _local = threading.local()
+    _states: List[Tuple[threading.Thread, SleuthThreadState]] = []
+    # Counters of threads since ended
+    _ended_state = SleuthThreadState()
+    _states_lock = threading.Lock()
+    # Warn once sleuthing costs more than this percentage of process CPU time.
+    overhead_warn_percent: Optional[float] = _get_overhead_warn_percent()
+    _is_overhead_warned = False
+    # Report stats() at exit; opted into by $SYSPATH_SLEUTH_SUMMARY.
+    summary_at_exit = os.getenv("SYSPATH_SLEUTH_SUMMARY") is not None
+    # Count each mutation's stack, this many frames up from its caller; 0 does not.
+    stack_depth: int = _get_stack_depth()
+    # Written at exit: speedscope JSON if named '*.json', else collapsed stacks.
+    stacks_path: Optional[str] = os.getenv("SYSPATH_SLEUTH_STACKS") or None
+    # (code, lineno) -> index within _frames of its (filename, function, lineno)
+    _frame_indexes: Dict[Tuple[CodeType, int], int] = {}
+    _frames: List[Tuple[str, str, int]] = []
+    # Whether events are reported at all (so the stack is inspected); None until refresh().
+    _is_reporting: Optional[bool] = None
+    # (filename, cwd) -> filename as reported
+    _reported_filenames: Dict[Tuple[str, str], PurePath] = {}
+    _is_at_exit_registered = False
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        type(self)._register_at_exit()
+
     def insert(self, *args):
         self._where("insert", args)
         return super().insert(*args)
@@ -79,12 +183,59 @@ class SysPathSleuth(list):
     def get_base_list(self) -> List[str]:
         return list(self)
 
+    def is_enabled(self) -> bool:
+        return True
+
+    def enable(self) -> None:
+        pass
+
+    def disable(self) -> None:
+        """
+        Stop sleuthing this list in place, so that every reference to it still sees sys.path: it
+        becomes a DisabledSysPathSleuth, whose mutations cost what a list's do, until enable()'d.
+        """
+        self.flush()
+        self.__class__ = DisabledSysPathSleuth
+
+    @staticmethod
+    def toggle(*_) -> None:
+        """
+        Disable sys.path's sleuthing if enabled, else enable it; a signal handler, so nothing
+        buffered is reported meanwhile. A subclass sys.path has become, e.g., frozen, is left be.
+        """
+        syspath = sys.path
+        if type(syspath) is SysPathSleuth:  # pylint: disable=unidiomatic-typecheck
+            syspath.__class__ = DisabledSysPathSleuth
+        elif isinstance(syspath, DisabledSysPathSleuth):
+            syspath.enable()
+
+    @classmethod
+    def install_toggle_signal(cls, signal_name: str = "SIGUSR1") -> bool:
+        """
+        Have signal_name toggle() sys.path's sleuthing: e.g., `kill -USR1 <pid>`.
+
+        :return: whether installed; not on platforms without signal_name or off the main thread
+        """
+        import signal  # pylint: disable=import-outside-toplevel
+
+        signum = getattr(signal, signal_name, None)
+        if not isinstance(signum, signal.Signals):
+            cls._inform_user(f"SysPathSleuth cannot toggle on {signal_name}", logging.WARNING)
+            return False
+        if threading.current_thread() is not threading.main_thread():
+            return False
+        signal.signal(signum, cls.toggle)
+        return True
+
     @classmethod
     def config_logger(cls, handler: logging.Handler = None, level: int = -1):
+        cls.flush()
         if level != -1:
             cls.logger.setLevel(level)
         if handler:
             cls.logger.addHandler(handler)
+        cls.refresh()
+        if handler:
             if cls.logger.getEffectiveLevel() < handler.level:
                 logger_level_name = logging.getLevelName(cls.logger.getEffectiveLevel())
                 handler_level_name = logging.getLevelName(handler.level)
@@ -95,32 +246,355 @@ class SysPathSleuth(list):
                 cls._inform_user(message)
 
     @classmethod
-    def _where(cls, action, args):
+    def refresh(cls) -> bool:
+        """
+        Recheck, after configuring SysPathSleuth.logger other than through config_logger(), whether
+        events are reported; the check is cached since it is made on every sys.path mutation.
 
-        frame_info: Optional[inspect.Traceback] = None
-        # Only inspect the slooow stack introspection if print()'ing or logging level is sufficient.
-        if not cls._is_logging_on() or cls.logger.isEnabledFor(logging.INFO):
-            syspath_caller: FrameType = inspect.currentframe().f_back.f_back
-            if not (inspect.istraceback(syspath_caller) or inspect.isframe(syspath_caller)):
-                return
-            frame_info: inspect.Traceback = inspect.getframeinfo(syspath_caller)
+        :return: whether events are reported
+        """
+        # Only inspect the stack if print()'ing or logging level is sufficient.
+        cls._is_reporting = not cls._is_logging_on() or cls.logger.isEnabledFor(logging.INFO)
+        return cls._is_reporting
+
+    @classmethod
+    def flush(cls) -> None:
+        """
+        Report the events buffered by every thread.
+        """
+        with cls._states_lock:
+            states = list(cls._states)
+            cls._states.clear()
+            for thread, state in states:
+                if thread.is_alive():
+                    cls._states.append((thread, state))
+                else:
+                    # Its counters can no longer change.
+                    cls._ended_state.add(state)
+        for _, state in states:
+            cls._flush_buffer(state.buffer)
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """
+        Counters of all threads; times are in nanoseconds. 'where_ns' is the time spent capturing
+        mutations (including 'stack_ns' spent inspecting the stack) and 'emit_ns' the time spent
+        formatting and reporting them; their sum is 'overhead_ns'. 'dropped' counts events lost
+        to a caller that could not be inspected or to a failed report.
+
+        :return: {'mutations': {action: count}, 'events', 'dropped', 'where_ns', 'stack_ns',
+        'emit_ns', 'overhead_ns', 'process_cpu_ns', 'overhead_percent'}
+        """
+        total = SleuthThreadState()
+        with cls._states_lock:
+            total.add(cls._ended_state)
+            for _, state in cls._states:
+                total.add(state)
+        process_cpu_ns = process_time_ns()
+        overhead_ns = total.where_ns + total.emit_ns
+        return {
+            "mutations": total.mutations,
+            "events": total.events,
+            "dropped": total.dropped,
+            "where_ns": total.where_ns,
+            "stack_ns": total.stack_ns,
+            "emit_ns": total.emit_ns,
+            "overhead_ns": overhead_ns,
+            "process_cpu_ns": process_cpu_ns,
+            "overhead_percent": 100 * overhead_ns / process_cpu_ns if process_cpu_ns else 0.0,
+        }
 
-        if frame_info:
-            filename = PurePath(frame_info.filename)
+    @classmethod
+    def report_stats(cls) -> None:
+        stats = cls.stats()
+        mutations = stats["mutations"]
+        actions = ", ".join(f"{action}={mutations[action]}" for action in sorted(mutations))
+        cls._inform_user(
+            f"SysPathSleuth: {sum(mutations.values())} sys.path mutations"
+            f"{f' ({actions})' if actions else ''}; {stats['events']} reported, "
+            f"{stats['dropped']} dropped; overhead {stats['overhead_ns'] / 1e6:.3f}ms "
+            f"(stack {stats['stack_ns'] / 1e6:.3f}ms, emit {stats['emit_ns'] / 1e6:.3f}ms), "
+            f"{stats['overhead_percent']:.2f}% of {stats['process_cpu_ns'] / 1e6:.1f}ms "
+            f"process CPU time"
+        )
+
+    @classmethod
+    def check_overhead(cls) -> bool:
+        """
+        Warn, once, if sleuthing has cost more than $SYSPATH_SLEUTH_OVERHEAD_WARN percent of
+        process CPU time so far.
+
+        :return: whether the overhead exceeds the threshold
+        """
+        if cls.overhead_warn_percent is None:
+            return False
+        overhead_percent = cls.stats()["overhead_percent"]
+        if overhead_percent <= cls.overhead_warn_percent:
+            return False
+        if not cls._is_overhead_warned:
+            cls._is_overhead_warned = True
+            cls._inform_user(
+                f"SysPathSleuth overhead is {overhead_percent:.2f}% of process CPU time, over "
+                f"$SYSPATH_SLEUTH_OVERHEAD_WARN={cls.overhead_warn_percent:g}%; consider "
+                f"disabling it with $SYSPATH_SLEUTH_KILL.",
+                logging.WARNING,
+            )
+        return True
+
+    @classmethod
+    def _register_at_exit(cls) -> None:
+        """
+        Flush, write stacks and report at exit once a sleuth is installed; not merely imported.
+        """
+        if not SysPathSleuth._is_at_exit_registered:
+            SysPathSleuth._is_at_exit_registered = True
+            atexit.register(SysPathSleuth._at_exit)
+
+    @classmethod
+    def _at_exit(cls) -> None:
+        cls.flush()
+        if cls.stacks_path and cls.stack_depth:
             try:
-                filename = PurePath(frame_info.filename).relative_to(sys.base_prefix)
-            except ValueError:
-                filename_orig = filename
-                cwd = Path.cwd()
-                while filename == filename_orig:
-                    try:
-                        filename = PurePath(frame_info.filename).relative_to(cwd)
-                        break
-                    except ValueError:
-                        cwd = cwd.parent
+                with open(cls.stacks_path, "w") as stacks_f:
+                    if cls.stacks_path.endswith(".json"):
+                        cls.write_speedscope(stacks_f)
+                    else:
+                        cls.write_collapsed_stacks(stacks_f)
+            except OSError as ex:
+                cls._inform_user(f"SysPathSleuth could not write stacks: {ex}", logging.WARNING)
+        if cls.summary_at_exit and any(cls.stats()["mutations"].values()):
+            cls.report_stats()
+        cls.check_overhead()
+
+    @classmethod
+    def _get_state(cls) -> SleuthThreadState:
+        try:
+            return cls._local.state
+        except AttributeError:
+            state = cls._local.state = SleuthThreadState()
+            with cls._states_lock:
+                cls._states.append((threading.current_thread(), state))
+            return state
+
+    @classmethod
+    def _where(cls, action, args, caller_depth: int = 2):
+        """
+        :param caller_depth: frames from this one up to the mutation's caller; 2 when called from
+        a list method's override, one more per override of _where() calling it in turn
+        """
+        where_start_ns = perf_counter_ns()
+        state = cls._get_state()
+        mutations = state.mutations
+        mutations[action] = mutations.get(action, 0) + 1
+        is_reporting = cls._is_reporting
+        if is_reporting is None:
+            is_reporting = cls.refresh()
+        if not is_reporting and not cls.stack_depth:
+            state.where_ns += perf_counter_ns() - where_start_ns
+            return
+
+        stack_start_ns = perf_counter_ns()
+        syspath_caller: Optional[FrameType] = inspect.currentframe()
+        for _ in range(caller_depth):
+            if syspath_caller is None:
+                break
+            syspath_caller = syspath_caller.f_back
+        if not (inspect.istraceback(syspath_caller) or inspect.isframe(syspath_caller)):
+            state.dropped += 1
+            state.where_ns += perf_counter_ns() - where_start_ns
+            return
+        if cls.stack_depth:
+            stack = (action, cls._get_stack(syspath_caller))
+            state.stacks[stack] = state.stacks.get(stack, 0) + 1
+            if not is_reporting:
+                state.stack_ns += perf_counter_ns() - stack_start_ns
+                state.where_ns += perf_counter_ns() - where_start_ns
+                return
+        event: SleuthEvent = (
+            action,
+            args,
+            syspath_caller.f_code.co_filename,
+            syspath_caller.f_lineno,
+            threading.current_thread().name,
+            cls._get_task_name(),
+        )
+        state.stack_ns += perf_counter_ns() - stack_start_ns
+        buffer = state.buffer
+        buffer.append(event)
+        state.events += 1
+        is_check_due = not state.events % OVERHEAD_CHECK_INTERVAL
+        state.where_ns += perf_counter_ns() - where_start_ns
+        if len(buffer) >= cls.batch_size:
+            cls._flush_buffer(buffer)
+        if is_check_due:
+            cls.check_overhead()
+
+    @classmethod
+    def _get_stack(cls, frame: Optional[FrameType]) -> Tuple[int, ...]:
+        frame_indexes = cls._frame_indexes
+        stack: List[int] = []
+        while frame is not None and len(stack) < cls.stack_depth:
+            key = (frame.f_code, frame.f_lineno)
+            frame_index = frame_indexes.get(key)
+            if frame_index is None:
+                with cls._states_lock:
+                    frame_index = frame_indexes.get(key)
+                    if frame_index is None:
+                        code = frame.f_code
+                        cls._frames.append((code.co_filename, code.co_name, frame.f_lineno))
+                        frame_index = frame_indexes[key] = len(cls._frames) - 1
+            stack.append(frame_index)
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+    @classmethod
+    def get_stacks(cls) -> Dict[Tuple[str, ...], int]:
+        """
+        The count of mutations per stack captured since $SYSPATH_SLEUTH_STACK_DEPTH, or
+        stack_depth, was set.
+
+        :return: (frame name, ... , 'sys.path.<action>') from the outermost frame -> count
+        """
+        total = SleuthThreadState()
+        with cls._states_lock:
+            total.add(cls._ended_state)
+            for _, state in cls._states:
+                total.add(state)
+            frames = list(cls._frames)
+        cwd = os.getcwd()
+        frame_names = [
+            f"{function} ({cls._get_reported_filename(filename, cwd)}:{lineno})"
+            for filename, function, lineno in frames
+        ]
+        stacks: Dict[Tuple[str, ...], int] = {}
+        for (action, frame_indexes), count in total.stacks.items():
+            stack = tuple(frame_names[index] for index in frame_indexes) + (f"sys.path.{action}",)
+            stacks[stack] = stacks.get(stack, 0) + count
+        return stacks
+
+    @classmethod
+    def write_collapsed_stacks(cls, stacks_f: TextIO) -> None:
+        """
+        Write get_stacks() in the collapsed stack format of flamegraph.pl: 'frame;...;frame count'.
+        """
+        for stack, count in sorted(cls.get_stacks().items()):
+            stacks_f.write(";".join(name.replace(";", ":") for name in stack) + f" {count}\n")
+
+    @classmethod
+    def write_speedscope(cls, stacks_f: TextIO) -> None:
+        """
+        Write get_stacks() as a speedscope (https://www.speedscope.app) sampled profile weighted by
+        mutation count.
+        """
+        import json  # pylint: disable=import-outside-toplevel
+
+        stacks = cls.get_stacks()
+        frame_indexes: Dict[str, int] = {}
+        samples = [
+            [frame_indexes.setdefault(name, len(frame_indexes)) for name in stack]
+            for stack in stacks
+        ]
+        weights = list(stacks.values())
+        speedscope = {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": [{"name": name} for name in frame_indexes]},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": "sys.path mutations",
+                    "unit": "none",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+            "name": "SysPathSleuth",
+            "activeProfileIndex": 0,
+            "exporter": "runtime-syspath SysPathSleuth",
+        }
+        json.dump(speedscope, stacks_f)
+
+    @staticmethod
+    def _get_task_name() -> Optional[str]:
+        # Never import asyncio; a task can only be running if something else imported it.
+        asyncio = sys.modules.get("asyncio")
+        if asyncio is None:
+            return None
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            # No running event loop in this thread
+            return None
+        if task is None:
+            return None
+        return task.get_name() if hasattr(task, "get_name") else f"Task-{id(task)}"
+
+    @classmethod
+    def _flush_buffer(cls, buffer: Deque[SleuthEvent]) -> None:
+        events: List[SleuthEvent] = []
+        try:
+            while True:
+                events.append(buffer.popleft())
+        except IndexError:
+            pass
+        if not events:
+            return
+
+        emit_start_ns = perf_counter_ns()
+        cwd = os.getcwd()
+        main_thread_name = threading.main_thread().name
+        messages: List[Tuple[str, Dict[str, Any]]] = []
+        for action, args, filename, lineno, thread_name, task_name in events:
+            reported_filename = cls._get_reported_filename(filename, cwd)
+            message = f"sys.path.{action}{args} from {reported_filename}:{lineno}"
+            if thread_name != main_thread_name or task_name:
+                message += f" [thread {thread_name}{f', task {task_name}' if task_name else ''}]"
+            # The event itself, for handlers storing rather than formatting it
+            extra = {
+                "sleuth_action": action,
+                "sleuth_args": args,
+                "sleuth_callsite": f"{reported_filename}:{lineno}",
+                "sleuth_thread": thread_name,
+                "sleuth_task": task_name,
+            }
+            messages.append((message, extra))
 
-            message = f"sys.path.{action}{args} from {filename}:{frame_info.lineno}"
-            cls._inform_user(message)
+        state = cls._get_state()
+        try:
+            if cls._is_logging_on() and cls.logger.isEnabledFor(logging.INFO):
+                for message, extra in messages:
+                    cls.logger.info(message, extra=extra)
+            else:
+                print("\n".join(message for message, _ in messages))
+        except (OSError, ValueError):
+            # e.g.: stdout closed by the time of exit
+            state.dropped += len(messages)
+        state.emit_ns += perf_counter_ns() - emit_start_ns
+
+    @classmethod
+    def _get_reported_filename(cls, filename: str, cwd: str) -> PurePath:
+        reported_filename = cls._reported_filenames.get((filename, cwd))
+        if reported_filename:
+            return reported_filename
+
+        reported_filename = PurePath(filename)
+        try:
+            reported_filename = PurePath(filename).relative_to(sys.base_prefix)
+        except ValueError:
+            cwd_path = Path(cwd)
+            while True:
+                try:
+                    reported_filename = PurePath(filename).relative_to(cwd_path)
+                    break
+                except ValueError:
+                    if cwd_path == cwd_path.parent:
+                        # e.g.: '<string>'
+                        break
+                    cwd_path = cwd_path.parent
+        cls._reported_filenames[(filename, cwd)] = reported_filename
+        return reported_filename
 
     @classmethod
     def _is_logging_on(cls):
@@ -195,6 +669,33 @@ class SysPathSleuth(list):
         return True
 
 
+class DisabledSysPathSleuth(list):
+    """
+    A disabled SysPathSleuth: a list subclass without overrides, so that mutations cost what a
+    list's do. Counters, stacks and buffered events stay with SysPathSleuth until enable()'d.
+    """
+
+    def get_base_list(self) -> List[str]:
+        return list(self)
+
+    def is_enabled(self) -> bool:
+        return False
+
+    def enable(self) -> None:
+        self.__class__ = SysPathSleuth
+
+    def disable(self) -> None:
+        pass
+
+    @staticmethod
+    def stats() -> Dict[str, Any]:
+        return SysPathSleuth.stats()
+
+
 # Might be pytest'ing...
 if SysPathSleuth.is_sleuth_active():
     sys.path = SysPathSleuth(sys.path)
+    if os.getenv("SYSPATH_SLEUTH_DISABLED") is not None:
+        sys.path.disable()
+    if os.getenv("SYSPATH_SLEUTH_TOGGLE_SIGNAL"):
+        SysPathSleuth.install_toggle_signal(os.environ["SYSPATH_SLEUTH_TOGGLE_SIGNAL"])
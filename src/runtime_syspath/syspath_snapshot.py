@@ -0,0 +1,211 @@
+""" syspath_snapshot module. """
+import atexit
+import json
+import os
+import sys
+import tempfile
+from importlib.machinery import ModuleSpec, PathFinder
+from pathlib import Path, PurePath
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from .syspath_cache import get_cache_dir
+
+SNAPSHOT_ENV_VAR = "RUNTIME_SYSPATH_SNAPSHOT"
+SNAPSHOT_CACHE_SUBDIR = "snapshots"
+SNAPSHOT_VERSION = 2
+
+
+class SysPathSnapshot(NamedTuple):
+    project_root: str
+    # get_interpreter() of the parent
+    interpreter: List[str]
+    # srcdirs_key() -> discovered src directories
+    srcdirs: Dict[str, List[str]]
+    # top-level module name -> the sys.path entry it is imported from
+    module_index: Dict[str, str]
+
+
+_SNAPSHOT: Optional[SysPathSnapshot] = None
+
+
+class SnapshotModuleIndexFinder:
+    """
+    Meta path finder resolving indexed top-level modules within the one sys.path entry the
+    snapshot's parent resolved them from, rather than probing each sys.path entry in turn.
+    Anything else is left to the finders that follow.
+    """
+
+    def __init__(self, module_index: Dict[str, str]):
+        self.module_index = module_index
+
+    def find_spec(
+        self, fullname: str, path: Optional[Sequence[str]] = None, target=None
+    ) -> Optional[ModuleSpec]:
+        entry = self.module_index.get(fullname) if path is None else None
+        return PathFinder.find_spec(fullname, [entry], target) if entry else None
+
+    def invalidate_caches(self) -> None:
+        pass
+
+
+def srcdirs_key(project_dir: PurePath, patterns: Iterable[str]) -> str:
+    return "\0".join([os.fspath(project_dir), *patterns])
+
+
+def get_interpreter() -> List[str]:
+    """
+    :return: what a snapshot's src directories and module index are valid within: interpreters
+    sharing the parent's environment (sys.prefix) and bytecode (cache_tag)
+    """
+    return [str(sys.implementation.cache_tag), sys.prefix]
+
+
+def get_loaded_snapshot() -> Optional[SysPathSnapshot]:
+    """
+    :return: the snapshot loaded into this process, if any
+    """
+    return _SNAPSHOT
+
+
+def build_module_index(srcdirs: Iterable[str]) -> Dict[str, str]:
+    """
+    Index the top-level modules and regular packages within srcdirs that this process's sys.path
+    resolves from srcdirs: a module shadowed by an earlier sys.path entry, or a namespace package,
+    is left unindexed.
+
+    :param srcdirs: sys.path entries to index
+    :return: top-level module name -> srcdir
+    """
+    module_index: Dict[str, str] = {}
+    for srcdir in srcdirs:
+        try:
+            dir_entries = list(os.scandir(srcdir))
+        except OSError:
+            continue
+        for dir_entry in dir_entries:
+            name, extension = os.path.splitext(dir_entry.name)
+            if dir_entry.is_dir():
+                name = dir_entry.name
+            elif extension != ".py":
+                continue
+            if not name.isidentifier() or name in module_index:
+                continue
+            spec = PathFinder.find_spec(name)
+            if (
+                spec
+                and spec.origin
+                and spec.origin == getattr(PathFinder.find_spec(name, [srcdir]), "origin", None)
+            ):
+                module_index[name] = srcdir
+    return module_index
+
+
+def write_snapshot(
+    user_provided_project_dir: PurePath = None,
+    patterns: Iterable[str] = None,
+    module_index: bool = False,
+    snapshot_path: Path = None,
+) -> Path:
+    """
+    Discover the project root and src directories once, add the latter to sys.path and write a
+    snapshot of the result to be loaded by children (multiprocessing spawn/forkserver workers,
+    subprocesses) instead of rediscovering. The snapshot is named in $RUNTIME_SYSPATH_SNAPSHOT,
+    inherited by children; a default snapshot_path is removed at exit.
+
+    :param user_provided_project_dir: default=discover the project root
+    :param patterns: default=DEFAULT_SRCDIR_PATTERNS
+    :param module_index: include an index of the modules within the src directories that spares
+    children probing each sys.path entry on their import
+    :param snapshot_path: default=a temporary file in the local cache directory
+    :return: snapshot_path
+    """
+    # pylint: disable=global-statement,import-outside-toplevel,cyclic-import
+    global _SNAPSHOT
+    from .syspath_path_utils import get_project_root_dir
+    from .syspath_utils import (
+        DEFAULT_SRCDIR_PATTERNS,
+        add_paths_to_syspath,
+        discover_srcdirs,
+        write_text_atomically,
+    )
+
+    patterns = tuple(DEFAULT_SRCDIR_PATTERNS if patterns is None else patterns)
+    project_dir = Path(get_project_root_dir(user_provided_project_dir)).absolute()
+    srcdirs = discover_srcdirs(project_dir, patterns)
+    add_paths_to_syspath(srcdirs, quiet=True)
+    snapshot = SysPathSnapshot(
+        os.fspath(project_dir),
+        get_interpreter(),
+        {srcdirs_key(project_dir, patterns): srcdirs},
+        build_module_index(srcdirs) if module_index else {},
+    )
+
+    if not snapshot_path:
+        snapshot_fd, snapshot_path_str = tempfile.mkstemp(
+            suffix=".json", dir=os.fspath(get_cache_dir(SNAPSHOT_CACHE_SUBDIR))
+        )
+        os.close(snapshot_fd)
+        snapshot_path = Path(snapshot_path_str)
+        atexit.register(remove_snapshot, snapshot_path)
+    write_text_atomically(
+        snapshot_path, json.dumps({"version": SNAPSHOT_VERSION, **snapshot._asdict()})
+    )
+    os.environ[SNAPSHOT_ENV_VAR] = os.fspath(snapshot_path)
+    _SNAPSHOT = snapshot
+    return snapshot_path
+
+
+def remove_snapshot(snapshot_path: Path) -> None:
+    if os.environ.get(SNAPSHOT_ENV_VAR) == os.fspath(snapshot_path):
+        del os.environ[SNAPSHOT_ENV_VAR]
+    try:
+        snapshot_path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def load_snapshot(snapshot_path: Path = None) -> Optional[SysPathSnapshot]:
+    """
+    Load and apply a snapshot written by write_snapshot(): append its src directories missing
+    from sys.path, have get_project_root_dir() and add_srcdirs_to_syspath() answer from it and
+    install its module index ahead of the sys.path finder. Called by runtime_syspath's import; a
+    missing, unreadable or foreign snapshot, or one written by another interpreter, is ignored,
+    leaving discovery to walk the tree.
+
+    :param snapshot_path: default=$RUNTIME_SYSPATH_SNAPSHOT
+    :return: the snapshot applied or None
+    """
+    global _SNAPSHOT  # pylint: disable=global-statement
+    snapshot_path_str = os.fspath(snapshot_path) if snapshot_path else os.getenv(SNAPSHOT_ENV_VAR)
+    if not snapshot_path_str:
+        return None
+    try:
+        with open(snapshot_path_str) as snapshot_f:
+            snapshot_dict = json.load(snapshot_f)
+        if snapshot_dict.pop("version") != SNAPSHOT_VERSION:
+            return None
+        snapshot = SysPathSnapshot(**snapshot_dict)
+    except (OSError, ValueError, TypeError, KeyError):
+        return None
+    if snapshot.interpreter != get_interpreter():
+        return None
+
+    known_paths = set(sys.path)
+    sys.path.extend(
+        dict.fromkeys(
+            srcdir
+            for srcdirs in snapshot.srcdirs.values()
+            for srcdir in srcdirs
+            if srcdir not in known_paths
+        )
+    )
+    if snapshot.module_index:
+        sys.meta_path[:] = [
+            finder for finder in sys.meta_path if not isinstance(finder, SnapshotModuleIndexFinder)
+        ]
+        sys.meta_path.insert(
+            sys.meta_path.index(PathFinder) if PathFinder in sys.meta_path else len(sys.meta_path),
+            SnapshotModuleIndexFinder(snapshot.module_index),
+        )
+    _SNAPSHOT = snapshot
+    return snapshot
@@ -0,0 +1,219 @@
+""" syspath_usage module. """
+import ast
+import importlib.machinery
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import click
+
+from .relative_import_checker import find_source_files
+from .syspath_cache import FileResultCache, analyze_files
+from .syspath_path_utils import get_project_root_dir
+from .syspath_utils import DEFAULT_SRCDIR_PATTERNS, discover_srcdirs
+
+ANALYSIS_NAME = "absolute_imports"
+ANALYSIS_VERSION = 1
+DEFAULT_ENTRY_DIRS = ("tests",)
+DYNAMIC_IMPORT_FUNCTIONS = ("import_module", "__import__")
+
+
+class SrcdirUsage(NamedTuple):
+    srcdir: str
+    # top-level modules and packages within srcdir
+    modules: List[str]
+    # files, outside of srcdir, importing any of its modules
+    importers: List[str]
+    # imported, directly or through other srcdirs, by entry files
+    is_used: bool
+
+
+def find_absolute_imports(content: bytes, path: str) -> Optional[List[str]]:
+    """
+    :param content: python source
+    :param path: file of content
+    :return: sorted top-level module names of each absolute import, including
+    importlib.import_module() and __import__() of a string literal; None if content does not parse
+    """
+    try:
+        tree = ast.parse(content, path)
+    except (SyntaxError, ValueError):
+        return None
+    names: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.partition(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and not node.level and node.module:
+            names.add(node.module.partition(".")[0])
+        elif isinstance(node, ast.Call):
+            name = get_dynamic_import_name(node)
+            if name and not name.startswith("."):
+                names.add(name.partition(".")[0])
+    return sorted(names)
+
+
+def get_dynamic_import_name(node: ast.Call) -> Optional[str]:
+    """
+    :return: the module name of importlib.import_module() or __import__() of a string literal
+    """
+    if not node.args:
+        return None
+    if getattr(node.func, "attr", getattr(node.func, "id", None)) not in DYNAMIC_IMPORT_FUNCTIONS:
+        return None
+    # python 3.7 parses string literals to ast.Str
+    name = getattr(node.args[0], "value", getattr(node.args[0], "s", None))
+    return name if isinstance(name, str) else None
+
+
+def get_srcdir_modules(srcdir: str) -> Set[str]:
+    """
+    :param srcdir: sys.path entry
+    :return: top-level module and package (regular or namespace) names importable from srcdir
+    """
+    modules: Set[str] = set()
+    try:
+        dir_entries = list(os.scandir(srcdir))
+    except OSError:
+        return modules
+    for dir_entry in dir_entries:
+        if dir_entry.is_dir():
+            name = dir_entry.name
+        elif dir_entry.name.endswith(tuple(importlib.machinery.all_suffixes())):
+            name = dir_entry.name.partition(".")[0]
+        else:
+            continue
+        if name.isidentifier() and name != "__pycache__":
+            modules.add(name)
+    return modules
+
+
+def analyze_srcdir_usage(
+    srcdirs: Iterable[str],
+    entry_dirs: Iterable[str],
+    max_workers: Optional[int] = None,
+    use_cache: bool = True,
+) -> List[SrcdirUsage]:
+    """
+    Statically resolve the absolute imports of every file under srcdirs and entry_dirs against
+    the modules within each of srcdirs. A srcdir is used if imported by a file under entry_dirs
+    (but outside of all srcdirs), or by a file within another used srcdir. Files are parsed on a
+    process pool; with use_cache, only files changed since the prior analysis are parsed.
+
+    :param srcdirs: sys.path entries to analyze; typically discovered by discover_srcdirs()
+    :param entry_dirs: directories of the files importing srcdirs, e.g.: tests
+    :param max_workers: default=number of CPUs
+    :param use_cache: reuse, and update, the locally cached results of prior analyses
+    :return: usage per srcdir, in srcdirs order
+    """
+    srcdirs = [os.path.abspath(srcdir) for srcdir in srcdirs]
+    entry_dirs = [os.path.abspath(entry_dir) for entry_dir in entry_dirs]
+    # file -> innermost of srcdirs and entry_dirs it is under
+    source_files = find_source_files([*srcdirs, *entry_dirs])
+    cache = FileResultCache(ANALYSIS_NAME, ANALYSIS_VERSION) if use_cache else None
+    results = analyze_files(sorted(source_files), find_absolute_imports, cache, max_workers)
+    if cache:
+        cache.save()
+
+    srcdir_modules = {srcdir: get_srcdir_modules(srcdir) for srcdir in srcdirs}
+    module_srcdirs: Dict[str, List[str]] = {}
+    for srcdir, modules in srcdir_modules.items():
+        for module in modules:
+            module_srcdirs.setdefault(module, []).append(srcdir)
+
+    importers: Dict[str, List[str]] = {srcdir: [] for srcdir in srcdirs}
+    # srcdir (or None for an entry file) -> srcdirs it imports
+    imported: Dict[Optional[str], Set[str]] = {}
+    srcdir_set = set(srcdirs)
+    for path, names in results.items():
+        importer_dir = source_files[path] if source_files[path] in srcdir_set else None
+        for name in names or ():
+            for srcdir in module_srcdirs.get(name, ()):
+                if srcdir != importer_dir:
+                    importers[srcdir].append(path)
+                    imported.setdefault(importer_dir, set()).add(srcdir)
+
+    used: Set[str] = set()
+    pending = list(imported.get(None, ()))
+    while pending:
+        srcdir = pending.pop()
+        if srcdir not in used:
+            used.add(srcdir)
+            pending.extend(imported.get(srcdir, ()))
+
+    return [
+        SrcdirUsage(
+            srcdir, sorted(srcdir_modules[srcdir]), sorted(set(importers[srcdir])), srcdir in used
+        )
+        for srcdir in srcdirs
+    ]
+
+
+def prune_unused_srcdirs(project_dir: Path, srcdirs: List[str]) -> List[str]:
+    """
+    :param project_dir: root of project whose 'tests' import srcdirs
+    :param srcdirs: discovered src directories
+    :return: srcdirs used by the project's tests; all of srcdirs if there are no tests
+    """
+    entry_dirs = [
+        os.fspath(project_dir / entry_dir)
+        for entry_dir in DEFAULT_ENTRY_DIRS
+        if (project_dir / entry_dir).is_dir()
+    ]
+    if not entry_dirs:
+        return srcdirs
+    usages = analyze_srcdir_usage(srcdirs, entry_dirs)
+    return [srcdir for srcdir, usage in zip(srcdirs, usages) if usage.is_used]
+
+
+@click.command(
+    help="Report which of the project's src directories are imported, directly or through other "
+    "src directories, by its tests; the unused ones need not be on sys.path."
+)
+@click.option(
+    "--project-dir",
+    "-d",
+    type=click.Path(exists=True, file_okay=False),
+    help="default=discover the project root",
+)
+@click.option(
+    "--pattern",
+    "-p",
+    "patterns",
+    multiple=True,
+    help=f"project root relative glob of src directories; repeatable. "
+    f"default={' '.join(DEFAULT_SRCDIR_PATTERNS)}",
+)
+@click.option(
+    "--entry-dir",
+    "-e",
+    "entry_dirs",
+    multiple=True,
+    help=f"project root relative directory of importing files; repeatable. "
+    f"default={' '.join(DEFAULT_ENTRY_DIRS)}",
+)
+@click.option("--jobs", "-j", type=click.IntRange(1), help="default=number of CPUs")
+@click.option("--no-cache", is_flag=True, default=False, help="reparse every file")
+def srcdir_usage_main(
+    project_dir: Optional[str],
+    patterns: Tuple[str, ...],
+    entry_dirs: Tuple[str, ...],
+    jobs: Optional[int],
+    no_cache: bool,
+):
+    project_path = Path(project_dir or get_project_root_dir()).absolute()
+    srcdirs = discover_srcdirs(project_path, patterns or DEFAULT_SRCDIR_PATTERNS)
+    usages = analyze_srcdir_usage(
+        srcdirs,
+        [os.fspath(project_path / entry_dir) for entry_dir in entry_dirs or DEFAULT_ENTRY_DIRS],
+        jobs,
+        not no_cache,
+    )
+    width = max([len("Src directory")] + [len(usage.srcdir) for usage in usages])
+    click.echo(f"{'Src directory':<{width}}  {'Modules':>7}  {'Importers':>9}  Status")
+    for usage in usages:
+        click.echo(
+            f"{usage.srcdir:<{width}}  {len(usage.modules):>7}  {len(usage.importers):>9}  "
+            f"{'used' if usage.is_used else 'UNUSED'}"
+        )
+    unused_count = sum(not usage.is_used for usage in usages)
+    click.echo(f"{len(usages)} src dir(s): {unused_count} unused")
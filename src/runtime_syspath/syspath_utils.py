@@ -1,19 +1,51 @@
 """ syspath_utils module. """
+import hashlib
 import os
 import re
 import sys
+import tempfile
+import threading
+from contextlib import contextmanager
 from itertools import chain
 from pathlib import Path, PurePath
 from string import Template
 from types import ModuleType
-from typing import Dict, List, Optional, Pattern, Set, Tuple, Union
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Pattern, Set, Tuple, Union
 
+from .syspath_importer_cache import prewarm_importer_cache
 from .syspath_path_utils import get_project_root_dir
 from .syspath_sleuth import get_customize_path
+from .syspath_snapshot import get_loaded_snapshot, srcdirs_key
+
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # pylint: disable=invalid-name
+    import msvcrt
 
 _STD_SYSPATH_FILTER: Union[None, Pattern] = None
 
 PATH_TO_PROJECT_PLACEHOLDER = "path_to_project"
+DEFAULT_SRCDIR_PATTERNS: Tuple[str, ...] = ("src", "tests/**/src")
+CONSOLIDATED_PTH_HASH_HEADER = "# runtime_syspath sha256="
+PTH_MANIFEST_NAME = "pths.manifest"
+PTH_MANIFEST_LOCK_NAME = ".pths.lock"
+PTH_STAGING_DIR_NAME = "staged"
+# Written to a template directory without one, so that its lock and staged templates are not
+# committed along with its manifest
+PTH_GITIGNORE = f"{PTH_MANIFEST_LOCK_NAME}\n{PTH_STAGING_DIR_NAME}/\n"
+PTH_MANIFEST_HEADER = (
+    f"# runtime_syspath pth manifest: one ${{{PATH_TO_PROJECT_PLACEHOLDER}}} rooted path per "
+    f"line in sys.path order\n"
+)
+
+# manifest path -> (_get_pth_manifest_key(), templates)
+_PTH_MANIFEST_CACHE: Dict[Path, Tuple[Tuple[int, int, int], List[str]]] = {}
+
+# The manifest's advisory file lock is per process; this makes it re-entrant within a thread.
+_PTH_MANIFEST_THREAD_LOCK = threading.RLock()
+_PTH_MANIFEST_LOCK_DEPTH = 0
 
 
 def init_std_syspath_filter(std_syspath_filter: Pattern) -> None:
@@ -88,16 +120,25 @@ def persist_syspath(
     user_provided_project_dir: Path = None,
     force_pth_dir_creation: bool = False,
     path_filter: Pattern = None,
+    interactive: Optional[bool] = None,
+    worker_id: Optional[str] = None,
 ) -> None:
     """
-    Persist a set of ordered [000-999]*.pth.template files that represent each
-    project-related entry in the sys.path. The files are persisted into the
-    /pathto/projectroot/pths directory. If caller did not supply the /pathto/projectroot via
-    'user_provided_project_dir', attempt to determine that.
+    Persist an ordered, de-duplicated manifest of templates that represent each project-related
+    entry in the sys.path. The manifest is persisted into the /pathto/projectroot/pths
+    directory. If caller did not supply the /pathto/projectroot via 'user_provided_project_dir',
+    attempt to determine that.
+
+    Safe to call from concurrent processes. A pytest-xdist worker (or any caller providing a
+    'worker_id') only stages its templates; they are merged into the manifest, under an advisory
+    lock, by the next non-worker persist_syspath() or merge_staged_syspath(), e.g.: once per
+    session by the pytest-xdist controller.
 
     :param user_provided_project_dir: root of project using persist_syspath()
     :param force_pth_dir_creation: for directory creation
     :param path_filter: a pattern that the user can provide in addition to the std_syspath_filter
+    :param interactive: prompt to create a missing pths directory; default=stdin is a tty
+    :param worker_id: stage rather than merge; default=$PYTEST_XDIST_WORKER; '' merges
     :return: None
     """
     project_dir: PurePath = (
@@ -107,14 +148,34 @@ def persist_syspath(
     template_dir: Path = Path(project_dir / "pths")
 
     if not template_dir.exists():
-        create = force_pth_dir_creation or input(
-            f"Create {template_dir}? [y,n] "
-        ).strip().lower().startswith("y")
-        if create:
-            template_dir.mkdir(mode=0o766)
+        if interactive is None:
+            interactive = bool(sys.stdin and sys.stdin.isatty())
+        create = force_pth_dir_creation or (
+            interactive and input(f"Create {template_dir}? [y,n] ").strip().lower().startswith("y")
+        )
+        if not create:
+            print(f"Not persisting sys.path; {os.fspath(template_dir)} does not exist.")
+            return
+        template_dir.mkdir(mode=0o766, exist_ok=True)
 
+    templates = get_syspath_templates(Path(project_dir), path_filter)
+    if worker_id is None:
+        worker_id = os.getenv("PYTEST_XDIST_WORKER")
+    if worker_id:
+        stage_pth_templates(template_dir, worker_id, templates)
+    else:
+        merge_staged_syspath(Path(project_dir), templates)
+
+
+def get_syspath_templates(project_dir: Path, path_filter: Pattern = None) -> List[str]:
+    """
+    :param project_dir: root of project
+    :param path_filter: a pattern that the user can provide in addition to the std_syspath_filter
+    :return: a template for each project-related entry in the sys.path
+    """
+    templates: List[str] = []
     sys_paths: List[str] = filtered_sorted_syspath(path_filter, unique=True)
-    for index, sys_path_str in enumerate(sys_paths):
+    for sys_path_str in sys_paths:
         if not sys_path_str.startswith(os.fspath(project_dir)):
             continue
         pth_path = Path(sys_path_str)
@@ -125,33 +186,177 @@ def persist_syspath(
         # project_dir in sys.path
         if relative_pth == project_dir:
             continue
-        template_path = Path(
-            template_dir,
-            f"{index:03d}_{project_dir.stem}_"
-            f"{os.fspath(relative_pth).replace(os.sep, '_')}.pth.template",
+        # Write template that can be converted to wherever a project's clones are rooted using
+        # inject_project_pths_to_site()
+        relative_pth = (
+            os.sep + os.fspath(relative_pth) if relative_pth != Path("root") else Path("")
         )
+        templates.append(f"${{{PATH_TO_PROJECT_PLACEHOLDER}}}{relative_pth}")
+    return templates
+
+
+def stage_pth_templates(template_dir: Path, worker_id: str, templates: List[str]) -> Path:
+    """
+    Atomically write a worker's templates to its own staging file. No two workers share a
+    staging file, yet a merge reads and removes it under the manifest's lock; staging under it
+    too keeps a re-stage from landing between the two and being lost.
+
+    :param template_dir: /pathto/projectroot/pths
+    :param worker_id: identifies the staging worker, e.g.: pytest-xdist's 'gw3'
+    :param templates: templates in sys.path order
+    :return: the staging file
+    """
+    staging_dir = template_dir / PTH_STAGING_DIR_NAME
+    staging_dir.mkdir(exist_ok=True)
+    staged_path = staging_dir / f"{worker_id}.{os.getpid()}.pths"
+    with pth_manifest_lock(template_dir):
+        write_text_atomically(staged_path, "".join(f"{template}\n" for template in templates))
+    return staged_path
+
+
+def has_staged_syspath(template_dir: Path) -> bool:
+    """
+    :param template_dir: /pathto/projectroot/pths
+    :return: whether any worker's templates await merge_staged_syspath()
+    """
+    return any((template_dir / PTH_STAGING_DIR_NAME).glob("*.pths"))
 
-        if template_path.exists():
-            continue
 
-        with template_path.open("x") as template_path_f:
-            # Write template that can be converted to wherever a project's clones are
-            # rooted using inject_project_pths_to_site()
-            relative_pth = (
-                os.sep + os.fspath(relative_pth) if relative_pth != Path("root") else Path("")
-            )
-            template_path_f.write(f"${{{PATH_TO_PROJECT_PLACEHOLDER}}}{relative_pth}\n")
+def merge_staged_syspath(
+    user_provided_project_dir: PurePath = None, templates: Optional[List[str]] = None
+) -> None:
+    """
+    Under the manifest's advisory lock, merge all staged templates, then 'templates', into
+    /pathto/projectroot/pths manifest and remove the staging files merged.
 
-    dedup_pth_templates(template_dir)
+    :param user_provided_project_dir: root of project using persist_syspath()
+    :param templates: additional templates in sys.path order
+    """
+    project_dir: Path = (
+        Path(user_provided_project_dir)
+        if user_provided_project_dir
+        else Path(get_project_root_dir())
+    )
+    template_dir: Path = Path(project_dir / "pths")
+    if not template_dir.exists():
+        return
 
+    with pth_manifest_lock(template_dir):
+        manifest_templates = load_pth_manifest(template_dir)
+        known_templates: Set[str] = set(manifest_templates)
+        staged_paths: List[Path] = sorted((template_dir / PTH_STAGING_DIR_NAME).glob("*.pths"))
+        staged_templates: List[str] = []
+        for staged_path in staged_paths:
+            with staged_path.open() as staged_f:
+                staged_templates.extend(line.strip() for line in staged_f)
+
+        merged_templates = list(manifest_templates)
+        for template in chain(staged_templates, templates or []):
+            if template and template not in known_templates:
+                known_templates.add(template)
+                merged_templates.append(template)
+
+        if merged_templates != manifest_templates:
+            write_pth_manifest(template_dir, merged_templates)
+        # Staging waits on the lock too, so none is re-staged since it was read.
+        for staged_path in staged_paths:
+            staged_path.unlink()
+
+
+@contextmanager
+def pth_manifest_lock(template_dir: Path) -> Iterator[None]:
+    """
+    Hold an exclusive advisory lock on template_dir's manifest across processes. Re-entrant
+    within a thread.
 
-def inject_project_pths_to_site(user_provided_project_dir: PurePath = None) -> None:
+    :param template_dir: /pathto/projectroot/pths
+    """
+    # pylint: disable=global-statement
+    global _PTH_MANIFEST_LOCK_DEPTH
+    # pylint: enable=global-statement
+    with _PTH_MANIFEST_THREAD_LOCK:
+        if _PTH_MANIFEST_LOCK_DEPTH:
+            _PTH_MANIFEST_LOCK_DEPTH += 1
+            try:
+                yield
+            finally:
+                _PTH_MANIFEST_LOCK_DEPTH -= 1
+            return
+
+        with file_lock(template_dir / PTH_MANIFEST_LOCK_NAME):
+            gitignore_path = template_dir / ".gitignore"
+            if not gitignore_path.exists():
+                write_text_atomically(gitignore_path, PTH_GITIGNORE)
+            _PTH_MANIFEST_LOCK_DEPTH = 1
+            try:
+                yield
+            finally:
+                _PTH_MANIFEST_LOCK_DEPTH = 0
+
+
+@contextmanager
+def file_lock(lock_path: Path) -> Iterator[None]:
+    """
+    Hold an exclusive advisory lock on lock_path, created if need be, across processes.
+
+    :param lock_path: file to lock; its content is never read
+    """
+    with lock_path.open("a") as lock_f:
+        _lock_file(lock_f)
+        try:
+            yield
+        finally:
+            _unlock_file(lock_f)
+
+
+def _lock_file(lock_f: IO) -> None:
+    if fcntl:
+        fcntl.flock(lock_f.fileno(), fcntl.LOCK_EX)
+    else:
+        lock_f.seek(0)
+        msvcrt.locking(lock_f.fileno(), msvcrt.LK_LOCK, 1)
+
+
+def _unlock_file(lock_f: IO) -> None:
+    if fcntl:
+        fcntl.flock(lock_f.fileno(), fcntl.LOCK_UN)
+    else:
+        lock_f.seek(0)
+        msvcrt.locking(lock_f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def write_text_atomically(path: Path, text: str) -> None:
+    """
+    Write text to a temporary file beside path and atomically rename it to path so readers see
+    either the prior or the new content; never a partial file.
+
+    :param path: file to (re)write
+    :param text: the file's new content
+    """
+    temp_fd, temp_path_str = tempfile.mkstemp(prefix=f".{path.name}.", dir=os.fspath(path.parent))
+    try:
+        with os.fdopen(temp_fd, "w") as temp_f:
+            temp_f.write(text)
+        # mkstemp() is owner-only; every user of the interpreter may need to read path.
+        os.chmod(temp_path_str, 0o644)
+        os.replace(temp_path_str, os.fspath(path))
+    except BaseException:
+        os.unlink(temp_path_str)
+        raise
+
+
+def inject_project_pths_to_site(
+    user_provided_project_dir: PurePath = None, consolidate: bool = False
+) -> None:
     """
     Iterate through all templates in /pathto/projectroot/pths converting the templates to
     the paths rooted to the current /pathto/projectroot. If caller did not supply the
     /pathto/projectroot via 'user_provided_project_dir', attempt to determine that.
 
     :param user_provided_project_dir: root of project using inject_project_pths_to_site()
+    :param consolidate: write a single, content-hashed runtime_syspath_<project>.pth instead of
+    one .pth per path; site.py then opens one file at interpreter start and a reinjection of
+    unchanged paths writes nothing
     """
     project_dir: Path = (
         Path(user_provided_project_dir)
@@ -159,74 +364,231 @@ def inject_project_pths_to_site(user_provided_project_dir: PurePath = None) -> N
         else Path(get_project_root_dir())
     )
 
-    clear_site_pths(project_dir.stem)
-
+    site_path = get_customize_path()[0].parent
     template_dir: Path = Path(project_dir / "pths")
     if not template_dir.exists():
+        clear_site_pths(project_dir.stem)
         print(f"No pth templates found within {os.fspath(template_dir)}")
         return
 
-    site_path = get_customize_path()[0].parent
     pth_templates = get_pth_templates(template_dir)
-    for template_path in pth_templates:
-        site_pth_path: Path = site_path / template_path.stem
+    if consolidate:
+        clear_site_pths(project_dir.stem, keep_consolidated=True)
+        write_consolidated_site_pth(site_path, project_dir.stem, list(pth_templates.values()))
+        return
+
+    clear_site_pths(project_dir.stem)
+    for site_pth_name, filled_in_path in pth_templates.items():
+        site_pth_path: Path = site_path / site_pth_name
         with site_pth_path.open("w") as site_pth_path_f:
-            site_pth_path_f.write(pth_templates[template_path])
+            site_pth_path_f.write(filled_in_path)
+
+
+def get_consolidated_site_pth_path(site_path: Path, project_name: str) -> Path:
+    return site_path / f"runtime_syspath_{project_name}.pth"
 
 
-def clear_site_pths(project_name: str) -> None:
+def write_consolidated_site_pth(site_path: Path, project_name: str, paths: List[str]) -> bool:
+    """
+    Write all of a project's paths to a single site .pth headed by a hash of its content. When the
+    existing .pth's header already carries that hash, nothing is written. Otherwise, the .pth is
+    written to a temporary file and atomically replaced so site.py never sees a partial file.
+
+    :param site_path: site directory processed by site.py
+    :param project_name: name of the project the paths belong to
+    :param paths: paths to add to sys.path at interpreter start
+    :return: True if the .pth was (re)written
+    """
+    content = "".join(f"{path}\n" for path in paths)
+    header = f"{CONSOLIDATED_PTH_HASH_HEADER}{hashlib.sha256(content.encode()).hexdigest()}\n"
+    consolidated_pth_path = get_consolidated_site_pth_path(site_path, project_name)
+    try:
+        with consolidated_pth_path.open() as consolidated_pth_f:
+            if consolidated_pth_f.readline() == header:
+                return False
+    except FileNotFoundError:
+        pass
+
+    write_text_atomically(consolidated_pth_path, header + content)
+    return True
+
+
+def clear_site_pths(project_name: str, keep_consolidated: bool = False) -> None:
     site_path = get_customize_path()[0].parent
     project_site_pth: Path
     for project_site_pth in site_path.glob(f"[0-9][0-9][0-9]_{project_name}_*.pth"):
         project_site_pth.unlink()
+    consolidated_pth_path = get_consolidated_site_pth_path(site_path, project_name)
+    if not keep_consolidated and consolidated_pth_path.exists():
+        consolidated_pth_path.unlink()
 
 
-def dedup_pth_templates(template_dir) -> None:
+def get_pth_manifest_path(template_dir: Path) -> Path:
+    return template_dir / PTH_MANIFEST_NAME
+
+
+def _get_pth_manifest_key(manifest_stat: os.stat_result) -> Tuple[int, int, int]:
     """
-    get_pth_templates dedup's for us; just making it obvious that the return value has no value.
-    :param template_dir:
+    :return: what changes whenever a manifest does: its inode, since replaced atomically by each
+    write; its mtime and size since, within a coarse mtime's granularity, neither alone does
     """
-    get_pth_templates(template_dir)
+    return manifest_stat.st_ino, manifest_stat.st_mtime_ns, manifest_stat.st_size
 
 
-def get_pth_templates(template_dir: Path) -> Dict[Path, str]:
+def load_pth_manifest(template_dir: Path) -> List[str]:
     """
-    For each template in template_dir, fill in template with 'project_name' and clean up any
-    templates that would represent the same path being added to sys.path.
+    Load the ordered, de-duplicated templates from template_dir's manifest, migrating any
+    per-path *.pth.template files first. A manifest is only re-read when it changes: when
+    replaced, as it always is, or its mtime or size changes.
 
-    :param template_dir:
-    :return: dictionary mapping template Path to the filled-in string
-    """
-    substitution_map: Dict[str, str] = {PATH_TO_PROJECT_PLACEHOLDER: os.fspath(template_dir.parent)}
-    pth_templates: Dict[Path, str] = {}
-    filled_in_path_to_file_map: Dict[str, str] = {}
-    templates_paths: List[Path] = list(template_dir.glob("*.pth.template"))
-    templates_paths.sort()
-    template_path: Path
-    for template_path in templates_paths:
-        with template_path.open() as template_f:
-            template_str = template_f.read().strip()
-
-        filled_in_path = Template(template_str).substitute(substitution_map)
-        if filled_in_path in filled_in_path_to_file_map:
-            # There are duplicate files (ordered differently) that contain the same path to be
-            # added to sys.path.  The first one wins, all other template files having the same
-            # paths for addition to sys.path are deleted.
-            print(
-                f"{template_path.name}'s {filled_in_path} already represented with "
-                f"{filled_in_path_to_file_map[filled_in_path]}.\n\tDeleting {template_path.name}"
-            )
+    :param template_dir: /pathto/projectroot/pths
+    :return: templates in sys.path order
+    """
+    migrate_pth_templates(template_dir)
+
+    manifest_path = get_pth_manifest_path(template_dir)
+    try:
+        manifest_key = _get_pth_manifest_key(manifest_path.stat())
+    except FileNotFoundError:
+        return []
+
+    cached = _PTH_MANIFEST_CACHE.get(manifest_path)
+    if cached and cached[0] == manifest_key:
+        return list(cached[1])
+
+    templates: List[str] = []
+    known_templates: Set[str] = set()
+    with manifest_path.open() as manifest_f:
+        for line in manifest_f:
+            template = line.strip()
+            if not template or template.startswith("#") or template in known_templates:
+                continue
+            known_templates.add(template)
+            templates.append(template)
+
+    _PTH_MANIFEST_CACHE[manifest_path] = (manifest_key, templates)
+    return list(templates)
+
+
+def write_pth_manifest(template_dir: Path, templates: List[str]) -> None:
+    """
+    :param template_dir: /pathto/projectroot/pths
+    :param templates: templates in sys.path order
+    """
+    manifest_path = get_pth_manifest_path(template_dir)
+    write_text_atomically(
+        manifest_path, PTH_MANIFEST_HEADER + "".join(f"{template}\n" for template in templates)
+    )
+    # Written under pth_manifest_lock(), so not replaced by another writer since.
+    _PTH_MANIFEST_CACHE[manifest_path] = (
+        _get_pth_manifest_key(manifest_path.stat()),
+        list(templates),
+    )
+
+
+def migrate_pth_templates(template_dir: Path) -> bool:
+    """
+    Fold per-path [000-999]*.pth.template files, in their order, into template_dir's manifest
+    after any templates the manifest already holds; then remove them.
+
+    :param template_dir: /pathto/projectroot/pths
+    :return: True if any *.pth.template files were migrated
+    """
+    if not any(template_dir.glob("*.pth.template")):
+        return False
+
+    with pth_manifest_lock(template_dir):
+        # Another process may have migrated them while waiting on the lock.
+        templates_paths: List[Path] = sorted(template_dir.glob("*.pth.template"))
+        if not templates_paths:
+            return False
+
+        manifest_path = get_pth_manifest_path(template_dir)
+        templates: List[str] = []
+        if manifest_path.exists():
+            with manifest_path.open() as manifest_f:
+                templates = [line.strip() for line in manifest_f]
+            templates = [template for template in templates if template and template[0] != "#"]
+        known_templates: Set[str] = set(templates)
+        template_path: Path
+        for template_path in templates_paths:
+            with template_path.open() as template_f:
+                template = template_f.read().strip()
+            if template and template not in known_templates:
+                known_templates.add(template)
+                templates.append(template)
+
+        write_pth_manifest(template_dir, templates)
+        for template_path in templates_paths:
             template_path.unlink()
-            continue
+    return True
+
+
+def dedup_pth_templates(template_dir) -> None:
+    """
+    Rewrite template_dir's manifest should it hold duplicate templates, e.g.: from hand edits.
+    :param template_dir:
+    """
+    manifest_path = get_pth_manifest_path(template_dir)
+    with pth_manifest_lock(template_dir):
+        templates = load_pth_manifest(template_dir)
+        if manifest_path.exists():
+            with manifest_path.open() as manifest_f:
+                line_count = sum(1 for line in manifest_f if line.strip() and line[0] != "#")
+            if line_count != len(templates):
+                write_pth_manifest(template_dir, templates)
 
-        filled_in_path_to_file_map[filled_in_path] = template_path.name
 
-        pth_templates[template_path] = filled_in_path
+def get_pth_templates(template_dir: Path) -> Dict[str, str]:
+    """
+    Fill in each of template_dir's manifest templates with the path to the project.
+
+    :param template_dir:
+    :return: dictionary mapping each template's site .pth name to the filled-in string
+    """
+    project_dir = template_dir.parent
+    substitution_map: Dict[str, str] = {PATH_TO_PROJECT_PLACEHOLDER: os.fspath(project_dir)}
+    placeholder = f"${{{PATH_TO_PROJECT_PLACEHOLDER}}}"
+    pth_templates: Dict[str, str] = {}
+    for index, template in enumerate(load_pth_manifest(template_dir)):
+        relative_pth = template[len(placeholder) :]
+        relative_pth = relative_pth.strip(os.sep).replace(os.sep, "_") or "root"
+        site_pth_name = f"{index:03d}_{project_dir.stem}_{relative_pth}.pth"
+        pth_templates[site_pth_name] = Template(template).substitute(substitution_map)
 
     return pth_templates
 
 
-def add_srcdirs_to_syspath(user_provided_project_dir: PurePath = None) -> None:
+def discover_srcdirs(
+    project_dir: Path, patterns: Iterable[str] = DEFAULT_SRCDIR_PATTERNS
+) -> List[str]:
+    """
+    Walk project_dir for the directories matching each of patterns, in order.
+
+    :param project_dir: root of project
+    :param patterns: project_dir relative glob patterns of directories to discover
+    :return: each discovered directory once
+    """
+    srcdirs: Dict[str, None] = {}
+    src: Path
+    for src in chain.from_iterable(project_dir.glob(pattern) for pattern in patterns):
+        if src.is_dir():
+            srcdirs.setdefault(str(src))
+    return list(srcdirs)
+
+
+# pylint: disable=too-many-arguments
+def add_srcdirs_to_syspath(
+    user_provided_project_dir: PurePath = None,
+    patterns: Iterable[str] = DEFAULT_SRCDIR_PATTERNS,
+    quiet: bool = False,
+    *,
+    bundle: bool = False,
+    prune_unused: bool = False,
+    prewarm: bool = False,
+    precompile: bool = False,
+    use_daemon: bool = False,
+) -> List[str]:
     """
     Add all src directories under current working directory to sys.path. If caller did not supply
     the /pathto/projectroot via 'user_provided_project_dir', attempt to
@@ -240,9 +602,27 @@ def add_srcdirs_to_syspath(user_provided_project_dir: PurePath = None) -> None:
     since git subprojects may be under 'tests' and their 'src' directories need to be
     included.
 
-    :param user_provided_project_dir: root of project using inject_project_pths_to_site()
+    Within a process that loaded a syspath_snapshot, the src directories it recorded for the
+    project root and patterns are added without walking the tree. Likewise, with use_daemon or
+    $RUNTIME_SYSPATH_DAEMON_SOCKET set, the src directories a running syspath_daemon discovery
+    daemon keeps indexed are added; without a daemon answering, the tree is walked.
 
-    :return: None
+    :param user_provided_project_dir: root of project using inject_project_pths_to_site()
+    :param patterns: project root relative glob patterns of the directories to add
+    :param quiet: do not print the paths added
+    :param bundle: add a single, locally cached zip of all src directories in their stead; see
+    syspath_bundle.bundle_srcdirs()
+    :param prune_unused: skip the src directories that the project's 'tests' never import,
+    directly or through other src directories; see syspath_usage.analyze_srcdir_usage()
+    :param prewarm: create the added paths' sys.path_importer_cache entries now, listing their
+    directories on a thread pool; see syspath_importer_cache.prewarm_importer_cache()
+    :param precompile: compile the src directories' python files whose __pycache__ entries are
+    not current, on a process pool; moot with bundle or sys.dont_write_bytecode (-B,
+    $PYTHONDONTWRITEBYTECODE). See syspath_precompile.precompile_srcdirs()
+    :param use_daemon: ask the discovery daemon serving get_daemon_socket_path(); see
+    syspath_daemon.query_discovery_daemon()
+
+    :return: the paths added to sys.path
     """
     project_dir: Path = (
         Path(user_provided_project_dir)
@@ -250,18 +630,111 @@ def add_srcdirs_to_syspath(user_provided_project_dir: PurePath = None) -> None:
         else Path(get_project_root_dir())
     )
 
-    prior_sys_path = sys.path.copy()
+    srcdirs = _get_srcdirs(project_dir, patterns, use_daemon)
+    if prune_unused:
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        from .syspath_usage import prune_unused_srcdirs
 
-    src: Path
-    for src in chain.from_iterable([project_dir.glob("src"), project_dir.glob("tests/**/src")]):
-        tested_src_str = str(src)
-        if src.is_dir() and tested_src_str not in sys.path:
-            sys.path.append(tested_src_str)
+        srcdirs = prune_unused_srcdirs(project_dir, srcdirs)
+    if bundle:
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        from .syspath_bundle import bundle_srcdirs
+
+        srcdirs = [os.fspath(bundle_srcdirs(srcdirs))]
+    elif precompile and not sys.dont_write_bytecode:
+        # Ahead of prewarm since creating __pycache__ directories changes their parents.
+        _precompile_srcdirs(srcdirs, quiet)
+    added_paths = add_paths_to_syspath(srcdirs, quiet)
+    if prewarm:
+        prewarm_importer_cache(added_paths)
+    return added_paths
+
+
+def _get_srcdirs(project_dir: Path, patterns: Iterable[str], use_daemon: bool) -> List[str]:
+    """
+    :return: the src directories a loaded snapshot recorded, else those the discovery daemon
+    indexed if asked and answering, else those discovered
+    """
+    snapshot = get_loaded_snapshot()
+    srcdirs = snapshot.srcdirs.get(srcdirs_key(project_dir, patterns)) if snapshot else None
+    if srcdirs is None and (use_daemon or os.getenv("RUNTIME_SYSPATH_DAEMON_SOCKET")):
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        from .syspath_daemon import query_discovery_daemon
+
+        try:
+            srcdirs = query_discovery_daemon(project_dir, patterns)
+        except OSError:
+            srcdirs = None
+    if srcdirs is None:
+        srcdirs = discover_srcdirs(project_dir, patterns)
+    return srcdirs
+
+
+def _precompile_srcdirs(srcdirs: Iterable[str], quiet: bool) -> None:
+    # pylint: disable=import-outside-toplevel,cyclic-import
+    from .syspath_precompile import format_precompile_result, precompile_srcdirs
 
-    diff_path_strs: Set[str] = set(prior_sys_path).symmetric_difference(set(sys.path))
-    if len(diff_path_strs) > 0:
-        diff_path_strs = {Path(diff_path_str).as_posix() for diff_path_str in diff_path_strs}
-        print(f"Added to sys.path: {sorted(diff_path_strs)}")
+    precompile_result = precompile_srcdirs(srcdirs)
+    if not quiet:
+        print(format_precompile_result(precompile_result))
+
+
+def add_paths_to_syspath(paths: Iterable[str], quiet: bool = False) -> List[str]:
+    """
+    Append each of paths not already in sys.path.
+
+    :param paths: paths to add; typically previously discovered by discover_srcdirs()
+    :param quiet: do not print the paths added
+    :return: the paths added to sys.path
+    """
+    known_paths: Set[str] = set(sys.path)
+    added_paths: List[str] = []
+    for path in paths:
+        if path not in known_paths:
+            known_paths.add(path)
+            added_paths.append(path)
+    sys.path.extend(added_paths)
+
+    if added_paths and not quiet:
+        print(f"Added to sys.path: {sorted(Path(path).as_posix() for path in added_paths)}")
+    return added_paths
+
+
+@contextmanager
+def syspath_scope(restore_modules: bool = True) -> Iterator[List[str]]:
+    """
+    Restore sys.path on leaving the scope, and forget the sys.path_importer_cache entries and
+    (if restore_modules) the sys.modules entries introduced within it. Usable as a decorator too:
+    @syspath_scope(). Cheap enough to isolate each test: the snapshot is one list copy and two
+    dict copies, all done in C, and restoring compares keys before deleting any. That is ~5us,
+    plus ~0.04us per sys.modules entry if restore_modules; e.g.: ~20us with 350 modules.
+
+    Full copies rather than a version counter with copy-on-write: neither list nor dict exposes a
+    mutation count, and counting in a list subclass would mean replacing sys.path, which
+    SysPathSleuth and callers holding a reference to it rely upon staying put.
+
+    :param restore_modules: forget modules imported within the scope
+    :return: sys.path
+    """
+    prior_syspath = sys.path
+    prior_syspath_entries = prior_syspath[:]
+    prior_importer_cache = sys.path_importer_cache.copy()
+    prior_modules = sys.modules.copy() if restore_modules else None
+    try:
+        yield prior_syspath
+    finally:
+        if sys.path is not prior_syspath:
+            sys.path = prior_syspath
+        if prior_syspath != prior_syspath_entries:
+            prior_syspath[:] = prior_syspath_entries
+
+        if sys.path_importer_cache.keys() != prior_importer_cache.keys():
+            for path in sys.path_importer_cache.keys() - prior_importer_cache.keys():
+                del sys.path_importer_cache[path]
+
+        if prior_modules is not None and sys.modules.keys() != prior_modules.keys():
+            for name in sys.modules.keys() - prior_modules.keys():
+                del sys.modules[name]
 
 
 def get_package_and_max_relative_import_dots(
@@ -279,7 +752,12 @@ def get_package_and_max_relative_import_dots(
     :return: fully-qualified package and max relative dots.
     """
     target_module: ModuleType = sys.modules[module_name]
-    dots: str = "" if not target_module.__package__ else "."
-    dot_count: int = target_module.__package__.count(".") if target_module.__package__ else 0
-    dots: str = dots + "".join("." for i in range(0, dot_count))
-    return target_module.__package__, dots
+    return target_module.__package__, get_max_relative_import_dots(target_module.__package__)
+
+
+def get_max_relative_import_dots(package: Optional[str]) -> str:
+    """
+    :param package: fully-qualified package of a module; '' or None for a top-level module
+    :return: the most relative dots usable within a module of package
+    """
+    return "." * (package.count(".") + 1) if package else ""
@@ -0,0 +1,98 @@
+""" pytest module to test the runtime_syspath.pytest_plugin module"""
+import os
+from types import SimpleNamespace
+
+from runtime_syspath.pytest_plugin import SRCDIRS_ENV_VAR, WORKERINPUT_KEY, SrcdirDiscovery
+
+
+def make_project(testdir) -> None:
+    testdir.mkdir("src").join("project_mod.py").write("VALUE = 1\n")
+    subproject_src = testdir.mkdir("tests").mkdir("sub").mkdir("src")
+    subproject_src.join("subproject_mod.py").write("VALUE = 2\n")
+    testdir.tmpdir.join("tests", "test_imports.py").write(
+        "import project_mod\nimport subproject_mod\n\n\n"
+        "def test_imports():\n    assert project_mod.VALUE + subproject_mod.VALUE == 3\n"
+    )
+
+
+def test_plugin_discovers_srcdirs(testdir):
+    make_project(testdir)
+    result = testdir.runpytest_subprocess(
+        "-p",
+        "runtime_syspath.pytest_plugin",
+        "--syspath",
+        "--syspath-root",
+        str(testdir.tmpdir),
+        "--syspath-report-time",
+    )
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(["runtime-syspath: 2 src dir(s) on sys.path discovered in *ms"])
+
+
+def test_plugin_pattern_and_ini(testdir):
+    make_project(testdir)
+    testdir.makeini("[pytest]\nsyspath_discover = true\nsyspath_patterns = src\n")
+    result = testdir.runpytest_subprocess(
+        "-p", "runtime_syspath.pytest_plugin", "--syspath-root", str(testdir.tmpdir)
+    )
+    result.stdout.fnmatch_lines(["*No module named 'subproject_mod'*"])
+
+    result = testdir.runpytest_subprocess(
+        "-p",
+        "runtime_syspath.pytest_plugin",
+        "--syspath-root",
+        str(testdir.tmpdir),
+        "--syspath-pattern",
+        "src",
+        "--syspath-pattern",
+        "tests/*/src",
+    )
+    result.assert_outcomes(passed=1)
+
+
+def test_plugin_hands_srcdirs_to_workers():
+    discovery = SrcdirDiscovery(None, ["/pathto/project/src"], 0.0, False)
+    node = SimpleNamespace(workerinput={})
+    discovery.pytest_configure_node(node)
+    assert node.workerinput[WORKERINPUT_KEY] == ["/pathto/project/src"]
+
+
+def test_plugin_worker_conftest_imports(testdir, monkeypatch):
+    # A worker applies the controller's src directories ahead of its conftest.py modules.
+    make_project(testdir)
+    testdir.makeconftest("import project_mod\n")
+    srcdirs = [str(testdir.tmpdir.join("src")), str(testdir.tmpdir.join("tests", "sub", "src"))]
+    monkeypatch.setenv("PYTEST_XDIST_WORKER", "gw0")
+    monkeypatch.setenv(SRCDIRS_ENV_VAR, os.pathsep.join(srcdirs))
+    result = testdir.runpytest_subprocess("-p", "runtime_syspath.pytest_plugin", "--syspath")
+    result.assert_outcomes(passed=1)
+
+
+def test_syspath_scope_fixture(testdir):
+    testdir.makepyfile(
+        """
+        import sys
+
+        def test_alter(syspath_scope):
+            syspath_scope.append("scoped")
+            sys.modules["scoped_module"] = sys
+
+        def test_restored():
+            assert "scoped" not in sys.path and "scoped_module" not in sys.modules
+        """
+    )
+    result = testdir.runpytest_subprocess("-p", "runtime_syspath.pytest_plugin")
+    result.assert_outcomes(passed=2)
+
+
+def test_plugin_merges_staged_syspath(testdir):
+    # Without --syspath, templates staged by workers are still merged once per session.
+    testdir.mkdir("src")
+    staging_dir = testdir.mkdir("pths").mkdir("staged")
+    staging_dir.join("gw0.1.pths").write("${path_to_project}/src\n")
+    testdir.makepyfile("def test_nothing():\n    pass\n")
+    result = testdir.runpytest_subprocess("-p", "runtime_syspath.pytest_plugin")
+    result.assert_outcomes(passed=1)
+    assert not staging_dir.listdir()
+    manifest = testdir.tmpdir.join("pths", "pths.manifest").read()
+    assert manifest.splitlines()[1:] == ["${path_to_project}/src"]
@@ -0,0 +1,61 @@
+""" pytest module to test the runtime_syspath.relative_import_checker module"""
+import os
+from pathlib import Path
+
+from click.testing import CliRunner, Result
+
+from runtime_syspath import relative_import_checker
+from runtime_syspath.relative_import_checker import (
+    check_relative_imports,
+    relative_import_checker_main,
+)
+from runtime_syspath.syspath_cache import CACHE_DIR_ENV_VAR
+
+
+def make_project(project_dir: Path) -> Path:
+    package_dir = project_dir / "src" / "pkg" / "sub"
+    package_dir.mkdir(parents=True)
+    (package_dir.parent / "__init__.py").write_text("from . import sub\n")
+    (package_dir / "__init__.py").write_text("from .. import sub\n")
+    (package_dir / "mod.py").write_text("import os\n\nfrom ...beyond import x\n")
+    (project_dir / "src" / "top.py").write_text("from .sibling import y\n")
+    (project_dir / "src" / "broken.py").write_text("def (:\n")
+    return project_dir
+
+
+def test_check_relative_imports(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv(CACHE_DIR_ENV_VAR, os.fspath(tmp_path / "cache"))
+    src_dir = os.fspath(make_project(tmp_path / "project") / "src")
+
+    file_count, violations, unparsable = check_relative_imports([src_dir], max_workers=2)
+    assert file_count == 5
+    assert unparsable == [os.path.join(src_dir, "broken.py")]
+    assert sorted(
+        (Path(v.path).name, v.lineno, v.dots, v.package, v.max_dots) for v in violations
+    ) == [("mod.py", 3, "...", "pkg.sub", ".."), ("top.py", 1, ".", "", "")]
+
+    # Only the changed file is parsed again.
+    parsed = []
+
+    def find_relative_imports(content: bytes, path: str):
+        parsed.append(path)
+        return original_find_relative_imports(content, path)
+
+    original_find_relative_imports = relative_import_checker.find_relative_imports
+    monkeypatch.setattr(relative_import_checker, "find_relative_imports", find_relative_imports)
+    (Path(src_dir) / "top.py").write_text("import sibling\n")
+    _, violations, _ = check_relative_imports([src_dir], max_workers=1)
+    assert parsed == [os.path.join(src_dir, "top.py")]
+    assert [Path(v.path).name for v in violations] == ["mod.py"]
+
+
+def test_relative_import_checker_main(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv(CACHE_DIR_ENV_VAR, os.fspath(tmp_path / "cache"))
+    project_dir = make_project(tmp_path / "project")
+    result: Result = CliRunner().invoke(
+        relative_import_checker_main, ["-d", os.fspath(project_dir), "--no-cache"]
+    )
+    assert result.exit_code == 1
+    assert "mod.py:3: 'from ...beyond import' within package 'pkg.sub'" in result.output
+    assert "5 file(s) checked: 2 relative import(s)" in result.output
+    assert "broken.py: does not parse" in result.output
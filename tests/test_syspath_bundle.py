@@ -0,0 +1,110 @@
+""" pytest module to test the runtime_syspath.syspath_bundle module"""
+import os
+import sys
+import traceback
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from runtime_syspath import add_srcdirs_to_syspath
+from runtime_syspath.syspath_bundle import (
+    bundle_srcdirs,
+    get_manifest_digest,
+    read_bundle_digest,
+    scan_srcdirs,
+)
+from runtime_syspath.syspath_cache import CACHE_DIR_ENV_VAR
+
+
+@pytest.fixture(name="bundle_project")
+def bundle_project_fixture(tmp_path: Path, monkeypatch) -> Path:
+    monkeypatch.setenv(CACHE_DIR_ENV_VAR, os.fspath(tmp_path / "cache"))
+    package_dir = tmp_path / "project" / "src" / "bundled_pkg"
+    package_dir.mkdir(parents=True)
+    (package_dir / "__init__.py").write_text("")
+    (package_dir / "mod.py").write_text("def fail():\n    raise ValueError('bundled')\n")
+    subproject_src = tmp_path / "project" / "tests" / "sub" / "src"
+    subproject_src.mkdir(parents=True)
+    (subproject_src / "bundled_sub_mod.py").write_text("VALUE = 1\n")
+    yield tmp_path / "project"
+    for module_name in ("bundled_pkg.mod", "bundled_pkg", "bundled_sub_mod"):
+        sys.modules.pop(module_name, None)
+
+
+def test_add_srcdirs_to_syspath_bundle(bundle_project: Path):
+    prior_sys_path = list(sys.path)
+    try:
+        added_paths = add_srcdirs_to_syspath(bundle_project, bundle=True)
+        assert len(added_paths) == 1 and added_paths[0].endswith(".zip")
+
+        # pylint: disable=import-outside-toplevel
+        import bundled_sub_mod
+        from bundled_pkg import mod
+
+        assert mod.__file__.startswith(added_paths[0]) and bundled_sub_mod.VALUE == 1
+        with pytest.raises(ValueError) as exc_info:
+            mod.fail()
+        frame = traceback.extract_tb(exc_info.tb)[-1]
+        assert frame.filename == os.fspath(bundle_project / "src" / "bundled_pkg" / "mod.py")
+        assert frame.line == "raise ValueError('bundled')"
+    finally:
+        sys.path[:] = prior_sys_path
+
+
+def test_bundle_srcdirs_incremental(bundle_project: Path):
+    srcdirs = [os.fspath(bundle_project / "src"), os.fspath(bundle_project / "tests/sub/src")]
+    bundle_path = bundle_srcdirs(srcdirs)
+    mtime_ns = bundle_path.stat().st_mtime_ns
+    assert bundle_srcdirs(srcdirs) == bundle_path
+    assert bundle_path.stat().st_mtime_ns == mtime_ns
+
+    assert read_bundle_digest(bundle_path) == get_manifest_digest(scan_srcdirs(srcdirs))
+
+    # A changed file is appended to the bundle; its superseded entries stay.
+    with zipfile.ZipFile(bundle_path) as bundle:
+        entry_count = len(bundle.infolist())
+    (bundle_project / "tests/sub/src/bundled_sub_mod.py").write_text("VALUE = 22\n")
+    bundle_srcdirs(srcdirs)
+    with zipfile.ZipFile(bundle_path) as bundle:
+        assert len(bundle.infolist()) == entry_count + 2
+    assert read_bundle_digest(bundle_path) == get_manifest_digest(scan_srcdirs(srcdirs))
+    prior_sys_path = list(sys.path)
+    try:
+        sys.path.append(os.fspath(bundle_path))
+        # pylint: disable=import-outside-toplevel
+        import bundled_sub_mod
+
+        assert bundled_sub_mod.VALUE == 22
+    finally:
+        sys.path[:] = prior_sys_path
+
+
+def test_bundle_srcdirs_rewrite(bundle_project: Path):
+    srcdirs = [os.fspath(bundle_project / "src")]
+    bundle_path = bundle_srcdirs(srcdirs)
+
+    # A removed file has the bundle rewritten, without superseded entries.
+    (bundle_project / "src" / "bundled_pkg" / "mod.py").unlink()
+    bundle_srcdirs(srcdirs)
+    with zipfile.ZipFile(bundle_path) as bundle:
+        assert sorted(bundle.namelist()) == ["bundled_pkg/__init__.py", "bundled_pkg/__init__.pyc"]
+
+
+def test_bundle_srcdirs_concurrent(bundle_project: Path):
+    module_paths = [bundle_project / "src" / f"bundled_mod_{index}.py" for index in range(50)]
+    srcdirs = [os.fspath(bundle_project / "src")]
+    for module_path in module_paths:
+        module_path.write_text("VALUE = -1\n")
+    bundle_path = bundle_srcdirs(srcdirs)
+    with ProcessPoolExecutor(8) as executor:
+        for value in range(10):
+            for module_path in module_paths:
+                module_path.write_text(f"VALUE = {value}\n")
+            # The processes race to append the changes to the shared bundle.
+            assert set(executor.map(bundle_srcdirs, [srcdirs] * 8)) == {bundle_path}
+            with zipfile.ZipFile(bundle_path) as bundle:
+                assert bundle.testzip() is None
+                assert bundle.read("bundled_mod_0.py") == f"VALUE = {value}\n".encode()
+            assert read_bundle_digest(bundle_path) == get_manifest_digest(scan_srcdirs(srcdirs))
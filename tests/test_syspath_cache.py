@@ -0,0 +1,47 @@
+""" pytest module to test the runtime_syspath.syspath_cache module"""
+import os
+from pathlib import Path
+
+import pytest
+
+from runtime_syspath.syspath_cache import CACHE_DIR_ENV_VAR, FileResultCache, analyze_files
+from runtime_syspath.syspath_importer_cache import MTIME_GRANULARITY_NS
+
+
+def count_lines(content: bytes, _: str) -> int:
+    return content.count(b"\n")
+
+
+@pytest.fixture(name="cache_dir")
+def cache_dir_fixture(tmp_path: Path, monkeypatch) -> Path:
+    monkeypatch.setenv(CACHE_DIR_ENV_VAR, os.fspath(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+
+@pytest.mark.usefixtures("cache_dir")
+def test_file_result_cache_racy(tmp_path: Path):
+    source_path = tmp_path / "module.py"
+    source_path.write_text("import os\n")
+    stat = source_path.stat()
+    cache = FileResultCache("count_lines")
+
+    # Cached within a mtime tick of the file's change: a change since may have left stat as is.
+    cache.set(os.fspath(source_path), stat, "digest", 1, stat.st_mtime_ns)
+    assert cache.get(os.fspath(source_path), stat) == (None, None)
+
+    cache.set(os.fspath(source_path), stat, "digest", 1, stat.st_mtime_ns + MTIME_GRANULARITY_NS)
+    assert cache.get(os.fspath(source_path), stat) == ("digest", 1)
+
+
+@pytest.mark.usefixtures("cache_dir")
+def test_analyze_files_unreadable(tmp_path: Path):
+    source_path = tmp_path / "module.py"
+    source_path.write_text("import os\nimport sys\n")
+    missing_path = tmp_path / "missing.py"
+    cache = FileResultCache("count_lines")
+
+    results = analyze_files(
+        [os.fspath(source_path), os.fspath(missing_path)], count_lines, cache, max_workers=1
+    )
+    assert results == {os.fspath(source_path): 2, os.fspath(missing_path): None}
+    assert os.fspath(missing_path) not in cache.files
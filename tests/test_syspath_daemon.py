@@ -0,0 +1,94 @@
+""" pytest module to test the runtime_syspath.syspath_daemon module"""
+import os
+import socket
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from runtime_syspath import add_srcdirs_to_syspath, syspath_scope, syspath_utils
+from runtime_syspath.syspath_daemon import DiscoveryDaemon, query_discovery_daemon
+from runtime_syspath.syspath_utils import DEFAULT_SRCDIR_PATTERNS
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="no Unix domain sockets")
+
+
+@pytest.fixture(name="daemon")
+def daemon_fixture(tmp_path: Path) -> DiscoveryDaemon:
+    # Unix domain socket paths are limited to ~100 characters; tmp_path may be longer.
+    socket_path = Path(f"/tmp/syspath-daemon-{os.getpid()}.sock")
+    daemon = DiscoveryDaemon(socket_path, poll_interval=0.05)
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    while not daemon.server:
+        time.sleep(0.01)
+    yield daemon
+    daemon.shutdown()
+    thread.join()
+    assert not socket_path.exists()
+
+
+def wait_for_srcdirs(daemon: DiscoveryDaemon, project_dir: Path, srcdir_count: int):
+    deadline = time.monotonic() + 5
+    srcdirs = None
+    while time.monotonic() < deadline:
+        srcdirs = query_discovery_daemon(project_dir, DEFAULT_SRCDIR_PATTERNS, daemon.socket_path)
+        if srcdirs is not None and len(srcdirs) == srcdir_count:
+            break
+        time.sleep(0.02)
+    return srcdirs
+
+
+def test_discovery_daemon(daemon: DiscoveryDaemon, tmp_path: Path, monkeypatch):
+    project_dir = tmp_path / "project"
+    (project_dir / "src").mkdir(parents=True)
+    (project_dir / "tests" / "sub").mkdir(parents=True)
+    assert query_discovery_daemon(project_dir, DEFAULT_SRCDIR_PATTERNS, daemon.socket_path) == [
+        os.fspath(project_dir / "src")
+    ]
+
+    # Changes are picked up by polling, not by the query.
+    (project_dir / "tests" / "sub" / "src").mkdir()
+    assert wait_for_srcdirs(daemon, project_dir, 2) == [
+        os.fspath(project_dir / "src"),
+        os.fspath(project_dir / "tests" / "sub" / "src"),
+    ]
+
+    def discover_srcdirs(*args):
+        raise AssertionError("discovered without the daemon")
+
+    monkeypatch.setenv("RUNTIME_SYSPATH_DAEMON_SOCKET", os.fspath(daemon.socket_path))
+    monkeypatch.setattr(syspath_utils, "discover_srcdirs", discover_srcdirs)
+    with syspath_scope():
+        assert len(add_srcdirs_to_syspath(project_dir, quiet=True)) == 2
+
+
+def test_query_discovery_daemon_absent(tmp_path: Path):
+    socket_path = tmp_path / "absent.sock"
+    assert query_discovery_daemon(tmp_path, DEFAULT_SRCDIR_PATTERNS, socket_path) is None
+    socket_path.touch()
+    assert query_discovery_daemon(tmp_path, DEFAULT_SRCDIR_PATTERNS, socket_path) is None
+
+
+def test_add_srcdirs_to_syspath_daemon_opt_in(tmp_path: Path, monkeypatch):
+    (tmp_path / "src").mkdir()
+    monkeypatch.delenv("RUNTIME_SYSPATH_DAEMON_SOCKET", raising=False)
+    monkeypatch.delenv("RUNTIME_SYSPATH_CACHE_DIR", raising=False)
+    monkeypatch.delenv("XDG_CACHE_HOME", raising=False)
+    monkeypatch.setenv("HOME", "/proc/nonexistent")
+    with syspath_scope():
+        # An unwritable home leaves no cache directory to find a socket within.
+        assert add_srcdirs_to_syspath(tmp_path, quiet=True, use_daemon=True) == [
+            os.fspath(tmp_path / "src")
+        ]
+    assert not Path("/proc/nonexistent").exists()
+
+    def query_discovery_daemon(*args):
+        raise AssertionError("queried the daemon without opting in")
+
+    monkeypatch.setattr(
+        "runtime_syspath.syspath_daemon.query_discovery_daemon", query_discovery_daemon
+    )
+    with syspath_scope():
+        assert add_srcdirs_to_syspath(tmp_path, quiet=True) == [os.fspath(tmp_path / "src")]
@@ -0,0 +1,48 @@
+""" pytest module to test the runtime_syspath.syspath_export module"""
+import os
+import site
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from runtime_syspath import export_syspath
+from runtime_syspath.syspath_export import get_syspath_environ, unexport_syspath
+
+CHILD_SOURCE = (
+    "import sys, exported_mod; print('runtime_syspath' in sys.modules, exported_mod.VALUE)"
+)
+
+
+@pytest.fixture(name="exported_dir")
+def exported_dir_fixture(tmp_path: Path, monkeypatch) -> Path:
+    monkeypatch.setenv("PYTHONPATH", "inherited")
+    monkeypatch.delenv("PYTHONUSERBASE", raising=False)
+    (tmp_path / "exported_mod.py").write_text("VALUE = 42\n")
+    yield tmp_path
+    unexport_syspath()
+
+
+def test_get_syspath_environ():
+    environ = get_syspath_environ(["a", "b"], {"PYTHONPATH": os.pathsep.join(["b", "c"])})
+    assert environ == {"PYTHONPATH": os.pathsep.join(["a", "b", "c"])}
+    assert get_syspath_environ(["a"], {}) == {"PYTHONPATH": "a"}
+
+
+@pytest.mark.parametrize("use_pth", [False, True])
+def test_export_syspath(exported_dir: Path, use_pth: bool):
+    if use_pth and not site.ENABLE_USER_SITE:
+        pytest.skip("user site disabled")
+    exported_environ = export_syspath([os.fspath(exported_dir)], use_pth=use_pth)
+    assert set(exported_environ) == {"PYTHONUSERBASE" if use_pth else "PYTHONPATH"}
+
+    child = subprocess.run(
+        [sys.executable, "-c", CHILD_SOURCE], stdout=subprocess.PIPE, text=True, check=True
+    )
+    assert child.stdout.split() == ["False", "42"]
+
+    user_base = os.environ.get("PYTHONUSERBASE")
+    unexport_syspath()
+    assert os.environ["PYTHONPATH"] == "inherited" and "PYTHONUSERBASE" not in os.environ
+    assert not user_base or not Path(user_base).exists()
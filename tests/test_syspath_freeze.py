@@ -0,0 +1,168 @@
+""" pytest module to test the runtime_syspath.syspath_freeze module"""
+import importlib.util
+import os
+import re
+import sys
+from importlib.machinery import PathFinder
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from runtime_syspath import freeze_syspath, syspath_scope, unfreeze_syspath
+from runtime_syspath.syspath_freeze import (
+    FrozenSysPath,
+    FrozenSysPathError,
+    MemoizingPathFinder,
+    is_syspath_frozen,
+)
+from runtime_syspath.syspath_sleuth import SysPathSleuth
+from runtime_syspath.syspath_sleuth.import_attribution import (
+    install_import_attribution,
+    is_import_attribution_installed,
+)
+
+
+@pytest.fixture(name="unfreeze")
+def unfreeze_fixture():
+    yield
+    unfreeze_syspath()
+
+
+@pytest.mark.usefixtures("unfreeze")
+def test_freeze_syspath():
+    prior_syspath = sys.path
+    prior_entries = list(sys.path)
+    freeze_syspath()
+    assert is_syspath_frozen() and sys.path == prior_entries
+    assert MemoizingPathFinder in sys.meta_path and PathFinder not in sys.meta_path
+
+    with pytest.raises(FrozenSysPathError, match=r"sys\.path\.append\('yow',\)"):
+        sys.path.append("yow")
+    with pytest.raises(FrozenSysPathError):
+        sys.path += ["yow"]
+    with pytest.raises(FrozenSysPathError):
+        sys.path[:] = []
+    assert sys.path == prior_entries
+
+    unfreeze_syspath()
+    assert not is_syspath_frozen() and sys.path is prior_syspath
+    assert PathFinder in sys.meta_path and MemoizingPathFinder not in sys.meta_path
+
+
+@pytest.mark.usefixtures("unfreeze")
+def test_freeze_syspath_warn(capsys, monkeypatch):
+    sleuth = SysPathSleuth(sys.path)
+    monkeypatch.setattr(sys, "path", sleuth)
+    with syspath_scope():
+        freeze_syspath(on_mutation="warn", memoize=False)
+        capsys.readouterr()
+        with pytest.warns(RuntimeWarning, match="frozen") as warnings:
+            sys.path.insert(0, "yow")
+        assert warnings[0].filename == __file__
+        assert sys.path[0] == "yow"
+        assert PathFinder in sys.meta_path
+        # Reported by the sleuth as well, from its callsite
+        SysPathSleuth.flush()
+        assert re.search(
+            r"sys\.path\.insert\(0, 'yow'\) from \S*test_syspath_freeze\.py:\d+",
+            capsys.readouterr().out,
+        )
+        unfreeze_syspath()
+
+
+@pytest.mark.usefixtures("unfreeze")
+def test_freeze_syspath_in_place(monkeypatch):
+    sleuth = SysPathSleuth(sys.path)
+    monkeypatch.setattr(sys, "path", sleuth)
+    freeze_syspath()
+    assert sys.path is sleuth and type(sleuth) is FrozenSysPath
+    unfreeze_syspath()
+    assert sys.path is sleuth and type(sleuth) is SysPathSleuth
+
+
+@pytest.mark.usefixtures("unfreeze")
+def test_memoizing_path_finder(tmp_path: Path):
+    (tmp_path / "frozen_mod.py").touch()
+    with syspath_scope():
+        sys.path.append(os.fspath(tmp_path))
+        freeze_syspath()
+        prior_hits, prior_misses = MemoizingPathFinder.hits, MemoizingPathFinder.misses
+        for _ in range(2):
+            assert importlib.util.find_spec("frozen_mod").origin == os.fspath(
+                tmp_path / "frozen_mod.py"
+            )
+            assert importlib.util.find_spec("no_such_frozen_mod") is None
+        assert MemoizingPathFinder.entries["frozen_mod"] == os.fspath(tmp_path)
+        assert MemoizingPathFinder.entries["no_such_frozen_mod"] is None
+        assert MemoizingPathFinder.misses - prior_misses == 2
+        assert MemoizingPathFinder.hits - prior_hits == 2
+
+        # importlib.invalidate_caches() forgets negative results too.
+        (tmp_path / "no_such_frozen_mod.py").touch()
+        importlib.invalidate_caches()
+        assert importlib.util.find_spec("no_such_frozen_mod") is not None
+
+
+@pytest.mark.usefixtures("unfreeze")
+def test_memoizing_path_finder_nested_entries(tmp_path: Path):
+    package_dir = tmp_path / "frozen_pkg"
+    package_dir.mkdir()
+    (package_dir / "__init__.py").touch()
+    with syspath_scope():
+        # The package is found on the outer entry, though its directory is an entry too.
+        sys.path.extend([os.fspath(tmp_path), os.fspath(package_dir)])
+        freeze_syspath()
+        prior_hits = MemoizingPathFinder.hits
+        for _ in range(2):
+            assert importlib.util.find_spec("frozen_pkg").origin == os.fspath(
+                package_dir / "__init__.py"
+            )
+        assert MemoizingPathFinder.entries["frozen_pkg"] == os.fspath(tmp_path)
+        assert MemoizingPathFinder.hits - prior_hits == 1
+
+
+@pytest.mark.usefixtures("unfreeze")
+def test_freeze_syspath_disable_toggle(monkeypatch):
+    sleuth = SysPathSleuth(sys.path)
+    monkeypatch.setattr(sys, "path", sleuth)
+    freeze_syspath()
+    sleuth.disable()
+    assert type(sleuth) is FrozenSysPath
+    SysPathSleuth.toggle()
+    assert type(sleuth) is FrozenSysPath
+    sleuth.enable()
+    assert type(sleuth) is FrozenSysPath
+    with pytest.raises(FrozenSysPathError):
+        install_import_attribution()
+    assert type(sleuth) is FrozenSysPath and not is_import_attribution_installed()
+    unfreeze_syspath()
+    assert type(sleuth) is SysPathSleuth
+
+
+class ForeignSysPathSleuth(list):
+    """
+    A sleuth of a class other than SysPathSleuth: e.g., one sitecustomize installed.
+    """
+
+    actions: List[str] = []
+
+    @classmethod
+    def _where(cls, action, args, caller_depth: int = 2):
+        cls.actions.append(f"{action}{args}")
+
+    def get_base_list(self) -> List[str]:
+        return list(self)
+
+
+@pytest.mark.usefixtures("unfreeze")
+def test_freeze_syspath_foreign_sleuth(monkeypatch):
+    sleuth = ForeignSysPathSleuth(sys.path)
+    monkeypatch.setattr(sys, "path", sleuth)
+    with syspath_scope():
+        freeze_syspath(on_mutation="warn", memoize=False)
+        with pytest.warns(RuntimeWarning, match="frozen"):
+            sys.path.append("yow")
+        assert ForeignSysPathSleuth.actions == ["append('yow',)"]
+        unfreeze_syspath()
+    assert type(sleuth) is ForeignSysPathSleuth
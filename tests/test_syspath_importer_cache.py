@@ -0,0 +1,71 @@
+""" pytest module to test the runtime_syspath.syspath_importer_cache module"""
+import importlib
+import os
+import sys
+from importlib.machinery import FileFinder
+from pathlib import Path
+
+from runtime_syspath import add_srcdirs_to_syspath, syspath_scope
+from runtime_syspath.syspath_importer_cache import (
+    get_importer_cache_stats,
+    invalidate_importer_caches,
+    prewarm_importer_cache,
+)
+
+
+def test_add_srcdirs_to_syspath_prewarm(tmp_path: Path):
+    for srcdir in ("src", "tests/a/src", "tests/b/src"):
+        (tmp_path / srcdir).mkdir(parents=True)
+    prior_stats = get_importer_cache_stats()
+    with syspath_scope():
+        added_paths = add_srcdirs_to_syspath(tmp_path, quiet=True, prewarm=True)
+        assert len(added_paths) == 3
+        assert all(isinstance(sys.path_importer_cache[path], FileFinder) for path in added_paths)
+        assert get_importer_cache_stats()["prewarmed"] == prior_stats["prewarmed"] + 3
+        # Only paths without a finder are prewarmed.
+        assert prewarm_importer_cache(added_paths) == 0
+
+
+def test_invalidate_importer_caches(tmp_path: Path):
+    changed_dir, unchanged_dir = tmp_path / "changed", tmp_path / "unchanged"
+    missing_dir = tmp_path / "missing"
+    changed_dir.mkdir()
+    unchanged_dir.mkdir()
+    # Listed long after their last change
+    os.utime(changed_dir, ns=(10**9, 10**9))
+    os.utime(unchanged_dir, ns=(10**9, 10**9))
+    paths = [os.fspath(path) for path in (changed_dir, unchanged_dir, missing_dir)]
+    with syspath_scope():
+        sys.path.extend(paths)
+        prewarm_importer_cache(paths, max_workers=1)
+        assert sys.path_importer_cache[paths[2]] is None
+
+        prior_stats = get_importer_cache_stats()
+        (changed_dir / "fresh_mod.py").write_text("")
+        os.utime(changed_dir, ns=(0, 0))
+        missing_dir.mkdir()
+        assert invalidate_importer_caches(paths) == [paths[0], paths[2]]
+        assert paths[2] not in sys.path_importer_cache
+        stats = get_importer_cache_stats()
+        assert stats["listings_saved"] == prior_stats["listings_saved"] + 1
+        assert stats["invalidated"] == prior_stats["invalidated"] + 2
+
+        fresh_mod = importlib.import_module("fresh_mod")
+        assert fresh_mod.__file__ == os.fspath(changed_dir / "fresh_mod.py")
+
+
+def test_invalidate_importer_caches_racy(tmp_path: Path):
+    racy_dir = tmp_path / "racy"
+    racy_dir.mkdir()
+    path = os.fspath(racy_dir)
+    with syspath_scope():
+        sys.path.append(path)
+        prewarm_importer_cache([path])
+        # A change within the mtime tick of the listing, as on a coarse-mtime filesystem
+        mtime_ns = racy_dir.stat().st_mtime_ns
+        (racy_dir / "racy_mod.py").write_text("")
+        os.utime(racy_dir, ns=(mtime_ns, mtime_ns))
+        assert invalidate_importer_caches([path]) == [path]
+
+        racy_mod = importlib.import_module("racy_mod")
+        assert racy_mod.__file__ == os.fspath(racy_dir / "racy_mod.py")
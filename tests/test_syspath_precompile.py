@@ -0,0 +1,94 @@
+""" pytest module to test the runtime_syspath.syspath_precompile module"""
+import importlib.util
+import os
+import sys
+from pathlib import Path
+
+from click.testing import CliRunner, Result
+
+from runtime_syspath import add_srcdirs_to_syspath, syspath_precompile, syspath_scope
+from runtime_syspath.syspath_precompile import (
+    PycInvalidationMode,
+    is_pyc_current,
+    precompile_main,
+    precompile_srcdirs,
+)
+
+
+def make_project(project_dir: Path) -> Path:
+    package_dir = project_dir / "src" / "pkg"
+    package_dir.mkdir(parents=True)
+    (package_dir / "__init__.py").touch()
+    (package_dir / "mod.py").write_text("VALUE = 1\n")
+    (package_dir / "broken.py").write_text("def (:\n")
+    return package_dir
+
+
+def test_precompile_srcdirs(tmp_path: Path, monkeypatch):
+    package_dir = make_project(tmp_path)
+    srcdirs = [os.fspath(tmp_path / "src")]
+    mod_path = os.fspath(package_dir / "mod.py")
+
+    result = precompile_srcdirs(srcdirs, "checked-hash", max_workers=1)
+    assert (result.files, result.compiled, result.current) == (3, 2, 0)
+    assert result.failed == [os.fspath(package_dir / "broken.py")]
+    assert result.compile_seconds > 0
+    with open(importlib.util.cache_from_source(mod_path), "rb") as pyc_f:
+        assert int.from_bytes(pyc_f.read(8)[4:], "little") == 0b11
+    assert is_pyc_current(mod_path, PycInvalidationMode.CHECKED_HASH)
+
+    # A checkout resetting mtimes leaves checked-hash .pyc current.
+    os.utime(mod_path, (0, 0))
+    result = precompile_srcdirs(srcdirs, PycInvalidationMode.CHECKED_HASH, max_workers=1)
+    assert (result.compiled, result.current) == (0, 2)
+    # Any valid .pyc satisfies timestamp mode. Nothing stale starts no process pool.
+    monkeypatch.setattr(syspath_precompile, "ProcessPoolExecutor", None)
+    assert precompile_srcdirs(srcdirs, "timestamp").current == 2
+    monkeypatch.undo()
+
+    (package_dir / "mod.py").write_text("VALUE = 2\n")
+    assert not is_pyc_current(mod_path, PycInvalidationMode.CHECKED_HASH)
+    result = precompile_srcdirs(srcdirs, "timestamp", max_workers=2)
+    assert (result.compiled, result.current) == (1, 1)
+    assert is_pyc_current(mod_path, PycInvalidationMode.TIMESTAMP)
+    assert not is_pyc_current(mod_path, PycInvalidationMode.CHECKED_HASH)
+
+
+def test_precompile_srcdirs_pool(tmp_path: Path):
+    package_dir = make_project(tmp_path)
+    for index in range(syspath_precompile.POOL_THRESHOLD):
+        (package_dir / f"mod_{index}.py").write_text(f"VALUE = {index}\n")
+    result = precompile_srcdirs([os.fspath(tmp_path / "src")], max_workers=2)
+    assert (result.compiled, result.current) == (syspath_precompile.POOL_THRESHOLD + 2, 0)
+    assert result.failed == [os.fspath(package_dir / "broken.py")]
+
+
+def test_add_srcdirs_to_syspath_precompile(tmp_path: Path, capsys, monkeypatch):
+    package_dir = make_project(tmp_path)
+    monkeypatch.setattr(sys, "dont_write_bytecode", False)
+    with syspath_scope():
+        added_paths = add_srcdirs_to_syspath(tmp_path, precompile=True)
+    assert os.fspath(tmp_path / "src") in added_paths
+    out = capsys.readouterr().out
+    assert "3 file(s): 2 compiled, 0 current, 1 failed" in out and "ms compile time" in out
+    assert is_pyc_current(os.fspath(package_dir / "mod.py"), PycInvalidationMode.TIMESTAMP)
+
+
+def test_add_srcdirs_to_syspath_precompile_dont_write_bytecode(tmp_path: Path, capsys, monkeypatch):
+    package_dir = make_project(tmp_path)
+    monkeypatch.setattr(sys, "dont_write_bytecode", True)
+    with syspath_scope():
+        add_srcdirs_to_syspath(tmp_path, precompile=True)
+    assert "compiled" not in capsys.readouterr().out
+    assert not is_pyc_current(os.fspath(package_dir / "mod.py"), PycInvalidationMode.TIMESTAMP)
+
+
+def test_precompile_main(tmp_path: Path):
+    make_project(tmp_path)
+    runner = CliRunner()
+    result: Result = runner.invoke(
+        precompile_main,
+        ["-d", os.fspath(tmp_path), "--invalidation-mode", "checked-hash", "-j", "1"],
+    )
+    assert result.exit_code == 0
+    assert result.output.splitlines()[-1].startswith("3 file(s): 2 compiled, 0 current, 1 failed")
@@ -15,7 +15,11 @@ from click.testing import CliRunner, Result
 
 import runtime_syspath
 from runtime_syspath import syspath_sleuth
-from runtime_syspath.syspath_sleuth import SysPathSleuth, get_customize_path
+from runtime_syspath.syspath_sleuth import (
+    SysPathSleuth,
+    get_customize_path,
+    get_user_customize_path,
+)
 
 
 def test_parse_args_help():
@@ -24,6 +28,7 @@ def test_parse_args_help():
     assert "Usage:" in result.stdout
     assert "-i, --inject" in result.stdout and "-u, --uninstall" in result.stdout
     assert "-c, --custom" in result.stdout
+    assert "-p, --python" in result.stdout and "-e, --venvs" in result.stdout
     assert "-v, --verbose" in result.stdout
 
 
@@ -427,3 +432,97 @@ def test_live_report(request: FixtureRequest, testdir):
     relevant_index += 1
     regex = r"sys\.path\.extend\(\[\'yow\', \'yowsa\'\],\) from .*%s\.py:6$" % test_case_name
     assert re.match(regex, result.outlines[relevant_index])
+
+
+def make_venv(venv_dir: Path) -> Path:
+    site_packages = venv_dir / "lib" / "python3.9" / "site-packages"
+    site_packages.mkdir(parents=True)
+    (venv_dir / "pyvenv.cfg").write_text("home = /usr/bin\nversion = 3.9.1\n")
+    return site_packages
+
+
+def test_resolve_sleuth_environment(tmp_path: Path):
+    site_packages = make_venv(tmp_path / "venv")
+    bin_dir = tmp_path / "venv" / "bin"
+    bin_dir.mkdir()
+    (bin_dir / "python").touch()
+
+    for location in (tmp_path / "venv", bin_dir / "python"):
+        environment = syspath_sleuth.resolve_sleuth_environment(location)
+        assert environment.customize_path == site_packages / "sitecustomize.py"
+        assert not environment.is_user_path
+
+    environment = syspath_sleuth.resolve_sleuth_environment(Path(sys.executable))
+    assert environment.customize_path == get_customize_path()[0]
+
+
+def test_resolve_sleuth_environment_system_site_packages(tmp_path: Path):
+    venv_dir = tmp_path / "venv"
+    make_venv(venv_dir)
+    (venv_dir / "pyvenv.cfg").write_text(
+        f"home = {Path(sys.executable).parent}\ninclude-system-site-packages = true\n"
+    )
+    (venv_dir / "bin").mkdir()
+    (venv_dir / "bin" / "python").symlink_to(sys.executable)
+
+    # The user site is enabled, so the virtualenv's interpreter is asked where it is.
+    environment = syspath_sleuth.resolve_sleuth_environment(venv_dir)
+    if environment.is_user_path:
+        assert environment.customize_path == get_user_customize_path()
+    else:
+        assert environment.customize_path.name == "sitecustomize.py"
+        assert venv_dir in environment.customize_path.parents
+
+
+def test_find_venvs(tmp_path: Path):
+    make_venv(tmp_path / "venv")
+    # e.g.: a pyenv version directory
+    (tmp_path / "3.9.1" / "bin").mkdir(parents=True)
+    (tmp_path / "3.9.1" / "bin" / "python").touch()
+    (tmp_path / "not_a_venv").mkdir()
+    assert syspath_sleuth.find_venvs(tmp_path) == [tmp_path / "3.9.1", tmp_path / "venv"]
+
+
+def test_main_bulk(tmp_path: Path):
+    site_packages = [make_venv(tmp_path / name) for name in ("venv1", "venv2")]
+    (tmp_path / "not_a_venv").mkdir()
+
+    runner = CliRunner()
+    result: Result = runner.invoke(syspath_sleuth.syspath_sleuth_main, ["-i", "-e", str(tmp_path)])
+    assert result.stdout.count(" injected") == 2
+    assert "2 environment(s), 0 failed" in result.stdout
+    for site_packages_path in site_packages:
+        with (site_packages_path / "sitecustomize.py").open() as customize_f:
+            assert f"class {SysPathSleuth.__name__}" in customize_f.read()
+        assert (site_packages_path / "sitecustomize.patch").exists()
+
+    result = runner.invoke(syspath_sleuth.syspath_sleuth_main, ["-u", "-e", str(tmp_path)])
+    assert result.stdout.count(" uninstalled") == 2
+    for site_packages_path in site_packages:
+        assert not (site_packages_path / "sitecustomize.py").exists()
+        assert not (site_packages_path / "sitecustomize.patch").exists()
+
+
+def test_bulk_sleuth_shared_customize(tmp_path: Path, monkeypatch):
+    # Installations of one python version share a user site; not yet created here.
+    monkeypatch.setenv("PYTHONUSERBASE", os.fspath(tmp_path / "userbase"))
+    venv_dirs = [tmp_path / f"venv{index}" for index in range(3)]
+    for venv_dir in venv_dirs:
+        make_venv(venv_dir)
+        (venv_dir / "pyvenv.cfg").write_text(
+            f"home = {Path(sys.executable).parent}\ninclude-system-site-packages = true\n"
+        )
+        (venv_dir / "bin").mkdir()
+        (venv_dir / "bin" / "python").symlink_to(sys.executable)
+
+    results = syspath_sleuth.bulk_sleuth(venv_dirs, inject=True)
+    customize_paths = {result.customize_path for result in results}
+    assert len(customize_paths) == 1 and [result.status for result in results] == ["injected"] * 3
+    customize_path = customize_paths.pop()
+    if results[0].is_user_path:
+        assert tmp_path / "userbase" in customize_path.parents
+    assert f"class {SysPathSleuth.__name__}" in customize_path.read_text()
+
+    results = syspath_sleuth.bulk_sleuth(venv_dirs, inject=False)
+    assert [result.status for result in results] == ["uninstalled"] * 3
+    assert not customize_path.with_suffix(".patch").exists()
@@ -0,0 +1,81 @@
+import importlib.util
+import inspect
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from runtime_syspath import syspath_scope
+from runtime_syspath.syspath_sleuth import SysPathSleuth
+from runtime_syspath.syspath_sleuth.import_attribution import (
+    AttributingSysPathSleuth,
+    attributing_path_hook,
+    get_entry_attributions,
+    install_import_attribution,
+    is_import_attribution_installed,
+    uninstall_import_attribution,
+)
+
+
+@pytest.fixture(name="import_attribution")
+def import_attribution_fixture():
+    install_import_attribution()
+    yield
+    uninstall_import_attribution()
+
+
+@pytest.mark.usefixtures("import_attribution")
+def test_import_attribution(tmp_path: Path):
+    assert is_import_attribution_installed() and isinstance(sys.path, AttributingSysPathSleuth)
+    useless_dir, used_dir = tmp_path / "useless", tmp_path / "used"
+    for entry_dir in (useless_dir, used_dir):
+        entry_dir.mkdir()
+    (used_dir / "attributed_mod.py").touch()
+    useless_entry, used_entry = os.fspath(useless_dir), os.fspath(used_dir)
+
+    with syspath_scope():
+        sys.path.append(useless_entry)
+        append_lineno = inspect.currentframe().f_lineno - 1
+        sys.path.extend([used_entry])
+        for _ in range(2):
+            assert importlib.util.find_spec("attributed_mod")
+        assert importlib.util.find_spec("no_such_attributed_mod") is None
+
+    attributions = {attribution.entry: attribution for attribution in get_entry_attributions()}
+    useless, used = attributions[useless_entry], attributions[used_entry]
+    assert useless.modules == [] and useless.misses == 3 and useless.miss_seconds > 0
+    assert (useless.origin.action, useless.origin.filename) == ("append", __file__)
+    assert useless.origin.lineno == append_lineno
+    assert used.modules == ["attributed_mod"] and used.misses == 1 and used.hit_seconds > 0
+    assert used.origin.action == "extend"
+
+
+@pytest.mark.usefixtures("import_attribution")
+def test_import_attribution_cwd(tmp_path: Path, monkeypatch):
+    (tmp_path / "cwd_attributed_mod.py").touch()
+    monkeypatch.chdir(tmp_path)
+    with syspath_scope():
+        sys.path.insert(0, "")
+        assert importlib.util.find_spec("cwd_attributed_mod")
+        # As PathFinder hooks ''
+        assert attributing_path_hook(os.fspath(tmp_path))
+        with pytest.raises(ImportError):
+            attributing_path_hook(os.fspath(tmp_path / "not_an_entry"))
+
+    attributions = {attribution.entry: attribution for attribution in get_entry_attributions()}
+    assert "cwd_attributed_mod" in attributions[""].modules
+    assert os.fspath(tmp_path) not in attributions
+
+
+def test_install_in_place(monkeypatch):
+    sleuth = SysPathSleuth(sys.path)
+    monkeypatch.setattr(sys, "path", sleuth)
+    install_import_attribution()
+    try:
+        assert sys.path is sleuth and type(sleuth) is AttributingSysPathSleuth
+        assert AttributingSysPathSleuth.is_sleuthing
+    finally:
+        uninstall_import_attribution()
+    assert sys.path is sleuth and type(sleuth) is SysPathSleuth
+    assert attributing_path_hook not in sys.path_hooks
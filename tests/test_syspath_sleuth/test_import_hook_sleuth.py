@@ -0,0 +1,95 @@
+import importlib
+import sys
+from importlib.machinery import FileFinder, PathFinder
+from pathlib import Path
+
+import pytest
+from _pytest.capture import CaptureFixture
+
+from runtime_syspath import syspath_scope
+from runtime_syspath.syspath_sleuth import SysPathSleuth
+from runtime_syspath.syspath_sleuth.import_hook_sleuth import (
+    PathImporterCacheSleuth,
+    get_find_spec_timings,
+    get_hook_installs,
+    get_hook_name,
+    install_import_hook_sleuth,
+    is_import_hook_sleuth_installed,
+    uninstall_import_hook_sleuth,
+)
+
+
+class NothingFinder:
+    def find_spec(self, fullname, path=None, target=None):  # pylint: disable=unused-argument
+        return None
+
+
+@pytest.fixture(name="import_hook_sleuth")
+def import_hook_sleuth_fixture(monkeypatch):
+    # Report by print() regardless of the handlers prior tests, or pytest, put on the logger.
+    monkeypatch.setattr(SysPathSleuth, "_is_logging_on", classmethod(lambda cls: False))
+    prior_meta_path, prior_path_hooks = sys.meta_path, sys.path_hooks
+    prior_path_importer_cache = sys.path_importer_cache
+    install_import_hook_sleuth(timing=True)
+    yield
+    uninstall_import_hook_sleuth()
+    prior_meta_path[:] = sys.meta_path
+    prior_path_hooks[:] = sys.path_hooks
+    prior_path_importer_cache.clear()
+    prior_path_importer_cache.update(sys.path_importer_cache)
+    sys.meta_path, sys.path_hooks = prior_meta_path, prior_path_hooks
+    sys.path_importer_cache = prior_path_importer_cache
+
+
+@pytest.mark.usefixtures("import_hook_sleuth")
+def test_import_hook_sleuth(tmp_path: Path, capsys: CaptureFixture):
+    assert is_import_hook_sleuth_installed()
+    assert isinstance(sys.path_importer_cache, PathImporterCacheSleuth)
+    prior_install_count = len(get_hook_installs())
+    finder = NothingFinder()
+    sys.meta_path.insert(0, finder)
+    sys.path_hooks.append(FileFinder.path_hook())
+    hook_installs = get_hook_installs()[prior_install_count:]
+    assert [(hook_install.target, hook_install.action) for hook_install in hook_installs] == [
+        ("sys.meta_path", "insert"),
+        ("sys.path_hooks", "append"),
+    ]
+    assert all(hook_install.filename == __file__ for hook_install in hook_installs)
+    out_lines = capsys.readouterr().out.splitlines()
+    assert out_lines[0].startswith("sys.meta_path.insert(0, <")
+
+    # caller_depth is honored; one beyond the outermost frame records nothing.
+    prior_install_count = len(get_hook_installs())
+    sys.meta_path._where("append", ("yow",), caller_depth=1)  # pylint: disable=protected-access
+    sys.meta_path._where("append", ("yow",), caller_depth=1000)  # pylint: disable=protected-access
+    hook_installs = get_hook_installs()[prior_install_count:]
+    assert [hook_install.filename for hook_install in hook_installs] == [__file__]
+    capsys.readouterr()
+
+    # The import system's own mutations are recorded, not reported.
+    (tmp_path / "hooked_mod.py").touch()
+    with syspath_scope():
+        sys.path.append(str(tmp_path))
+        importlib.invalidate_caches()
+        assert importlib.util.find_spec("hooked_mod")
+    assert len(get_hook_installs(include_import_system=True)) > len(get_hook_installs())
+    # syspath_scope() forgetting the entry is not the import system.
+    out_lines = [
+        line
+        for line in capsys.readouterr().out.splitlines()
+        if line.startswith("sys.path_importer_cache.")
+    ]
+    assert len(out_lines) == 1
+    assert out_lines[0].startswith(f"sys.path_importer_cache.__delitem__({str(tmp_path)!r},)")
+    assert "syspath_utils.py:" in out_lines[0]
+
+    timings = {timing.hook: timing for timing in get_find_spec_timings()}
+    assert timings[get_hook_name(finder)].calls >= 1
+    assert timings[get_hook_name(PathFinder)].seconds > 0
+    assert timings[f"{get_hook_name(FileFinder)} (path entry finder)"].calls >= 1
+    sys.meta_path.remove(finder)
+
+    uninstall_import_hook_sleuth()
+    assert not is_import_hook_sleuth_installed()
+    assert type(sys.meta_path) is list and "find_spec" not in vars(finder)
+    assert PathFinder.find_spec.__self__ is PathFinder
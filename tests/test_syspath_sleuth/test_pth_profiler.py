@@ -0,0 +1,40 @@
+import json
+from pathlib import Path
+
+from click.testing import CliRunner, Result
+
+from runtime_syspath.syspath_sleuth.pth_profiler import profile_pths, pth_profiler_main
+
+
+def make_site_dir(site_dir: Path) -> Path:
+    (site_dir / "pkg_a").mkdir(parents=True)
+    (site_dir / "pkg_b").mkdir()
+    (site_dir / "paths.pth").write_text("# comment\npkg_a\npkg_b\nmissing\n")
+    (site_dir / "imports.pth").write_text("import json\npkg_a\n")
+    return site_dir
+
+
+def test_profile_pths(tmp_path: Path):
+    site_dir = make_site_dir(tmp_path)
+    reports = profile_pths(site_dirs=[site_dir])
+    assert [report["seconds"] for report in reports] == sorted(
+        (report["seconds"] for report in reports), reverse=True
+    )
+
+    by_name = {Path(report["pth"]).name: report for report in reports}
+    assert by_name["imports.pth"]["imports"][0]["line"] == "import json"
+    assert by_name["imports.pth"]["paths_added"] == 1
+    # imports.pth sorts first and already added pkg_a
+    assert by_name["paths.pth"]["paths_added"] == 1
+    assert by_name["paths.pth"]["syspath_growth"] == 1
+    assert not by_name["paths.pth"]["imports"] and not by_name["paths.pth"]["error"]
+
+
+def test_pth_profiler_main(tmp_path: Path):
+    site_dir = make_site_dir(tmp_path)
+    runner = CliRunner()
+    result: Result = runner.invoke(pth_profiler_main, ["-s", str(site_dir)])
+    assert "2 .pth file(s)" in result.stdout and "import json" in result.stdout
+
+    result = runner.invoke(pth_profiler_main, ["-s", str(site_dir), "--json"])
+    assert len(json.loads(result.stdout)) == 2
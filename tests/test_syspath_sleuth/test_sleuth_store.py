@@ -0,0 +1,74 @@
+""" pytest module to test the runtime_syspath.syspath_sleuth.sleuth_store module"""
+import os
+from pathlib import Path
+
+from click.testing import CliRunner, Result
+
+from runtime_syspath.syspath_sleuth import SysPathSleuth
+from runtime_syspath.syspath_sleuth.sleuth_store import (
+    get_new_callsites,
+    get_run_trends,
+    get_top_callsites,
+    install_sleuth_store,
+    sleuth_store_main,
+)
+
+
+def store_run(db_path: Path, run_id: str, new_callsite: bool) -> None:
+    logger = SysPathSleuth.logger
+    prior_level, prior_handlers = logger.level, list(logger.handlers)
+    logger.handlers[:] = []
+    handler = install_sleuth_store(db_path, run_id)
+    try:
+        sleuth = SysPathSleuth(["a"])
+        for _ in range(3):
+            sleuth.append("yow")
+            sleuth.remove("yow")
+        if new_callsite:
+            sleuth.extend(["b", "c"])
+        SysPathSleuth.flush()
+        handler.flush()
+    finally:
+        handler.close()
+        logger.setLevel(prior_level)
+        logger.handlers[:] = prior_handlers
+        SysPathSleuth.refresh()
+    assert handler.dropped == 0
+
+
+def test_sleuth_store(tmp_path: Path):
+    db_path = tmp_path / "sleuth.db"
+    store_run(db_path, "baseline", new_callsite=False)
+    store_run(db_path, "current", new_callsite=True)
+    test_file = Path(__file__).name
+
+    top = get_top_callsites(db_path)
+    assert [(callsite.action, callsite.events, callsite.runs) for callsite in top] == [
+        ("append", 6, 2),
+        ("remove", 6, 2),
+        ("extend", 1, 1),
+    ]
+    assert all(test_file in callsite.callsite for callsite in top)
+    assert [callsite.events for callsite in get_top_callsites(db_path, run_id="current")] == [
+        3,
+        3,
+        1,
+    ]
+
+    (new,) = get_new_callsites(db_path, "baseline")
+    assert new.action == "extend" and new.events == 1
+    assert get_new_callsites(db_path, "current", "baseline") == []
+
+    trends = get_run_trends(db_path)
+    assert [(trend.run_id, trend.events, trend.callsites, trend.paths) for trend in trends] == [
+        ("baseline", 6, 2, 1),
+        ("current", 7, 3, 3),
+    ]
+    assert [trend.events for trend in get_run_trends(db_path, callsite=new.callsite)] == [0, 1]
+
+    runner = CliRunner()
+    result: Result = runner.invoke(
+        sleuth_store_main, ["--db", os.fspath(db_path), "new", "--baseline", "baseline"]
+    )
+    assert result.exit_code == 0
+    assert result.output == f"       1      1  sys.path.extend from {new.callsite}\n"
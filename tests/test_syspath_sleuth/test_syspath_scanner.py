@@ -0,0 +1,104 @@
+import os
+import runpy
+import sys
+from pathlib import Path
+
+from _pytest.capture import CaptureFixture
+from click.testing import CliRunner, Result
+
+from runtime_syspath.syspath_sleuth import SysPathSleuth
+from runtime_syspath.syspath_sleuth.syspath_scanner import (
+    SysPathCallsite,
+    find_syspath_manipulations,
+    format_callsite,
+    scan_syspath_manipulations,
+    syspath_scanner_main,
+)
+
+MANIPULATIONS_SOURCE = """\
+import site as s
+import sys as _sys
+from sys import path as syspath
+from site import addsitedir
+
+_sys.path.append('yow')
+syspath.insert(0, 'yowsa')
+_sys.path[0] = 'yow'
+del _sys.path[0]
+_sys.path += ['yow']
+_sys.path = list(_sys.path)
+s.addsitedir('yow')
+addsitedir('yowsa')
+os.path.append('not sys.path')
+"""
+
+
+def test_find_syspath_manipulations():
+    manipulations = find_syspath_manipulations(MANIPULATIONS_SOURCE.encode(), "module.py")
+    assert [tuple(manipulation) for manipulation in manipulations] == [
+        (6, "sys.path", "append", "('yow',)"),
+        (7, "sys.path", "insert", "(0, 'yowsa')"),
+        (8, "sys.path", "__setitem__", "(0, 'yow')"),
+        (9, "sys.path", "__delitem__", "(0,)"),
+        (10, "sys.path", "__iadd__", "(['yow'],)"),
+        (11, "sys.path", "=", "list(_sys.path)"),
+        (12, "site", "addsitedir", "('yow',)"),
+        (13, "site", "addsitedir", "('yowsa',)"),
+    ]
+    assert find_syspath_manipulations(b"import os\nos.path.join('a')\n", "module.py") == []
+    assert find_syspath_manipulations(b"import sys\ndef (:\n", "module.py") is None
+
+
+def test_scan_syspath_manipulations(tmp_path: Path):
+    package_dir = tmp_path / "src" / "pkg"
+    package_dir.mkdir(parents=True)
+    (package_dir / "manipulations.py").write_text(MANIPULATIONS_SOURCE)
+    (package_dir / "prefiltered.py").write_text("import os\n")
+    (package_dir / "unparsable.py").write_text("import sys\ndef (:\n")
+    site_dir = tmp_path / "site-packages"
+    (site_dir / "added").mkdir(parents=True)
+    (site_dir / "project.pth").write_text(
+        "# comment\nadded\nmissing\nimport sys; sys.path.insert(0, 'yow')\n"
+    )
+
+    file_count, callsites, unparsable = scan_syspath_manipulations(
+        [os.fspath(tmp_path / "src")], [os.fspath(site_dir)], max_workers=1, use_cache=False
+    )
+    assert file_count == 4
+    assert unparsable == [os.fspath(package_dir / "unparsable.py")]
+    pth_path = os.fspath(site_dir / "project.pth")
+    assert [callsite for callsite in callsites if callsite.path == pth_path] == [
+        SysPathCallsite(pth_path, 2, "sys.path", "append", f"({os.fspath(site_dir / 'added')!r},)"),
+        SysPathCallsite(pth_path, 4, "sys.path", "insert", "(0, 'yow')"),
+    ]
+    assert len(callsites) == 10
+
+
+def test_format_callsite_joins_runtime_report(tmp_path: Path, capsys: CaptureFixture, monkeypatch):
+    module_path = tmp_path / "module.py"
+    module_path.write_text("import sys\n\nsys.path.insert(0, 'yow')\n")
+    _, (callsite,), _ = scan_syspath_manipulations([os.fspath(tmp_path)], use_cache=False)
+
+    monkeypatch.setattr(SysPathSleuth, "_is_logging_on", classmethod(lambda cls: False))
+    SysPathSleuth.refresh()
+    monkeypatch.setattr(sys, "path", SysPathSleuth(sys.path))
+    try:
+        runpy.run_path(os.fspath(module_path))
+    finally:
+        monkeypatch.undo()
+        SysPathSleuth.refresh()
+    assert capsys.readouterr().out.splitlines() == [format_callsite(callsite)]
+
+
+def test_syspath_scanner_main(tmp_path: Path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "module.py").write_text("import sys\nsys.path.append('yow')\n")
+    runner = CliRunner()
+    result: Result = runner.invoke(
+        syspath_scanner_main, ["-d", os.fspath(tmp_path), "--no-site", "--no-cache"]
+    )
+    assert result.exit_code == 0
+    lines = result.output.splitlines()
+    assert lines[0].startswith("sys.path.append('yow',) from ")
+    assert lines[0].endswith("src/module.py:2")
+    assert lines[-1] == "1 file(s) scanned: 1 sys.path manipulation(s)"
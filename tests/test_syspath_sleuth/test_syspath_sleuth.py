@@ -1,12 +1,21 @@
+import asyncio
+import io
 import inspect
+import json
 import logging
+import os
+import signal
+import sys
+import threading
 from pathlib import Path, PurePath
 from typing import List
 
+import pytest
 from _pytest.capture import CaptureFixture
 from _pytest.logging import LogCaptureFixture
 
 from runtime_syspath.syspath_sleuth import SysPathSleuth
+from runtime_syspath.syspath_sleuth.syspath_sleuth import DisabledSysPathSleuth, _get_batch_size
 
 
 def test_append_print(capsys: CaptureFixture):
@@ -61,3 +70,179 @@ def test_get_base_list():
     base_list = sleuth.get_base_list()
     assert not isinstance(base_list, SysPathSleuth)
     assert "yow" in base_list and len(base_list) == 1
+
+
+@pytest.fixture(name="print_reporting")
+def print_reporting_fixture(monkeypatch):
+    # Report by print() regardless of the handlers prior tests, or pytest, put on the logger.
+    monkeypatch.setattr(SysPathSleuth, "_is_logging_on", classmethod(lambda cls: False))
+    SysPathSleuth.refresh()
+    yield
+    monkeypatch.undo()
+    SysPathSleuth.refresh()
+
+
+@pytest.mark.parametrize(
+    "batch_size, expected", [("", 1), ("100", 100), ("0", 1), ("-5", 1), ("lots", 1)]
+)
+def test_get_batch_size(monkeypatch, batch_size: str, expected: int):
+    monkeypatch.setenv("SYSPATH_SLEUTH_BATCH_SIZE", batch_size)
+    assert _get_batch_size() == expected
+
+
+@pytest.mark.usefixtures("print_reporting")
+def test_thread_and_task_identity(capsys: CaptureFixture, monkeypatch):
+    monkeypatch.setattr(SysPathSleuth, "batch_size", 100)
+    sleuth = SysPathSleuth()
+
+    def mutate():
+        sleuth.append("thread")
+
+    threads = [threading.Thread(target=mutate, name=f"plugin-{index}") for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    async def mutate_in_task():
+        sleuth.append("task")
+
+    async def run_task():
+        await asyncio.create_task(mutate_in_task())
+
+    asyncio.run(run_task())
+    # Batched; nothing reported yet.
+    assert not capsys.readouterr().out
+
+    SysPathSleuth.flush()
+    out_lines: List[str] = capsys.readouterr().out.splitlines()
+    assert len(sleuth) == len(out_lines) == 5
+    thread_lines = [line for line in out_lines if "'thread'" in line]
+    assert sorted(line.rpartition(" [")[2] for line in thread_lines) == [
+        f"thread plugin-{index}]" for index in range(4)
+    ]
+    (task_line,) = [line for line in out_lines if "'task'" in line]
+    assert task_line.startswith("sys.path.append('task',) from ")
+    assert task_line.endswith("]") and ", task " in task_line
+
+
+@pytest.mark.usefixtures("print_reporting")
+def test_stats(capsys: CaptureFixture, monkeypatch):
+    sleuth = SysPathSleuth()
+    prior_stats = SysPathSleuth.stats()
+    sleuth.append("yow")
+    sleuth.insert(0, "yowsa")
+    sleuth.pop()
+    stats = sleuth.stats()
+
+    prior_mutations = prior_stats["mutations"]
+    assert {
+        action: count - prior_mutations.get(action, 0)
+        for action, count in stats["mutations"].items()
+        if count != prior_mutations.get(action, 0)
+    } == {"append": 1, "insert": 1, "pop": 1}
+    assert stats["events"] - prior_stats["events"] == 3
+    assert stats["dropped"] == prior_stats["dropped"]
+    assert stats["where_ns"] > prior_stats["where_ns"]
+    assert stats["emit_ns"] > prior_stats["emit_ns"]
+    assert stats["overhead_ns"] == stats["where_ns"] + stats["emit_ns"]
+    assert 0 < stats["overhead_percent"] < 100
+    capsys.readouterr()
+
+    SysPathSleuth.report_stats()
+    summary: str = capsys.readouterr().out
+    assert summary.startswith("SysPathSleuth: ") and "process CPU time" in summary
+
+    monkeypatch.setattr(SysPathSleuth, "_is_overhead_warned", False)
+    monkeypatch.setattr(SysPathSleuth, "overhead_warn_percent", 100.0)
+    assert not SysPathSleuth.check_overhead()
+    monkeypatch.setattr(SysPathSleuth, "overhead_warn_percent", 0.0)
+    assert SysPathSleuth.check_overhead() and SysPathSleuth.check_overhead()
+    warnings: List[str] = capsys.readouterr().out.splitlines()
+    assert len(warnings) == 1 and "$SYSPATH_SLEUTH_OVERHEAD_WARN=0%" in warnings[0]
+
+    # A caller_depth beyond the outermost frame drops the event rather than raising.
+    prior_dropped = SysPathSleuth.stats()["dropped"]
+    SysPathSleuth._where("append", ("yow",), caller_depth=1000)  # pylint: disable=protected-access
+    assert SysPathSleuth.stats()["dropped"] == prior_dropped + 1
+
+
+def load_plugin(sleuth: SysPathSleuth, path: str):
+    sleuth.append(path)
+
+
+def load_plugins(sleuth: SysPathSleuth):
+    for _ in range(3):
+        load_plugin(sleuth, "plugin")
+    load_plugin(sleuth, "other plugin")
+    sleuth.remove("plugin")
+
+
+@pytest.mark.usefixtures("print_reporting")
+def test_stacks(capsys: CaptureFixture, monkeypatch):
+    monkeypatch.setattr(SysPathSleuth, "stack_depth", 3)
+    load_plugins(SysPathSleuth())
+    capsys.readouterr()
+
+    stacks = {
+        stack: count
+        for stack, count in SysPathSleuth.get_stacks().items()
+        if any(name.startswith("load_plugins ") for name in stack)
+    }
+    # Three frames up from each mutation's caller
+    assert [len(stack) for stack in stacks] == [4, 4, 4]
+    load_plugin_stacks = [stack for stack in stacks if stack[2].startswith("load_plugin ")]
+    assert [stack[0].partition(" ")[0] for stack in load_plugin_stacks] == ["test_stacks"] * 2
+    # Mutations from the same stack aggregate: the loop's, and then the single call's.
+    assert sorted(stacks[stack] for stack in load_plugin_stacks) == [1, 3]
+    assert {stack[-1] for stack in stacks} == {"sys.path.append", "sys.path.remove"}
+
+    collapsed = io.StringIO()
+    SysPathSleuth.write_collapsed_stacks(collapsed)
+    collapsed_lines = [
+        line for line in collapsed.getvalue().splitlines() if ";load_plugins " in line
+    ]
+    assert len(collapsed_lines) == 3
+    assert any(line.endswith(";sys.path.remove 1") for line in collapsed_lines)
+
+    speedscope_f = io.StringIO()
+    SysPathSleuth.write_speedscope(speedscope_f)
+    speedscope = json.loads(speedscope_f.getvalue())
+    frames = speedscope["shared"]["frames"]
+    (profile,) = speedscope["profiles"]
+    mutation_count = sum(SysPathSleuth.get_stacks().values())
+    assert sum(profile["weights"]) == profile["endValue"] == mutation_count
+    assert frames[profile["samples"][0][-1]]["name"].startswith("sys.path.")
+
+
+@pytest.mark.usefixtures("print_reporting")
+def test_enable_disable(capsys: CaptureFixture):
+    sleuth = SysPathSleuth(["yow"])
+    syspath = sleuth
+    mutation_count = sum(SysPathSleuth.stats()["mutations"].values())
+    sleuth.disable()
+    assert type(syspath) is DisabledSysPathSleuth and not syspath.is_enabled()
+    syspath.append("yowsa")
+    assert not capsys.readouterr().out
+    assert sum(syspath.stats()["mutations"].values()) == mutation_count
+
+    syspath.enable()
+    assert type(sleuth) is SysPathSleuth and sleuth.is_enabled()
+    sleuth.remove("yowsa")
+    assert capsys.readouterr().out.startswith("sys.path.remove('yowsa',)")
+    assert sleuth == ["yow"]
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="No SIGUSR1 on this platform")
+def test_toggle_signal(monkeypatch):
+    prior_handler = signal.getsignal(signal.SIGUSR1)
+    monkeypatch.setattr(sys, "path", SysPathSleuth(sys.path))
+    try:
+        assert SysPathSleuth.install_toggle_signal("SIGUSR1")
+        os.kill(os.getpid(), signal.SIGUSR1)
+        assert type(sys.path) is DisabledSysPathSleuth
+        os.kill(os.getpid(), signal.SIGUSR1)
+        assert type(sys.path) is SysPathSleuth
+    finally:
+        signal.signal(signal.SIGUSR1, prior_handler)
+    assert not SysPathSleuth.install_toggle_signal("SIGNOPE")
@@ -0,0 +1,112 @@
+""" pytest module to test the runtime_syspath.syspath_snapshot module"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from runtime_syspath import get_project_root_dir, syspath_snapshot, write_snapshot
+from runtime_syspath.syspath_cache import CACHE_DIR_ENV_VAR
+from runtime_syspath.syspath_snapshot import (
+    SNAPSHOT_ENV_VAR,
+    get_interpreter,
+    load_snapshot,
+    remove_snapshot,
+)
+
+CHILD_SOURCE = """
+import sys
+from runtime_syspath import add_srcdirs_to_syspath, get_project_root_dir, syspath_utils
+from runtime_syspath.syspath_snapshot import SnapshotModuleIndexFinder
+
+def discover_srcdirs(*args):
+    raise AssertionError("rediscovered")
+
+syspath_utils.discover_srcdirs = discover_srcdirs
+add_srcdirs_to_syspath(quiet=True)
+import snapshot_mod
+print(get_project_root_dir())
+print(snapshot_mod.__file__)
+print(any(isinstance(finder, SnapshotModuleIndexFinder) for finder in sys.meta_path))
+"""
+
+
+@pytest.fixture(name="snapshot_project")
+def snapshot_project_fixture(tmp_path: Path, monkeypatch) -> Path:
+    monkeypatch.setenv(CACHE_DIR_ENV_VAR, os.fspath(tmp_path / "cache"))
+    monkeypatch.delenv(SNAPSHOT_ENV_VAR, raising=False)
+    monkeypatch.setattr(syspath_snapshot, "_SNAPSHOT", None)
+    monkeypatch.setattr(sys, "path", list(sys.path))
+    src_dir = tmp_path / "project" / "src"
+    src_dir.mkdir(parents=True)
+    (src_dir / "snapshot_mod.py").write_text("")
+    return tmp_path / "project"
+
+
+def test_write_snapshot(snapshot_project: Path):
+    snapshot_path = write_snapshot(snapshot_project, module_index=True)
+    try:
+        assert os.environ[SNAPSHOT_ENV_VAR] == os.fspath(snapshot_path)
+        snapshot = json.loads(snapshot_path.read_text())
+        assert snapshot["project_root"] == os.fspath(snapshot_project)
+        assert snapshot["module_index"] == {"snapshot_mod": os.fspath(snapshot_project / "src")}
+        assert os.fspath(snapshot_project / "src") in sys.path
+
+        child = subprocess.run(
+            [sys.executable, "-c", CHILD_SOURCE],
+            stdout=subprocess.PIPE,
+            text=True,
+            check=True,
+            cwd=os.fspath(snapshot_project / "src"),
+        )
+        assert child.stdout.splitlines() == [
+            os.fspath(snapshot_project),
+            os.fspath(snapshot_project / "src" / "snapshot_mod.py"),
+            "True",
+        ]
+    finally:
+        remove_snapshot(snapshot_path)
+    assert SNAPSHOT_ENV_VAR not in os.environ and not snapshot_path.exists()
+
+
+def test_load_snapshot_ignores_unusable(snapshot_project: Path):
+    assert load_snapshot() is None
+    assert load_snapshot(snapshot_project / "missing.json") is None
+    snapshot_path = snapshot_project / "snapshot.json"
+    snapshot_path.write_text("{not json")
+    assert load_snapshot(snapshot_path) is None
+    snapshot_path.write_text(json.dumps({"version": 0}))
+    assert load_snapshot(snapshot_path) is None
+    snapshot_path.write_text(
+        json.dumps(
+            {
+                "version": syspath_snapshot.SNAPSHOT_VERSION,
+                "project_root": os.fspath(snapshot_project),
+                "interpreter": [*get_interpreter()[:-1], "/another/venv"],
+                "srcdirs": {},
+                "module_index": {},
+            }
+        )
+    )
+    assert load_snapshot(snapshot_path) is None
+
+
+def test_load_snapshot(snapshot_project: Path, tmp_path: Path, monkeypatch):
+    sys.path.append("parent_only")
+    snapshot_path = write_snapshot(snapshot_project, snapshot_path=tmp_path / "snapshot.json")
+    src_dir = os.fspath(snapshot_project / "src")
+    monkeypatch.setattr(syspath_snapshot, "_SNAPSHOT", None)
+    sys.path[:] = [path for path in sys.path if path not in (src_dir, "parent_only")]
+    prior_syspath = list(sys.path)
+
+    snapshot = load_snapshot(snapshot_path)
+    # Only the src directories are applied, not the rest of the parent's sys.path.
+    assert snapshot and sys.path == [*prior_syspath, src_dir]
+
+    monkeypatch.chdir(snapshot_project / "src")
+    assert get_project_root_dir() == snapshot_project
+    # Outside the snapshot's project root, the root is discovered.
+    monkeypatch.chdir(tmp_path)
+    assert get_project_root_dir() != snapshot_project
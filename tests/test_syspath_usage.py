@@ -0,0 +1,63 @@
+""" pytest module to test the runtime_syspath.syspath_usage module"""
+import os
+from pathlib import Path
+
+from click.testing import CliRunner, Result
+
+from runtime_syspath import add_srcdirs_to_syspath, syspath_scope
+from runtime_syspath.syspath_cache import CACHE_DIR_ENV_VAR
+from runtime_syspath.syspath_usage import (
+    analyze_srcdir_usage,
+    find_absolute_imports,
+    srcdir_usage_main,
+)
+
+
+def make_project(project_dir: Path) -> Path:
+    for srcdir, module, source in (
+        ("src", "app.py", "import lib_pkg.mod\n"),
+        ("tests/lib/src", "lib_pkg/mod.py", "from . import other\n"),
+        ("tests/plugin/src", "plugin_mod.py", "import importlib\nimportlib.import_module('app')\n"),
+        ("tests/unused/src", "unused_mod.py", "import unused_mod\n"),
+    ):
+        (project_dir / srcdir / module).parent.mkdir(parents=True, exist_ok=True)
+        (project_dir / srcdir / module).write_text(source)
+    (project_dir / "tests" / "test_app.py").write_text("from app import main\n")
+    (project_dir / "tests" / "conftest.py").write_text("__import__('plugin_mod')\n")
+    return project_dir
+
+
+def test_find_absolute_imports():
+    source = b"import a.b, c\nfrom d.e import f\nfrom . import g\n__import__('h.i')\n"
+    assert find_absolute_imports(source, "source.py") == ["a", "c", "d", "h"]
+    assert find_absolute_imports(b"def (:", "broken.py") is None
+
+
+def test_analyze_srcdir_usage(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv(CACHE_DIR_ENV_VAR, os.fspath(tmp_path / "cache"))
+    project_dir = make_project(tmp_path / "project")
+    srcdirs = [
+        os.fspath(project_dir / srcdir)
+        for srcdir in ("src", "tests/lib/src", "tests/plugin/src", "tests/unused/src")
+    ]
+    usages = analyze_srcdir_usage(srcdirs, [os.fspath(project_dir / "tests")], max_workers=2)
+    assert [usage.is_used for usage in usages] == [True, True, True, False]
+    assert usages[0].importers == sorted(
+        [
+            os.fspath(project_dir / "tests" / "test_app.py"),
+            os.path.join(srcdirs[2], "plugin_mod.py"),
+        ]
+    )
+    assert usages[1].modules == ["lib_pkg"] and not usages[3].importers
+
+    with syspath_scope():
+        added_paths = add_srcdirs_to_syspath(project_dir, quiet=True, prune_unused=True)
+        assert sorted(added_paths) == sorted(srcdirs[:3])
+
+
+def test_srcdir_usage_main(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv(CACHE_DIR_ENV_VAR, os.fspath(tmp_path / "cache"))
+    project_dir = make_project(tmp_path / "project")
+    result: Result = CliRunner().invoke(srcdir_usage_main, ["-d", os.fspath(project_dir)])
+    assert result.exit_code == 0
+    assert "UNUSED" in result.output and "4 src dir(s): 1 unused" in result.output
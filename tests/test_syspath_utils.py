@@ -1,7 +1,9 @@
 """ pytest module to tests the runtime_syspath.add_srcdirs_to_syspath module"""
+import hashlib
 import os
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import List
 
@@ -17,8 +19,23 @@ from runtime_syspath import (
     filtered_sorted_syspath,
     print_syspath,
     get_project_root_dir,
+    syspath_utils,
+)
+from runtime_syspath.syspath_utils import (
+    CONSOLIDATED_PTH_HASH_HEADER,
+    PTH_GITIGNORE,
+    PTH_MANIFEST_NAME,
+    get_consolidated_site_pth_path,
+    get_pth_manifest_path,
+    get_pth_templates,
+    inject_project_pths_to_site,
+    load_pth_manifest,
+    merge_staged_syspath,
+    persist_syspath,
+    syspath_scope,
+    write_consolidated_site_pth,
+    write_pth_manifest,
 )
-from runtime_syspath.syspath_utils import inject_project_pths_to_site, persist_syspath
 
 from tests.conftest import PROJECT_ROOT_DIR
 
@@ -83,6 +100,44 @@ def test_inject_project_pths_to_site():
     inject_project_pths_to_site()
 
 
+def test_inject_project_pths_to_site_consolidated(tmp_path: Path, monkeypatch):
+    site_path = tmp_path / "site-packages"
+    site_path.mkdir()
+    monkeypatch.setattr(
+        syspath_utils, "get_customize_path", lambda: (site_path / "usercustomize.py", True)
+    )
+    project_dir = tmp_path / "project"
+    (project_dir / "pths").mkdir(parents=True)
+    write_pth_manifest(project_dir / "pths", ["${path_to_project}/src", "${path_to_project}/lib"])
+    stale_pth_path = site_path / "000_project_src.pth"
+    stale_pth_path.touch()
+
+    inject_project_pths_to_site(project_dir, consolidate=True)
+    paths = [os.fspath(project_dir / "src"), os.fspath(project_dir / "lib")]
+    content = "".join(f"{path}\n" for path in paths)
+    header, *lines = get_consolidated_site_pth_path(site_path, "project").read_text().splitlines()
+    assert header == CONSOLIDATED_PTH_HASH_HEADER + hashlib.sha256(content.encode()).hexdigest()
+    assert lines == paths
+    assert not stale_pth_path.exists()
+
+
+def test_write_consolidated_site_pth(tmp_path: Path):
+    paths = ["/pathto/project/src", "/pathto/project/tests/sub/src"]
+    assert write_consolidated_site_pth(tmp_path, "project", paths)
+    consolidated_pth_path = get_consolidated_site_pth_path(tmp_path, "project")
+    lines = consolidated_pth_path.read_text().splitlines()
+    assert lines[0].startswith(CONSOLIDATED_PTH_HASH_HEADER) and lines[1:] == paths
+
+    stat = consolidated_pth_path.stat()
+    assert not write_consolidated_site_pth(tmp_path, "project", paths)
+    assert consolidated_pth_path.stat().st_ino == stat.st_ino
+    assert consolidated_pth_path.stat().st_mtime_ns == stat.st_mtime_ns
+
+    assert write_consolidated_site_pth(tmp_path, "project", paths[:1])
+    assert consolidated_pth_path.read_text().splitlines()[1:] == paths[:1]
+    assert [path.name for path in tmp_path.iterdir()] == [consolidated_pth_path.name]
+
+
 def test_get_max_dots_up_to_relative_import_in_this_module() -> None:
     """
     Test get_max_dots_up_to_relative_import_in_this_module.
@@ -111,3 +166,111 @@ def test_get_max_dots_up_to_relative_import_in_this_module() -> None:
 
 def test_get_project_root_dir():
     assert get_project_root_dir() == PROJECT_ROOT_DIR
+
+
+def test_pth_manifest(tmp_path: Path):
+    template_dir = tmp_path / "project" / "pths"
+    template_dir.mkdir(parents=True)
+    legacy = {
+        "000_project_src.pth.template": "${path_to_project}/src\n",
+        "001_project_tests_sub_src.pth.template": "${path_to_project}/tests/sub/src\n",
+        "002_project_src.pth.template": "${path_to_project}/src\n",
+    }
+    for name, template in legacy.items():
+        (template_dir / name).write_text(template)
+
+    assert load_pth_manifest(template_dir) == [
+        "${path_to_project}/src",
+        "${path_to_project}/tests/sub/src",
+    ]
+    assert not any(template_dir.glob("*.pth.template"))
+    assert (template_dir / PTH_MANIFEST_NAME).exists()
+
+    project_dir = os.fspath(template_dir.parent)
+    assert get_pth_templates(template_dir) == {
+        "000_project_src.pth": f"{project_dir}/src",
+        "001_project_tests_sub_src.pth": f"{project_dir}/tests/sub/src",
+    }
+
+    sys.path.append(f"{project_dir}/tests/other/src")
+    try:
+        persist_syspath(template_dir.parent, worker_id="")
+    finally:
+        sys.path.remove(f"{project_dir}/tests/other/src")
+    assert load_pth_manifest(template_dir)[-1] == "${path_to_project}/tests/other/src"
+    assert (template_dir / ".gitignore").read_text() == PTH_GITIGNORE
+
+    stat = get_pth_manifest_path(template_dir).stat()
+    persist_syspath(template_dir.parent, worker_id="")
+    assert get_pth_manifest_path(template_dir).stat().st_mtime_ns == stat.st_mtime_ns
+
+
+def test_pth_manifest_replaced_within_mtime(tmp_path: Path):
+    template_dir = tmp_path / "pths"
+    template_dir.mkdir()
+    write_pth_manifest(template_dir, ["${path_to_project}/src"])
+    manifest_path = get_pth_manifest_path(template_dir)
+    stat = manifest_path.stat()
+    assert load_pth_manifest(template_dir) == ["${path_to_project}/src"]
+
+    # Replaced by another process within the mtime's granularity
+    other_path = template_dir / "other.manifest"
+    other_path.write_text("${path_to_project}/lib\n")
+    os.utime(other_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    os.replace(other_path, manifest_path)
+    assert load_pth_manifest(template_dir) == ["${path_to_project}/lib"]
+
+
+def persist_as_worker(project_dir: Path, index: int) -> None:
+    extra_path = f"{os.fspath(project_dir)}/tests/sub{index}/src"
+    sys.path.append(extra_path)
+    persist_syspath(project_dir, force_pth_dir_creation=True, worker_id=f"gw{index}")
+
+
+def test_persist_syspath_concurrent_workers(tmp_path: Path):
+    project_dir = tmp_path / "project"
+    project_dir.mkdir()
+    worker_count = 16
+    with ProcessPoolExecutor(max_workers=worker_count) as executor:
+        list(executor.map(persist_as_worker, [project_dir] * worker_count, range(worker_count)))
+
+    template_dir = project_dir / "pths"
+    assert not get_pth_manifest_path(template_dir).exists()
+    merge_staged_syspath(project_dir)
+    templates = load_pth_manifest(template_dir)
+    assert sorted(templates) == sorted(
+        f"${{path_to_project}}/tests/sub{index}/src" for index in range(worker_count)
+    )
+    assert not any((template_dir / "staged").iterdir())
+
+
+def test_persist_syspath_non_interactive(tmp_path: Path, monkeypatch):
+    def no_input(prompt):
+        pytest.fail(f"Prompted: {prompt}")
+
+    monkeypatch.setattr("builtins.input", no_input)
+    persist_syspath(tmp_path, interactive=False)
+    assert not (tmp_path / "pths").exists()
+
+
+def test_syspath_scope(tmp_path: Path):
+    (tmp_path / "scoped_mod.py").write_text("VALUE = 1\n")
+    prior_sys_path = sys.path
+    prior_sys_path_entries = list(sys.path)
+
+    with syspath_scope() as syspath:
+        syspath.insert(0, os.fspath(tmp_path))
+        import scoped_mod  # pylint: disable=import-outside-toplevel,unused-import
+
+        sys.path = ["replaced"]
+
+    assert sys.path is prior_sys_path and sys.path == prior_sys_path_entries
+    assert "scoped_mod" not in sys.modules
+    assert os.fspath(tmp_path) not in sys.path_importer_cache
+
+    @syspath_scope()
+    def decorated():
+        sys.path.append(os.fspath(tmp_path))
+
+    decorated()
+    assert sys.path == prior_sys_path_entries